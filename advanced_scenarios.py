@@ -7,8 +7,116 @@ This module extends the core simulation with:
 3. Advanced AI for evasion and interception tactics
 """
 
+import math
 import numpy as np
-from simulation_core import Drone, Target, Turret, Obstacle
+from simulation_core import Drone, Target, Turret, Obstacle, GRID_MIN_DRONES
+
+class ScenarioArrays:
+    """
+    Positions of the agents, obstacles and turrets stacked into NumPy arrays.
+    
+    Build it once per step and pass it to every EnemyDrone.update() and
+    Rocket.update() call, so their distance checks are array operations
+    instead of Python loops over objects.
+    """
+    
+    def __init__(self, drones, obstacles=(), turrets=()):
+        """
+        Stack the scenario state.
+        
+        Args:
+            drones (list): All drones, friendly and enemy
+            obstacles (list): Obstacles
+            turrets (list): Turrets
+        """
+        self.drones = drones
+        # Same precision as the drones' column arrays
+        self.pos = np.array([d.pos for d in drones], dtype=np.float32).reshape(-1, 2)
+        self.alive = np.array([d.alive for d in drones], dtype=bool)
+        self.friendly = np.array([not hasattr(d, 'is_enemy') for d in drones], dtype=bool)
+        self.obstacle_pos = np.array([o.pos for o in obstacles], dtype=float).reshape(-1, 2)
+        self.obstacle_radius = np.array([o.radius for o in obstacles], dtype=float)
+        self.turret_pos = np.array([t.pos for t in turrets], dtype=float).reshape(-1, 2)
+        self.turret_range = np.array([t.range for t in turrets], dtype=float)
+        self._grid = None
+    
+    def _build_grid(self, cell_size):
+        """
+        Bucket the friendly drones into a uniform grid of square cells.
+        
+        Members are sorted by cell so each cell is a contiguous run; the alive
+        mask is checked at query time, so later kills need no rebuild.
+        """
+        members = np.flatnonzero(self.friendly & self.alive)
+        origin = self.pos[members].min(axis=0) if len(members) else np.zeros(2)
+        cells = np.floor((self.pos[members] - origin) / cell_size).astype(np.intp)
+        nx, ny = cells.max(axis=0) + 1 if len(members) else (1, 1)
+        cell_id = cells[:, 1] * nx + cells[:, 0]
+        order = np.argsort(cell_id, kind='stable')
+        cell_count = np.bincount(cell_id, minlength=nx * ny)
+        cell_start = np.cumsum(cell_count) - cell_count
+        self._grid = (cell_size, origin, nx, ny, members[order], cell_start, cell_count)
+    
+    def friendly_near(self, pos, radius):
+        """
+        Find the alive friendly drones closer than a radius.
+        
+        Small scenarios test every drone in one broadcast; larger ones only
+        test the 3x3 grid cells around the position.
+        
+        Args:
+            pos (np.ndarray): Query position
+            radius (float): Query radius
+            
+        Returns:
+            np.ndarray: Indices into drones, in drone order
+        """
+        if len(self.drones) < GRID_MIN_DRONES:
+            candidates = np.flatnonzero(self.friendly & self.alive)
+        else:
+            if self._grid is None or self._grid[0] != radius:
+                self._build_grid(radius)
+            cell_size, origin, nx, ny, members, cell_start, cell_count = self._grid
+            cx, cy = np.floor((pos - origin) / cell_size).astype(np.intp)
+            runs = [
+                members[cell_start[y * nx + x]:cell_start[y * nx + x] + cell_count[y * nx + x]]
+                for y in range(max(cy - 1, 0), min(cy + 2, ny))
+                for x in range(max(cx - 1, 0), min(cx + 2, nx))
+            ]
+            candidates = np.sort(np.concatenate(runs)) if runs else np.empty(0, dtype=np.intp)
+            candidates = candidates[self.alive[candidates]]
+        
+        diff = self.pos[candidates] - pos
+        return candidates[np.einsum('ij,ij->i', diff, diff) < radius * radius]
+    
+    def destroy(self, index):
+        """Destroy the drone at an index, keeping the alive mask in sync."""
+        drone = self.drones[index]
+        drone.alive = False
+        drone.status = "Destroyed"
+        self.alive[index] = False
+        return drone
+
+def _repulsion(pos, sources, reach, offset):
+    """
+    Sum of unit pushes away from point sources, scaled by 1/(distance - offset).
+    
+    Args:
+        pos (np.ndarray): Position being pushed
+        sources (np.ndarray): (K, 2) source positions
+        reach (np.ndarray): Per-source distance below which it pushes
+        offset (np.ndarray): Per-source distance subtracted before inverting
+        
+    Returns:
+        np.ndarray: Summed force
+    """
+    dist_vec = pos - sources
+    dist = np.hypot(dist_vec[:, 0], dist_vec[:, 1])
+    near = (dist < reach) & (dist > 0)
+    if not near.any():
+        return np.zeros(2)
+    gain = 1.0 / np.maximum(0.1, dist[near] - offset[near])
+    return (dist_vec[near] * (gain / dist[near])[:, None]).sum(axis=0)
 
 class EnemyDrone(Drone):
     """Enemy drone that hunts friendly drones."""
@@ -20,16 +128,31 @@ class EnemyDrone(Drone):
         self.status = "Enemy"
         self.target_drone = None
         self.hunt_radius = 30.0  # Radius to search for friendly drones
+        self.max_force = config.get("ENEMY_MAX_FORCE", 0.5)  # Steering limit while hunting
+        
+    def update(self, drones, targets, obstacles, turrets, gis, arrays=None):
+        """
+        Update enemy drone state with hunting behavior.
+        
+        Args:
+            drones (list): All drones, friendly and enemy
+            targets (list): Targets
+            obstacles (list): Obstacles
+            turrets (list): Turrets
+            gis: GIS data
+            arrays (ScenarioArrays): Stacked state shared by this step's
+                updates; built from the lists when not given
+        """
+        if arrays is None:
+            arrays = ScenarioArrays(drones, obstacles, turrets)
         
-    def update(self, drones, targets, obstacles, turrets, gis):
-        """Update enemy drone state with hunting behavior."""
         # Enemy drones don't care about targets, just hunt friendly drones
         # Find the closest friendly drone if we don't have a target
         if self.target_drone is None or not self.target_drone.alive:
-            self._find_closest_friendly_drone(drones)
+            self._find_closest_friendly_drone(arrays)
         
         # Calculate steering force focused on hunting friendly drones
-        force = self._calculate_hunting_force(drones, obstacles, turrets)
+        force = self._calculate_hunting_force(arrays)
         
         # Apply steering force
         self.velocity += force
@@ -46,12 +169,8 @@ class EnemyDrone(Drone):
         self.pos[0] = max(0, min(self.pos[0], self.config["FIELD_SIZE"]))
         self.pos[1] = max(0, min(self.pos[1], self.config["FIELD_SIZE"]))
         
-        # Add current position to trajectory history
-        self.trajectory.append(np.copy(self.pos))
-        
-        # Maximum history length
-        while len(self.trajectory) > self.config.get("TRAJECTORY_LENGTH", 50):
-            self.trajectory.popleft()
+        # Add current position to trajectory history (bounded ring buffer)
+        self.trajectory.append(self.pos)
             
         # Update fuel
         self.fuel -= 1
@@ -60,26 +179,21 @@ class EnemyDrone(Drone):
             self.status = "NoFuel"
             
         # Attack nearby friendly drones
-        self._attack_nearby_drones(drones)
+        self._attack_nearby_drones(arrays)
     
-    def _find_closest_friendly_drone(self, drones):
+    def _find_closest_friendly_drone(self, arrays):
         """Find the closest friendly drone to hunt."""
-        min_dist = float('inf')
-        closest_drone = None
+        # Skip other enemy drones and destroyed drones
+        candidates = np.flatnonzero(arrays.friendly & arrays.alive)
+        if len(candidates) == 0:
+            self.target_drone = None
+            return
         
-        for drone in drones:
-            # Skip other enemy drones and destroyed drones
-            if hasattr(drone, 'is_enemy') or not drone.alive:
-                continue
-                
-            dist = np.linalg.norm(drone.pos - self.pos)
-            if dist < min_dist:
-                min_dist = dist
-                closest_drone = drone
-                
-        self.target_drone = closest_drone
+        diff = arrays.pos[candidates] - self.pos
+        closest = candidates[np.argmin(np.einsum('ij,ij->i', diff, diff))]
+        self.target_drone = arrays.drones[closest]
     
-    def _calculate_hunting_force(self, drones, obstacles, turrets):
+    def _calculate_hunting_force(self, arrays):
         """Calculate force for hunting friendly drones."""
         # Start with zero force
         force = np.zeros(2)
@@ -104,48 +218,34 @@ class EnemyDrone(Drone):
                 
                 force += steering_force
         
-        # Add obstacle avoidance (stronger for enemy drones - they're more agile)
-        for obstacle in obstacles:
-            dist_vec = self.pos - obstacle.pos
-            dist = np.linalg.norm(dist_vec)
-            
-            if dist < obstacle.radius + 5.0:  # Extra margin
-                # Calculate repulsion force (inversely proportional to distance)
-                if dist > 0:
-                    repulsion = (dist_vec / dist) * (1.0 / max(0.1, dist - obstacle.radius))
-                    force += repulsion * 2.0  # Stronger avoidance
+        # Add obstacle avoidance (stronger for enemy drones - they're more agile),
+        # inversely proportional to the distance past the obstacle edge
+        force += _repulsion(
+            self.pos, arrays.obstacle_pos,
+            arrays.obstacle_radius + 5.0,  # Extra margin
+            arrays.obstacle_radius
+        ) * 2.0  # Stronger avoidance
         
         # Add turret avoidance (enemy drones are skilled at evading)
-        for turret in turrets:
-            dist_vec = self.pos - turret.pos
-            dist = np.linalg.norm(dist_vec)
-            
-            if dist < turret.range * 1.2:  # Stay further from turrets
-                if dist > 0:
-                    evasion = (dist_vec / dist) * (1.0 / max(0.1, dist - 5.0))
-                    force += evasion * 1.5
+        force += _repulsion(
+            self.pos, arrays.turret_pos,
+            arrays.turret_range * 1.2,  # Stay further from turrets
+            np.full(len(arrays.turret_range), 5.0)
+        ) * 1.5
         
         return force
     
-    def _attack_nearby_drones(self, drones):
+    def _attack_nearby_drones(self, arrays):
         """Attack nearby friendly drones."""
         attack_radius = 2.0  # Close range for "attacking"
         
-        for drone in drones:
-            # Skip enemy drones and destroyed drones
-            if hasattr(drone, 'is_enemy') or not drone.alive:
-                continue
-                
-            dist = np.linalg.norm(drone.pos - self.pos)
-            
-            # If close enough, attack the drone
-            if dist < attack_radius:
-                # 30% chance to destroy the drone per update when in range
-                if np.random.random() < 0.3:
-                    drone.alive = False
-                    drone.status = "Destroyed"
-                    print(f"Enemy drone {self.id} destroyed friendly drone {drone.id}!")
-                    break
+        # If close enough, attack the drone; enemy and destroyed drones are skipped
+        for index in arrays.friendly_near(self.pos, attack_radius):
+            # 30% chance to destroy the drone per update when in range
+            if np.random.random() < 0.3:
+                drone = arrays.destroy(index)
+                print(f"Enemy drone {self.id} destroyed friendly drone {drone.id}!")
+                break
 
 class Rocket:
     """Anti-drone rocket that can track and intercept drones."""
@@ -162,10 +262,21 @@ class Rocket:
         self.blast_radius = config.get("ROCKET_BLAST_RADIUS", 3.0)
         self.config = config
         
-    def update(self, drones, obstacles):
-        """Update rocket position and tracking."""
+    def update(self, drones, obstacles, arrays=None):
+        """
+        Update rocket position and tracking.
+        
+        Args:
+            drones (list): All drones, friendly and enemy
+            obstacles (list): Obstacles
+            arrays (ScenarioArrays): Stacked state shared by this step's
+                updates; built from the lists when not given
+        """
         if not self.alive:
             return
+        
+        if arrays is None:
+            arrays = ScenarioArrays(drones, obstacles)
             
         # If target is destroyed, self-destruct
         if not self.target_drone.alive:
@@ -178,7 +289,7 @@ class Rocket:
         
         # If we've hit the target, detonate
         if dist < self.blast_radius:
-            self._detonate(drones)
+            self._detonate(arrays)
             return
             
         # Otherwise, update velocity towards target with some prediction
@@ -199,11 +310,11 @@ class Rocket:
         self.pos += self.velocity
         
         # Check for obstacle collisions
-        for obstacle in obstacles:
-            if np.linalg.norm(self.pos - obstacle.pos) < obstacle.radius:
-                # Rocket hit an obstacle
-                self.alive = False
-                return
+        diff = arrays.obstacle_pos - self.pos
+        if np.any(np.einsum('ij,ij->i', diff, diff) < arrays.obstacle_radius ** 2):
+            # Rocket hit an obstacle
+            self.alive = False
+            return
         
         # Reduce fuel
         self.fuel -= 1
@@ -211,23 +322,18 @@ class Rocket:
             # Ran out of fuel, self-destruct without damage
             self.alive = False
     
-    def _detonate(self, drones):
+    def _detonate(self, arrays):
         """Detonate the rocket, potentially destroying nearby drones."""
         # Mark as destroyed
         self.alive = False
         
         # Check for drones in blast radius
-        for drone in drones:
-            if not drone.alive:
-                continue
-                
-            dist = np.linalg.norm(drone.pos - self.pos)
-            
-            if dist < self.blast_radius:
-                # Destroy the drone
-                drone.alive = False
-                drone.status = "Destroyed"
-                print(f"Rocket {self.id} destroyed {'enemy' if hasattr(drone, 'is_enemy') else 'friendly'} drone {drone.id}!")
+        diff = arrays.pos - self.pos
+        in_blast = arrays.alive & (np.einsum('ij,ij->i', diff, diff) < self.blast_radius ** 2)
+        for index in np.flatnonzero(in_blast):
+            # Destroy the drone
+            drone = arrays.destroy(index)
+            print(f"Rocket {self.id} destroyed {'enemy' if hasattr(drone, 'is_enemy') else 'friendly'} drone {drone.id}!")
 
 class AdvancedDroneAI:
     """
@@ -281,13 +387,14 @@ class AdvancedDroneAI:
         
         # Evade turrets that are targeting nearby
         for turret in turrets:
-            dist = np.linalg.norm(self.drone.pos - turret.pos)
+            away_vector = self.drone.pos - turret.pos
+            dist_sq = away_vector[0] * away_vector[0] + away_vector[1] * away_vector[1]
             
             # If within 90% of turret range, take evasive action
-            if dist < turret.range * 0.9:
-                away_vector = self.drone.pos - turret.pos
-                if np.linalg.norm(away_vector) > 0:
-                    away_vector = away_vector / np.linalg.norm(away_vector)
+            if dist_sq < turret.range_sq * 0.81:
+                dist = math.sqrt(dist_sq)
+                if dist > 0:
+                    away_vector = away_vector / dist
                     
                     # Stronger evasion as we get closer
                     strength = 1.0 - (dist / turret.range)
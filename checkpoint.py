@@ -0,0 +1,163 @@
+"""
+Simulation Checkpoints
+
+Saves and restores a running simulation so long runs can be resumed after an
+interruption instead of starting again from step 0.
+
+A checkpoint file holds two pickled records: a small header (step count,
+completion flag and a hash of the configuration) followed by the simulation
+object itself and the NumPy random state. Readers that only need the header,
+such as a demo deciding whether a scenario already finished, never unpickle
+the simulation.
+
+Runs can also be asked to checkpoint and stop early: SIGTERM (sent by batch
+schedulers and spot-instance eviction) and SIGUSR1 (SLURM's
+--signal=B:USR1@<seconds>) set a flag that the run loops poll once per step,
+and under SLURM the same flag trips shortly before the allocation ends.
+"""
+
+import os
+import json
+import time
+import pickle
+import signal
+import hashlib
+import threading
+import numpy as np
+
+# Default file name inside a run's output directory
+CHECKPOINT_FILENAME = "checkpoint.pkl"
+
+CHECKPOINT_VERSION = 1
+
+# Signals that ask a run to checkpoint and stop instead of dying mid-step
+STOP_SIGNALS = ("SIGTERM", "SIGUSR1")
+
+# Seconds before a SLURM allocation's end time at which a run stops itself
+SLURM_END_MARGIN = 60
+
+_stop_event = threading.Event()
+_stop_deadline = None
+
+
+def config_hash(config):
+    """
+    Hash a simulation configuration.
+
+    Args:
+        config (dict): Simulation configuration
+
+    Returns:
+        str: Hex digest that changes whenever any config value changes
+    """
+    encoded = json.dumps(dict(config), sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def save_checkpoint(path, simulation, config, complete=False):
+    """
+    Write a checkpoint of a simulation.
+
+    The file is written under a temporary name and then renamed over the old
+    checkpoint, so an interruption mid-write leaves the previous one intact.
+
+    Args:
+        path (str): Checkpoint file path
+        simulation: Simulation to save
+        config (dict): Configuration the simulation was created with
+        complete (bool): Whether the run has finished
+    """
+    header = {
+        "version": CHECKPOINT_VERSION,
+        "config_hash": config_hash(config),
+        "step_count": simulation.step_count,
+        "complete": complete,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump({"simulation": simulation, "rng_state": np.random.get_state()},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint_header(path):
+    """
+    Read only the header of a checkpoint.
+
+    Args:
+        path (str): Checkpoint file path
+
+    Returns:
+        dict: Header with "step_count", "complete" and "config_hash", or
+        None if there is no checkpoint at the path
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_checkpoint(path, config):
+    """
+    Restore a simulation from a checkpoint.
+
+    The global NumPy random state is restored as well, so a resumed run
+    continues with the same random sequence it would have had.
+
+    Args:
+        path (str): Checkpoint file path
+        config (dict): Configuration of the run being resumed
+
+    Returns:
+        The restored simulation
+
+    Raises:
+        ValueError: If the checkpoint was written for a different configuration
+    """
+    with open(path, "rb") as f:
+        header = pickle.load(f)
+        if header.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {path}")
+        if header["config_hash"] != config_hash(config):
+            raise ValueError(f"Checkpoint {path} was written with a different configuration")
+        payload = pickle.load(f)
+    np.random.set_state(payload["rng_state"])
+    print(f"Resumed from checkpoint {path} at step {header['step_count']}")
+    return payload["simulation"]
+
+
+def _request_stop(signum, frame):
+    """Signal handler: leave the actual checkpoint to the run loop."""
+    _stop_event.set()
+
+
+def install_stop_handlers():
+    """
+    Turn stop signals and the SLURM time limit into a checkpoint-and-stop.
+
+    Must be called from the main thread. Signals missing on the platform
+    (SIGUSR1 on Windows) are skipped.
+    """
+    global _stop_deadline
+    for name in STOP_SIGNALS:
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            signal.signal(signum, _request_stop)
+
+    end_time = os.environ.get("SLURM_JOB_END_TIME")
+    if end_time and end_time.isdigit():
+        _stop_deadline = int(end_time) - SLURM_END_MARGIN
+
+
+def stop_requested():
+    """
+    Check whether the current run should checkpoint and stop.
+
+    Returns:
+        bool: True once a stop signal arrived or the SLURM allocation is
+        about to end
+    """
+    if not _stop_event.is_set() and _stop_deadline is not None and time.time() >= _stop_deadline:
+        _stop_event.set()
+    return _stop_event.is_set()
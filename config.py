@@ -2,6 +2,8 @@
 Configuration settings for the drone swarm simulation.
 """
 
+from collections import ChainMap
+
 # Simulation Default Configuration
 DEFAULT_CONFIG = {
     "FIELD_SIZE": 100.0,
@@ -32,9 +34,26 @@ DEFAULT_CONFIG = {
     "MAX_SIMULATION_STEPS": 2000,
     "LOW_FUEL_THRESHOLD": 0.2,
     "DRONE_INITIAL_AVOID_FACTOR": 1.0,  # Base avoidance factor
-    "DRONE_LEARNED_AVOID_INCREASE": 0.5  # How much avoidance increases per hit nearby
+    "DRONE_LEARNED_AVOID_INCREASE": 0.5,  # How much avoidance increases per hit nearby
+    "FLOCKING_WORKERS": 0,  # Worker processes for flocking of very large swarms (0 = in-process)
+    "FLOCKING_BACKEND": "numpy"  # "cupy" computes flocking on the GPU when CuPy is installed
 }
 
+def make_config(**overrides):
+    """
+    Build a configuration from the defaults plus a few overridden keys.
+    
+    The defaults are layered under the overrides instead of being copied, and
+    writes go to the override layer only, so DEFAULT_CONFIG is never modified.
+    
+    Args:
+        **overrides: Configuration keys to replace
+        
+    Returns:
+        ChainMap: Mapping usable anywhere a config dict is read
+    """
+    return ChainMap(overrides, DEFAULT_CONFIG)
+
 # Color configurations for visualization
 STATUS_COLORS = {
     "Idle": "grey",
@@ -16,14 +16,18 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon as MplPolygon
 import matplotlib.colors as mcolors
 from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection
+from matplotlib import font_manager
+from PIL import Image, ImageDraw, ImageFont
 
-from config import DEFAULT_CONFIG
+from config import make_config, STATUS_COLORS, DEFAULT_COLOR
 from simulation_core import Simulation, Drone
 from geo_data_manager import GeoDataManager
 from advanced_scenarios import EnemyDrone, Rocket, AdvancedDroneAI
 from compatible_simulation import SimpleObstacle as Obstacle
 from compatible_simulation import SimpleTarget as Target
 from compatible_simulation import SimpleTurret as Turret
+from checkpoint import CHECKPOINT_FILENAME, save_checkpoint, load_checkpoint, stop_requested
 
 # Create output directory if it doesn't exist
 OUTPUT_DIR = "output"
@@ -555,7 +559,7 @@ class EnhancedSimulation(Simulation):
             self.visibility *= 0.7
         elif self.time_of_day == "night":
             self.visibility *= 0.4
-            
+        
         if self.weather_condition == "cloudy":
             self.visibility *= 0.8
         elif self.weather_condition == "rain":
@@ -607,7 +611,7 @@ class EnhancedSimulation(Simulation):
                 drone = EnhancedDrone(i, x, y, self.config)
             else:
                 drone = Drone(i, x, y, self.config)
-                
+            
             self.drones.append(drone)
     
     def create_enemy_drones(self, num_enemies=3, enhanced=True):
@@ -631,11 +635,16 @@ class EnhancedSimulation(Simulation):
                 enemy = EnhancedEnemyDrone(start_id + i, x, y, self.config)
             else:
                 enemy = EnemyDrone(start_id + i, x, y, self.config)
-                
+            
             self.drones.append(enemy)
     
     def step(self):
-        """Advance the simulation by one step."""
+        """
+        Advance the simulation by one step.
+        
+        Returns:
+            dict: Events of the step, as returned by Simulation.step()
+        """
         # Apply time effects
         if self.time_of_day == "night":
             # Reduce perception range at night
@@ -653,7 +662,7 @@ class EnhancedSimulation(Simulation):
                     drone.max_speed *= self.visibility
         
         # Run standard simulation step
-        super().step()
+        events = super().step()
         
         # Restore original values
         if self.time_of_day == "night":
@@ -665,44 +674,101 @@ class EnhancedSimulation(Simulation):
             for drone in self.drones:
                 if hasattr(drone, 'max_speed_original'):
                     drone.max_speed = drone.max_speed_original
+        
+        return events
+
+# Colours of the operational roles of enhanced drones
+ROLE_COLORS = {
+    "scout": "#00ffff",  # Cyan
+    "attacker": "#ff0000",  # Red
+    "defender": "#0000ff",  # Blue
+    "support": "#ffff00",  # Yellow
+}
 
-def generate_tactical_visualization(simulation, step, is_final=False):
-    """Generate enhanced tactical visualization with terrain and map data."""
+def tactical_snapshot(simulation):
+    """
+    Copy the state drawn by generate_tactical_visualization() out of a simulation.
+    
+    The snapshot shares no mutable state with the simulation, so it can be
+    drawn on another thread while the simulation keeps stepping.
+    
+    Args:
+        simulation: The simulation to copy
+    
+    Returns:
+        dict: Snapshot of the simulation
+    """
+    drones = simulation.drones
+    enemies = np.array([isinstance(drone, EnemyDrone) for drone in drones], dtype=bool)
+    
+    # Use role-based colors for enhanced drones, red for enemy drones
+    colors = []
+    for drone, enemy in zip(drones, enemies.tolist()):
+        if enemy:
+            colors.append('#ff0000')
+        elif hasattr(drone, 'operational_role'):
+            colors.append(ROLE_COLORS.get(drone.operational_role, 
+                                          STATUS_COLORS.get(drone.status, DEFAULT_COLOR)))
+        else:
+            colors.append(STATUS_COLORS.get(drone.status, DEFAULT_COLOR))
+    
+    return {
+        # Identifies the simulation a scene was built for; never read
+        "source": simulation,
+        "geo_data": simulation.geo_data,
+        "field_size": simulation.config["FIELD_SIZE"],
+        "mission_type": getattr(simulation, 'mission_type', None),
+        "time_of_day": getattr(simulation, 'time_of_day', None),
+        "weather_condition": getattr(simulation, 'weather_condition', None),
+        "visibility": getattr(simulation, 'visibility', 1.0),
+        "obstacles": [(np.array(o.pos, dtype=float), o.radius) for o in simulation.obstacles],
+        "turrets": [(np.array(t.pos, dtype=float), t.range) for t in simulation.turrets],
+        "target_pos": np.array([t.pos for t in simulation.targets], dtype=float).reshape(-1, 2),
+        "target_alive": np.array([t.alive for t in simulation.targets], dtype=bool),
+        "drone_pos": np.array([d.pos for d in drones], dtype=float).reshape(-1, 2),
+        "drone_velocity": np.array([d.velocity for d in drones], dtype=float).reshape(-1, 2),
+        "drone_alive": np.array([d.alive for d in drones], dtype=bool),
+        "drone_colors": colors,
+        "enemies": enemies,
+        "has_roles": any(hasattr(d, 'operational_role') for d in drones if d.alive),
+        "stats": simulation.get_statistics(),
+    }
+
+def _init_tactical_scene(snapshot):
+    """
+    Build the tactical figure of a simulation.
+    
+    Terrain, map data, obstacles, turrets and the styling are drawn once;
+    drones, targets, scan lines and the status texts are pooled artists that
+    _update_tactical_scene() moves on every frame.
+    
+    Args:
+        snapshot (dict): Snapshot from tactical_snapshot()
+    
+    Returns:
+        dict: Figure, axes and the persistent artists
+    """
     # Create figure with specified size and style
     fig, ax = plt.subplots(figsize=(12, 10), facecolor='#0a1929')
     ax.set_facecolor('#132f4c')
     
     # Render terrain if available
-    if simulation.geo_data and simulation.geo_data.dem_data is not None:
-        simulation.geo_data.render_terrain_map(ax=ax, with_contours=True)
+    geo_data = snapshot["geo_data"]
+    if geo_data and geo_data.dem_data is not None:
+        geo_data.render_terrain_map(ax=ax, with_contours=True)
     
     # Render map data if available
-    if simulation.geo_data and simulation.geo_data.map_data is not None:
-        simulation.geo_data.render_map_data(ax=ax)
+    if geo_data and geo_data.map_data is not None:
+        geo_data.render_map_data(ax=ax)
     
     # Grid and border styling for military look
     ax.grid(color='#1e4976', linestyle='--', linewidth=0.5, alpha=0.5)
     
     # Set plot limits and labels with military styling
-    field_size = simulation.config["FIELD_SIZE"]
+    field_size = snapshot["field_size"]
     ax.set_xlim(0, field_size)
     ax.set_ylim(0, field_size)
     
-    # Create title based on mission parameters
-    mission_title = f"NATO DRONE SWARM OPERATION"
-    if hasattr(simulation, 'mission_type'):
-        mission_type_name = simulation.mission_type.upper()
-        mission_title = f"NATO {mission_type_name} OPERATION"
-    
-    # Add time and weather info
-    time_weather = ""
-    if hasattr(simulation, 'time_of_day') and hasattr(simulation, 'weather_condition'):
-        time_weather = f" - {simulation.time_of_day.upper()} / {simulation.weather_condition.upper()}"
-    
-    # Title and axis labels in military style
-    ax.set_title(f"{mission_title}{time_weather} - T+{step:03d}", 
-                color='#66b2ff', fontsize=14, fontweight='bold')
-    
     # Coordinate axes in military style
     ax.set_xlabel("X Position (km)", color='#66b2ff')
     ax.set_ylabel("Y Position (km)", color='#66b2ff')
@@ -714,136 +780,115 @@ def generate_tactical_visualization(simulation, step, is_final=False):
         spine.set_linewidth(2)
     
     # Plot obstacles
-    for obstacle in simulation.obstacles:
+    for obstacle_pos, obstacle_radius in snapshot["obstacles"]:
         circle = plt.Circle(
-            obstacle.pos, 
-            obstacle.radius, 
+            obstacle_pos, 
+            obstacle_radius, 
             color='#654321', 
             alpha=0.8
         )
         ax.add_patch(circle)
     
     # Plot turrets
-    for turret in simulation.turrets:
+    for turret_pos, turret_range in snapshot["turrets"]:
         circle = plt.Circle(
-            turret.pos, 
+            turret_pos, 
             1.5, 
             color='#ff2a2a', 
             alpha=0.9
         )
         range_circle = plt.Circle(
-            turret.pos, 
-            turret.range, 
+            turret_pos, 
+            turret_range, 
             color='#ff2a2a', 
             alpha=0.15,
             linestyle='--'
         )
         ax.add_patch(circle)
         ax.add_patch(range_circle)
+    
+    # Add targeting lines, one segment per turret
+    scan_lines = ax.add_collection(LineCollection([], colors='#ff2a2a', linestyles='-',
+                                                  alpha=0.4, linewidths=0.7))
+    
+    # Targets get a square while alive and a star once destroyed
+    target_artists = []
+    for i, (x, y) in enumerate(snapshot["target_pos"].tolist()):
+        square = plt.Rectangle(
+            (x - 2.0, y - 2.0), 
+            4, 4, 
+            color='#00aa00', 
+            alpha=0.8
+        )
+        ax.add_patch(square)
+        label = ax.text(x, y, f"T{i+1}", 
+                        ha='center', va='center', color='white', 
+                        fontweight='bold', fontsize=9)
+        destroyed_label = ax.text(x, y + 0.02, f"T{i+1} NEUTRALIZED", 
+                                  ha='center', va='bottom', color='#ffaa00', 
+                                  fontsize=8, alpha=0.9, visible=False)
+        target_artists.append((square, label, destroyed_label))
+    
+    # Enemy drones are triangles, friendly drones circles
+    enemies = snapshot["enemies"]
+    
+    scene = {
+        "source": snapshot["source"],
+        "fig": fig,
+        "ax": ax,
+        "scan_lines": scan_lines,
+        "targets": target_artists,
+        "destroyed_targets": ax.scatter(np.empty(0), np.empty(0), s=80, 
+                                        marker='*', color='#ffaa00', alpha=0.9),
+        "friendly_markers": ax.scatter(np.empty(0), np.empty(0), marker='o', s=8**2,
+                                       edgecolors='black', linewidths=1),
+        "enemy_markers": ax.scatter(np.empty(0), np.empty(0), marker='^', s=10**2,
+                                    color='#ff0000', edgecolors='black', linewidths=1),
+        "wreck_markers": ax.scatter(np.empty(0), np.empty(0), s=40, color='#ff6600', alpha=0.7),
+        "wreck_crosses": ax.add_collection(LineCollection([], colors='red', linewidths=2)),
+        # Label drones
+        "drone_labels": [ax.text(0, 0, f"E{i+1}" if enemy else f"{i+1}", 
+                                 ha='center', va='bottom', color='white', 
+                                 fontsize=8, fontweight='bold', visible=False)
+                         for i, enemy in enumerate(enemies.tolist())],
+        "title": ax.set_title("", color='#66b2ff', fontsize=14, fontweight='bold'),
+        "mission_time": ax.text(0.02, 0.98, "", 
+                                transform=ax.transAxes, color='#66b2ff', 
+                                fontsize=10, verticalalignment='top',
+                                bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7)),
+        "status": ax.text(0.02, 0.02, "", 
+                          transform=ax.transAxes, color='#66b2ff', 
+                          fontsize=10, verticalalignment='bottom',
+                          bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7)),
+        "frame_artists": [],
+        "visibility_overlay": None,
+    }
+    
+    # Visibility conditions
+    visibility = snapshot["visibility"]
+    if visibility < 0.7:
+        # Apply a semi-transparent overlay to simulate reduced visibility
+        visibility_rect = plt.Rectangle((0, 0), 1, 1, 
+                                      transform=ax.transAxes,
+                                      color='black', 
+                                      alpha=0.7 - visibility)
+        scene["visibility_overlay"] = ax.add_patch(visibility_rect)
         
-        # Add targeting lines
-        scan_angle = (step * 5) % 360
-        length = turret.range * 0.7
-        dx = length * np.cos(np.radians(scan_angle))
-        dy = length * np.sin(np.radians(scan_angle))
-        ax.plot([turret.pos[0], turret.pos[0] + dx], 
-                [turret.pos[1], turret.pos[1] + dy], 
-                color='#ff2a2a', linestyle='-', alpha=0.4, linewidth=0.7)
+        ax.text(0.98, 0.98, f"VISIBILITY: {int(visibility*100)}%", 
+               transform=ax.transAxes, color='#ff6600', 
+               fontsize=10, ha='right', va='top',
+               bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#ff6600', alpha=0.7))
     
-    # Plot targets
-    for i, target in enumerate(simulation.targets):
-        if target.alive:
-            square = plt.Rectangle(
-                (target.pos[0] - 2.0, target.pos[1] - 2.0), 
-                4, 4, 
-                color='#00aa00', 
-                alpha=0.8
-            )
-            ax.add_patch(square)
-            ax.text(target.pos[0], target.pos[1], f"T{i+1}", 
-                    ha='center', va='center', color='white', 
-                    fontweight='bold', fontsize=9)
-        else:
-            # Show destroyed targets
-            ax.scatter(target.pos[0], target.pos[1], s=80, 
-                     marker='*', color='#ffaa00', alpha=0.9)
-            ax.text(target.pos[0], target.pos[1] + 0.02, f"T{i+1} NEUTRALIZED", 
-                   ha='center', va='bottom', color='#ffaa00', 
-                   fontsize=8, alpha=0.9)
+    return scene
+
+def _build_tactical_legend(ax, has_roles):
+    """
+    Add the NATO ELEMENTS legend to the tactical view.
     
-    # Plot drones with enhanced styling
-    from config import STATUS_COLORS, DEFAULT_COLOR
-    
-    for i, drone in enumerate(simulation.drones):
-        if drone.alive:
-            # Use role-based colors for enhanced drones
-            if hasattr(drone, 'operational_role'):
-                role_colors = {
-                    "scout": "#00ffff",  # Cyan
-                    "attacker": "#ff0000",  # Red
-                    "defender": "#0000ff",  # Blue
-                    "support": "#ffff00",  # Yellow
-                }
-                color = role_colors.get(drone.operational_role, 
-                                      STATUS_COLORS.get(drone.status, DEFAULT_COLOR))
-            else:
-                color = STATUS_COLORS.get(drone.status, DEFAULT_COLOR)
-            
-            # Different style for enemy drones
-            if isinstance(drone, EnemyDrone):
-                marker = '^'  # Triangle
-                ms = 10
-                color = '#ff0000'  # Red
-            else:
-                marker = 'o'  # Circle
-                ms = 8
-            
-            # Plot the drone
-            ax.scatter(drone.pos[0], drone.pos[1], 
-                     marker=marker, s=ms**2, color=color, 
-                     edgecolors='black', linewidths=1)
-            
-            # Draw velocity vector
-            if np.linalg.norm(drone.velocity) > 0.1:
-                velocity = drone.velocity / np.linalg.norm(drone.velocity) * 0.02
-                ax.arrow(
-                    drone.pos[0], 
-                    drone.pos[1], 
-                    velocity[0], 
-                    velocity[1], 
-                    head_width=0.01, 
-                    head_length=0.015, 
-                    fc=color, 
-                    ec='black',
-                    linewidth=1
-                )
-            
-            # Label drones
-            if isinstance(drone, EnemyDrone):
-                label = f"E{i+1}"
-            else:
-                label = f"{i+1}"
-            
-            ax.text(drone.pos[0], drone.pos[1] + 0.02, label, 
-                   ha='center', va='bottom', color='white', 
-                   fontsize=8, fontweight='bold')
-        else:
-            # Show destroyed drones
-            ax.scatter(drone.pos[0], drone.pos[1], s=40, color='#ff6600', alpha=0.7)
-            ax.plot(
-                [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                [drone.pos[1] - 0.5, drone.pos[1] + 0.5], 
-                color='red', 
-                linewidth=2
-            )
-            ax.plot(
-                [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                [drone.pos[1] + 0.5, drone.pos[1] - 0.5], 
-                color='red', 
-                linewidth=2
-            )
-    
-    # Add custom legend
+    Args:
+        ax: Axes of the tactical view
+        has_roles (bool): Whether the operational roles are listed
+    """
     legend_elements = []
     
     # Add drone types
@@ -856,16 +901,8 @@ def generate_tactical_visualization(simulation, step, is_final=False):
                                  label='Enemy Drone'))
     
     # Add drone roles if enhanced
-    has_roles = any(hasattr(d, 'operational_role') for d in simulation.drones if d.alive)
     if has_roles:
-        role_colors = {
-            "scout": "#00ffff",  # Cyan
-            "attacker": "#ff0000",  # Red
-            "defender": "#0000ff",  # Blue
-            "support": "#ffff00",  # Yellow
-        }
-        
-        for role, color in role_colors.items():
+        for role, color in ROLE_COLORS.items():
             legend_elements.append(Line2D([0], [0], marker='o', color='w', 
                                          markerfacecolor=color, markersize=8,
                                          label=f'{role.capitalize()} Role'))
@@ -886,16 +923,24 @@ def generate_tactical_visualization(simulation, step, is_final=False):
     legend.get_title().set_color('#66b2ff')
     for text in legend.get_texts():
         text.set_color('#e0e0e0')
+
+def _tactical_title(snapshot, step):
+    """Title of the tactical view: mission, conditions and mission time."""
+    # Create title based on mission parameters
+    mission_title = f"NATO DRONE SWARM OPERATION"
+    if snapshot["mission_type"] is not None:
+        mission_type_name = snapshot["mission_type"].upper()
+        mission_title = f"NATO {mission_type_name} OPERATION"
     
-    # Add mission time
-    mission_time = f"T+{step:03d}"
-    ax.text(0.02, 0.98, f"MISSION TIME: {mission_time}", 
-           transform=ax.transAxes, color='#66b2ff', 
-           fontsize=10, verticalalignment='top',
-           bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7))
+    # Add time and weather info
+    time_weather = ""
+    if snapshot["time_of_day"] is not None and snapshot["weather_condition"] is not None:
+        time_weather = f" - {snapshot['time_of_day'].upper()} / {snapshot['weather_condition'].upper()}"
     
-    # Add mission status
-    stats = simulation.get_statistics()
+    return f"{mission_title}{time_weather} - T+{step:03d}"
+
+def _tactical_status(stats):
+    """Mission status box text of the tactical view."""
     drones_text = f"DRONES: {stats['drones_alive']}/{stats['total_drones']}"
     targets_text = f"TARGETS: {stats['targets_destroyed']}/{stats['total_targets']}"
     
@@ -904,69 +949,456 @@ def generate_tactical_visualization(simulation, step, is_final=False):
         status_box += "\nMISSION COMPLETE"
     elif stats['mission_failed']:
         status_box += "\nMISSION FAILED"
+    return status_box
+
+def _update_tactical_scene(scene, snapshot, step):
+    """
+    Move the pooled artists of a tactical scene to the state of a snapshot.
     
-    ax.text(0.02, 0.02, status_box, 
-           transform=ax.transAxes, color='#66b2ff', 
-           fontsize=10, verticalalignment='bottom',
-           bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7))
+    Args:
+        scene (dict): Scene built by _init_tactical_scene()
+        snapshot (dict): Snapshot from tactical_snapshot()
+        step (int): Current step number
+    """
+    ax = scene["ax"]
     
-    # Visibility conditions
-    if hasattr(simulation, 'visibility') and simulation.visibility < 0.7:
-        # Apply a semi-transparent overlay to simulate reduced visibility
-        visibility_rect = plt.Rectangle((0, 0), 1, 1, 
-                                      transform=ax.transAxes,
-                                      color='black', 
-                                      alpha=0.7 - simulation.visibility)
-        ax.add_patch(visibility_rect)
+    # Velocity arrows of the previous frame are dropped
+    for artist in scene["frame_artists"]:
+        artist.remove()
+    frame_artists = scene["frame_artists"] = []
+    
+    # Title in military style
+    scene["title"].set_text(_tactical_title(snapshot, step))
+    
+    # Add targeting lines; every turret scans at the same angle
+    scan_angle = np.radians((step * 5) % 360)
+    direction = np.array([np.cos(scan_angle), np.sin(scan_angle)])
+    scene["scan_lines"].set_segments([
+        [turret_pos, turret_pos + direction * (turret_range * 0.7)]
+        for turret_pos, turret_range in snapshot["turrets"]
+    ])
+    
+    # Plot targets
+    target_alive = snapshot["target_alive"]
+    for shown, (square, label, destroyed_label) in zip(target_alive.tolist(), scene["targets"]):
+        square.set_visible(shown)
+        label.set_visible(shown)
+        destroyed_label.set_visible(not shown)
+    scene["destroyed_targets"].set_offsets(snapshot["target_pos"][~target_alive])
+    
+    # Plot drones with enhanced styling
+    pos = snapshot["drone_pos"]
+    velocity = snapshot["drone_velocity"]
+    alive = snapshot["drone_alive"]
+    enemies = snapshot["enemies"]
+    colors = snapshot["drone_colors"]
+    
+    friendly = alive & ~enemies
+    scene["friendly_markers"].set_offsets(pos[friendly])
+    scene["friendly_markers"].set_facecolors([c for c, f in zip(colors, friendly.tolist()) if f])
+    scene["enemy_markers"].set_offsets(pos[alive & enemies])
+    
+    for label, (x, y), shown in zip(scene["drone_labels"], pos.tolist(), alive.tolist()):
+        label.set_visible(shown)
+        if shown:
+            label.set_position((x, y + 0.02))
+    
+    # Draw velocity vector
+    speeds = np.hypot(velocity[:, 0], velocity[:, 1])
+    moving = alive & (speeds > 0.1)
+    if moving.any():
+        arrows = velocity[moving] / speeds[moving, None] * 0.02
+        frame_artists.append(ax.quiver(
+            pos[moving, 0], pos[moving, 1], arrows[:, 0], arrows[:, 1],
+            color=[c for c, m in zip(colors, moving.tolist()) if m], edgecolor='black', linewidth=1,
+            angles='xy', scale_units='xy', scale=1,
+            units='xy', width=0.001, headwidth=10, headlength=15, headaxislength=15
+        ))
+    
+    # Show destroyed drones
+    wrecks = pos[~alive]
+    crosses = np.array([[[-0.5, -0.5], [0.5, 0.5]], [[-0.5, 0.5], [0.5, -0.5]]])
+    scene["wreck_markers"].set_offsets(wrecks)
+    scene["wreck_crosses"].set_segments((wrecks[:, None, None, :] + crosses[None]).reshape(-1, 2, 2))
+    
+    # Add custom legend; it only changes when the last enhanced drone is lost
+    has_roles = snapshot["has_roles"]
+    if scene.get("has_roles") != has_roles:
+        _build_tactical_legend(ax, has_roles)
+        scene["has_roles"] = has_roles
+    
+    # Add mission time
+    mission_time = f"T+{step:03d}"
+    scene["mission_time"].set_text(f"MISSION TIME: {mission_time}")
+    
+    # Add mission status
+    scene["status"].set_text(_tactical_status(snapshot["stats"]))
+
+def generate_tactical_visualization(snapshot, step, is_final=False, artists=None):
+    """
+    Generate enhanced tactical visualization with terrain and map data.
+    
+    Args:
+        snapshot (dict): Snapshot from tactical_snapshot(); the live
+            simulation is never read, so this can run on another thread
+        step (int): Current step number
+        is_final (bool): Whether this is the final view
+        artists (dict): Scene of an earlier call to update in place instead of
+            drawing a new figure; an empty dict, or one built for another
+            simulation, is (re)filled with a new scene
+    
+    Returns:
+        Figure: The tactical view; it belongs to the caller unless it is
+        kept in artists
+    """
+    if artists is None:
+        scene = _init_tactical_scene(snapshot)
+    else:
+        # The figure and static scene are built once per simulation and reused
+        if artists.get("source") is not snapshot["source"]:
+            if artists:
+                plt.close(artists["fig"])
+            artists.clear()
+            artists.update(_init_tactical_scene(snapshot))
+        scene = artists
+    
+    _update_tactical_scene(scene, snapshot, step)
+    return scene["fig"]
+
+def _rgba(color, alpha=1.0):
+    """Matplotlib color as an 8-bit RGBA tuple for Pillow."""
+    r, g, b, _ = mcolors.to_rgba(color)
+    return (round(r * 255), round(g * 255), round(b * 255), round(alpha * 255))
+
+class TacticalRasterizer:
+    """
+    Draws the tactical views of one simulation straight into pixels.
+    
+    The static scene (terrain, map data, obstacles, turrets, styling and
+    legend) is rendered once with matplotlib, split at the visibility overlay
+    (or, in clear conditions, the legend) into a background and a
+    transparent top layer. Each frame copies the background, stamps targets,
+    drones, scan lines and the status texts onto it with Pillow and
+    composites the overlay and top layer in matplotlib's drawing order, so
+    markers are dimmed at night and in fog and never cover the legend. This
+    skips matplotlib's whole draw pipeline.
+    Marker and font sizes match generate_tactical_visualization(); velocity
+    arrows, a fiftieth of a unit long and so under a pixel, are left out.
+    """
+    
+    def __init__(self, snapshot, dpi=100):
+        """
+        Prepare the rasterizer for the simulation a snapshot was taken from.
         
-        ax.text(0.98, 0.98, f"VISIBILITY: {int(simulation.visibility*100)}%", 
-               transform=ax.transAxes, color='#ff6600', 
-               fontsize=10, ha='right', va='top',
-               bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#ff6600', alpha=0.7))
+        Args:
+            snapshot (dict): Snapshot from tactical_snapshot()
+            dpi (int): Pixels per inch of the frames
+        """
+        self.source = snapshot["source"]
+        self.dpi = dpi
+        self._snapshot = snapshot
+        # Background and pixel layout per legend variant, built on first use
+        self._layouts = {}
+        
+        # The fonts matplotlib draws the figure texts with
+        regular = font_manager.findfont(font_manager.FontProperties())
+        bold = font_manager.findfont(font_manager.FontProperties(weight='bold'))
+        size = lambda points: round(points * dpi / 72)
+        self._fonts = {
+            "title": ImageFont.truetype(bold, size(14)),
+            "box": ImageFont.truetype(regular, size(10)),
+            "target": ImageFont.truetype(bold, size(9)),
+            "neutralized": ImageFont.truetype(regular, size(8)),
+            "drone": ImageFont.truetype(bold, size(8)),
+        }
+        self._pad = size(10) * 0.3
     
-    return fig
+    def _points(self, points):
+        """Length in typographic points as pixels."""
+        return points * self.dpi / 72
+    
+    def _layout(self, has_roles):
+        """
+        Render the background for one legend variant and measure its layout.
+        
+        Args:
+            has_roles (bool): Whether the legend lists the operational roles
+        
+        Returns:
+            dict: Background image, data-to-pixel mapping and text anchors
+        """
+        if has_roles in self._layouts:
+            return self._layouts[has_roles]
+        
+        scene = _init_tactical_scene(self._snapshot)
+        fig, ax = scene["fig"], scene["ax"]
+        fig.set_dpi(self.dpi)
+        _build_tactical_legend(ax, has_roles)
+        # Targets change during the mission, so render() draws them
+        for artists in scene["targets"]:
+            for artist in artists:
+                artist.set_visible(False)
+        
+        # The frame is cropped to the tight box of a typical title, which is
+        # then drawn by render() instead
+        scene["title"].set_text("NATO DRONE SWARM OPERATION - T+000")
+        fig.canvas.draw()
+        renderer = fig.canvas.get_renderer()
+        bbox = fig.get_tightbbox(renderer).padded(matplotlib.rcParams['savefig.pad_inches'])
+        title_extent = scene["title"].get_window_extent(renderer)
+        scene["title"].set_text("")
+        
+        # Artists matplotlib draws after the visibility overlay, or after
+        # the legend's position in clear conditions, cover the moving
+        # elements; they go into the top layer, the rest into the background
+        overlay = scene["visibility_overlay"]
+        order = sorted((a for a in ax.get_children() if a is not ax.patch), key=lambda a: a.get_zorder())
+        split = order.index(overlay if overlay is not None else ax.get_legend())
+        top_artists = [a for a in order[split:] if a is not overlay and a.get_visible()]
+        
+        for artist in top_artists:
+            artist.set_visible(False)
+        if overlay is not None:
+            overlay.set_visible(False)
+        fig.canvas.draw()
+        pixels = np.asarray(fig.canvas.buffer_rgba()).copy()
+        
+        # The top layer on a transparent figure, everything else hidden
+        for artist in (fig.patch, ax.patch, *order):
+            artist.set_visible(False)
+        for artist in top_artists:
+            artist.set_visible(True)
+        fig.canvas.draw()
+        top_pixels = np.asarray(fig.canvas.buffer_rgba())
+        
+        height, width = pixels.shape[:2]
+        x0, y0 = np.floor(np.array(bbox.p0) * self.dpi).astype(int)
+        x1, y1 = x0 + int(bbox.width * self.dpi), y0 + int(bbox.height * self.dpi)
+        x0, y1 = max(x0, 0), min(y1, height)
+        crop = np.s_[height - y1:height - max(y0, 0), x0:min(x1, width)]
+        background = Image.fromarray(np.ascontiguousarray(pixels[crop][..., :3]))
+        top = Image.fromarray(np.ascontiguousarray(top_pixels[crop]), 'RGBA')
+        # Only the covered part of the top layer is pasted onto each frame
+        top_box = top.getchannel('A').getbbox()
+        
+        # Display coordinates have their origin at the bottom left
+        to_image = lambda x, y: (x - x0, y1 - y)
+        (px0, py0), (px1, py1) = [to_image(*p) for p in ax.transData.transform([(0, 0), (1, 1)])]
+        layout = {
+            "background": background,
+            "scale": np.array([px1 - px0, py1 - py0]),
+            "offset": np.array([px0, py0]),
+            # Pixel box of the axes as (left, top, right, bottom)
+            "axes": to_image(ax.bbox.x0, ax.bbox.y1) + to_image(ax.bbox.x1, ax.bbox.y0),
+            "title": to_image((title_extent.x0 + title_extent.x1) / 2, title_extent.y0),
+            "mission_time": to_image(*ax.transAxes.transform((0.02, 0.98))),
+            "status": to_image(*ax.transAxes.transform((0.02, 0.02))),
+            "overlay": None if overlay is None else _rgba('black', overlay.get_alpha()),
+            "top": None if top_box is None else (top.crop(top_box), top_box[:2]),
+        }
+        plt.close(fig)
+        self._layouts[has_roles] = layout
+        return layout
+    
+    def _text_box(self, draw, anchor, text, top):
+        """
+        Draw a status text in a rounded box, like the figure's text boxes.
+        
+        Args:
+            draw: ImageDraw of the frame
+            anchor (tuple): Pixel position of the box's top or bottom left corner
+            text (str): Text, possibly with several lines
+            top (bool): Whether anchor is the top left corner
+        """
+        font = self._fonts["box"]
+        pad = self._pad
+        left, upper, right, lower = draw.multiline_textbbox((0, 0), text, font=font)
+        box_height = lower - upper + 2 * pad
+        x, y = anchor
+        if not top:
+            y -= box_height
+        draw.rounded_rectangle((x, y, x + right - left + 2 * pad, y + box_height), radius=pad,
+                               fill=_rgba('#173a5e', 0.7), outline=_rgba('#66b2ff', 0.7))
+        draw.multiline_text((x + pad - left, y + pad - upper), text, font=font, fill=_rgba('#66b2ff'))
+    
+    def render(self, snapshot, step):
+        """
+        Draw the tactical view of a snapshot.
+        
+        Args:
+            snapshot (dict): Snapshot from tactical_snapshot()
+            step (int): Current step number
+        
+        Returns:
+            PIL.Image.Image: The frame as an RGB image
+        """
+        layout = self._layout(snapshot["has_roles"])
+        scale, offset = layout["scale"], layout["offset"]
+        image = layout["background"].copy()
+        # RGBA drawing on an RGB image blends every shape by its alpha
+        draw = ImageDraw.Draw(image, 'RGBA')
+        fonts = self._fonts
+        
+        # Plot targets
+        target_pos = snapshot["target_pos"]
+        target_alive = snapshot["target_alive"]
+        # Squares are clipped to the axes like the figure's patches
+        left, top, right, bottom = layout["axes"]
+        corners = (target_pos[target_alive, None, :] + np.array([[-2.0, 2.0], [2.0, -2.0]])) * scale + offset
+        for (x0, y0), (x1, y1) in corners.tolist():
+            x0, y0, x1, y1 = max(x0, left), max(y0, top), min(x1, right), min(y1, bottom)
+            if x0 < x1 and y0 < y1:
+                draw.rectangle((x0, y0, x1, y1), fill=_rgba('#00aa00', 0.8))
+        star = np.array([(np.sin(a), -np.cos(a)) for a in np.arange(10) * np.pi / 5])
+        star *= np.where(np.arange(10) % 2, 0.381966, 1.0)[:, None] * self._points(np.sqrt(80)) / 2
+        for center in (target_pos[~target_alive] * scale + offset).tolist():
+            draw.polygon([tuple(p) for p in (star + center).tolist()], fill=_rgba('#ffaa00', 0.9))
+        
+        # Plot drones: friendly circles in their role colors, enemy triangles
+        pos = snapshot["drone_pos"]
+        alive = snapshot["drone_alive"]
+        enemies = snapshot["enemies"]
+        pixels = (pos * scale + offset).tolist()
+        edge = max(1, round(self._points(1)))
+        radius = self._points(8) / 2
+        half = self._points(10) / 2
+        for (x, y), color, shown, enemy in zip(pixels, snapshot["drone_colors"], alive.tolist(), enemies.tolist()):
+            if shown and not enemy:
+                draw.ellipse((x - radius, y - radius, x + radius, y + radius),
+                             fill=_rgba(color), outline=_rgba('black'), width=edge)
+        for (x, y), shown, enemy in zip(pixels, alive.tolist(), enemies.tolist()):
+            if shown and enemy:
+                draw.polygon([(x, y - half), (x - half, y + half), (x + half, y + half)],
+                             fill=_rgba('#ff0000'), outline=_rgba('black'), width=edge)
+        
+        # Show destroyed drones with a cross through them
+        wreck_radius = self._points(np.sqrt(40)) / 2
+        cross = np.abs(0.5 * scale)
+        cross_width = max(1, round(self._points(2)))
+        wrecks = [p for p, shown in zip(pixels, alive.tolist()) if not shown]
+        for x, y in wrecks:
+            draw.ellipse((x - wreck_radius, y - wreck_radius, x + wreck_radius, y + wreck_radius),
+                         fill=_rgba('#ff6600', 0.7))
+        
+        # Reduced visibility dims the markers drawn so far, as in the figure
+        if layout["overlay"] is not None:
+            draw.rectangle(layout["axes"], fill=layout["overlay"])
+        
+        # Add targeting lines; every turret scans at the same angle
+        scan_angle = np.radians((step * 5) % 360)
+        direction = np.array([np.cos(scan_angle), np.sin(scan_angle)])
+        for turret_pos, turret_range in snapshot["turrets"]:
+            line = np.array([turret_pos, turret_pos + direction * (turret_range * 0.7)]) * scale + offset
+            draw.line([tuple(p) for p in line.tolist()], fill=_rgba('#ff2a2a', 0.4), width=1)
+        
+        for x, y in wrecks:
+            draw.line((x - cross[0], y - cross[1], x + cross[0], y + cross[1]), fill=_rgba('red'), width=cross_width)
+            draw.line((x - cross[0], y + cross[1], x + cross[0], y - cross[1]), fill=_rgba('red'), width=cross_width)
+        
+        # Target and drone labels
+        label_lift = 0.02 * scale[1]
+        for i, ((x, y), shown) in enumerate(zip((target_pos * scale + offset).tolist(), target_alive.tolist())):
+            if shown:
+                draw.text((x, y), f"T{i+1}", font=fonts["target"], fill=_rgba('white'), anchor='mm')
+            else:
+                draw.text((x, y + label_lift), f"T{i+1} NEUTRALIZED", font=fonts["neutralized"],
+                          fill=_rgba('#ffaa00', 0.9), anchor='md')
+        for i, ((x, y), shown, enemy) in enumerate(zip(pixels, alive.tolist(), enemies.tolist())):
+            if shown:
+                draw.text((x, y + label_lift), f"E{i+1}" if enemy else f"{i+1}", font=fonts["drone"],
+                          fill=_rgba('white'), anchor='md')
+        
+        # Title, mission time and mission status
+        draw.text(layout["title"], _tactical_title(snapshot, step), font=fonts["title"],
+                  fill=_rgba('#66b2ff'), anchor='md')
+        self._text_box(draw, layout["mission_time"], f"MISSION TIME: T+{step:03d}", top=True)
+        self._text_box(draw, layout["status"], _tactical_status(snapshot["stats"]), top=False)
+        
+        # Legend and anything else drawn above the overlay in the figure
+        if layout["top"] is not None:
+            top, corner = layout["top"]
+            image.paste(top, corner, top)
+        return image
 
 def run_enhanced_simulation(config=None, num_steps=200, with_enemy_drones=True, 
                           time_of_day="day", weather="clear", mission_type="strike",
-                          output_dir=OUTPUT_DIR, save_interval=10):
-    """Run an enhanced simulation with realistic terrain and advanced tactical behavior."""
-    if config is None:
-        config = DEFAULT_CONFIG.copy()
+                          output_dir=OUTPUT_DIR, save_interval=10,
+                          checkpoint_interval=0, resume=None):
+    """
+    Run an enhanced simulation with realistic terrain and advanced tactical behavior.
     
-    # Initialize the enhanced simulation
-    simulation = EnhancedSimulation(config)
-    simulation.time_of_day = time_of_day
-    simulation.weather_condition = weather
-    simulation.mission_type = mission_type
+    Args:
+        config (dict): Simulation configuration, DEFAULT_CONFIG if not given
+        num_steps (int): Maximum number of steps to run
+        with_enemy_drones (bool): Whether to add enemy drones
+        time_of_day (str): "day", "dusk" or "night"
+        weather (str): "clear", "cloudy", "rain" or "fog"
+        mission_type (str): "strike", "recon", "defend" or "escort"
+        output_dir (str): Directory for map frames and checkpoints
+        save_interval (int): Interval for saving map frames
+        checkpoint_interval (int): Save a checkpoint to output_dir every this
+            many steps and at the end; 0 disables checkpoints
+        resume (str): Checkpoint file to continue from instead of building a
+            new simulation
     
-    # Create friendly drones
-    simulation.create_drones(enhanced=True)
+    Returns:
+        EnhancedSimulation: The simulation after the run, which ends early
+        (after writing a checkpoint) if checkpoint.stop_requested() trips
+    """
+    if config is None:
+        config = make_config()
     
-    # Add enemy drones if requested
-    if with_enemy_drones:
-        num_enemies = max(1, config["NUM_DRONES"] // 3)
-        simulation.create_enemy_drones(num_enemies, enhanced=True)
+    if resume:
+        simulation = load_checkpoint(resume, config)
+    else:
+        # Initialize the enhanced simulation
+        simulation = EnhancedSimulation(config)
+        simulation.time_of_day = time_of_day
+        simulation.weather_condition = weather
+        simulation.mission_type = mission_type
+        
+        # Create friendly drones
+        simulation.create_drones(enhanced=True)
+        
+        # Add enemy drones if requested
+        if with_enemy_drones:
+            num_enemies = max(1, config["NUM_DRONES"] // 3)
+            simulation.create_enemy_drones(num_enemies, enhanced=True)
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILENAME)
+    # Frame paths differ only by step, so the directory is joined once
+    frame_path = os.path.join(output_dir, "tactical_map_{:03d}.png")
     
     # Run the simulation
-    for step in range(num_steps):
+    for step in range(simulation.step_count, num_steps):
         if simulation.is_complete():
             break
         
         simulation.step()
         
+        if checkpoint_interval and simulation.step_count % checkpoint_interval == 0:
+            save_checkpoint(checkpoint_path, simulation, config)
+        
+        if stop_requested():
+            save_checkpoint(checkpoint_path, simulation, config)
+            print(f"Stop requested at step {simulation.step_count}; "
+                  f"resume with --resume {checkpoint_path}")
+            return simulation
+        
         # Save visualization at intervals
         if step % save_interval == 0 or step == num_steps - 1 or simulation.is_complete():
             is_final = step == num_steps - 1 or simulation.is_complete()
-            fig = generate_tactical_visualization(simulation, step, is_final)
+            fig = generate_tactical_visualization(tactical_snapshot(simulation), step, is_final)
             
             # Save the visualization
-            filename = f"tactical_map_{step:03d}.png"
-            plt.savefig(os.path.join(output_dir, filename), 
+            plt.savefig(frame_path.format(step),
                        dpi=100, bbox_inches='tight')
             plt.close(fig)
             
             print(f"Step {step+1}/{num_steps} completed.")
     
+    if checkpoint_interval:
+        save_checkpoint(checkpoint_path, simulation, config, complete=True)
+    
     # Final stats
     stats = simulation.get_statistics()
     print("\nSimulation completed.")
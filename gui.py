@@ -4,6 +4,7 @@ GUI components for the drone swarm simulation.
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QSpinBox, QDoubleSpinBox, QFrame,
@@ -16,7 +17,7 @@ from PyQt5.QtGui import QIntValidator, QDoubleValidator
 
 from config import DEFAULT_CONFIG
 from mpl_canvas import SimulationCanvas, SimulationToolbar
-from simulation_core import Simulation
+from simulation_core import Simulation, warm_up_kernels
 from gis_utils import GISData
 
 class SimulationControl(QWidget):
@@ -507,6 +508,8 @@ class MainWindow(QMainWindow):
         
         # Create a deep copy of config to avoid modifying the defaults
         self.config = DEFAULT_CONFIG.copy()
+        # Compile the numba kernels now so the first worker step does not stall
+        warm_up_kernels()
         self.simulation = Simulation(self.config)
         self.gis_data = GISData()
         self.simulation.set_gis(self.gis_data)
@@ -514,6 +517,11 @@ class MainWindow(QMainWindow):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_simulation)
         
+        # Simulation steps run on a worker thread while the canvas draws
+        # the previous state from a snapshot
+        self._step_pool = ThreadPoolExecutor(max_workers=1)
+        self._step_future = None
+        
         self.initialize_ui()
         self.setWindowTitle("Military-Grade Drone Swarm Simulation")
         self.setGeometry(100, 100, 1200, 800)
@@ -586,8 +594,24 @@ class MainWindow(QMainWindow):
         """Pause the simulation timer."""
         if self.timer.isActive():
             self.timer.stop()
+            if self._finish_pending_step():
+                # Show the state produced by the step that was in flight
+                self.update_visualization()
             self.statusBar.showMessage("Simulation paused")
     
+    def _finish_pending_step(self):
+        """
+        Wait for the background simulation step, if any, to complete.
+        
+        Returns:
+            bool: True if a step was pending
+        """
+        future, self._step_future = self._step_future, None
+        if future is None:
+            return False
+        future.result()  # Re-raises any exception from the step
+        return True
+    
     def update_simulation_timer(self):
         """Update the simulation timer interval."""
         if self.timer.isActive():
@@ -596,18 +620,29 @@ class MainWindow(QMainWindow):
     
     def update_simulation(self):
         """Update the simulation state and visualization."""
-        if not self.simulation.is_complete():
-            self.simulation.step()
-            self.update_visualization()
-            
-            # Update progress indicators
-            stats = self.simulation.get_statistics()
-            self.simulation_control.update_progress(self.simulation.step_count, stats)
-        else:
+        if self._step_future is not None and not self._step_future.done():
+            # Previous step is still running; drop this tick
+            return
+        self._finish_pending_step()
+        
+        # Capture the state the last step produced, then start the next
+        # step on the worker while this frame is drawn
+        snapshot = self.simulation.snapshot()
+        stats = self.simulation.get_statistics()
+        if self.simulation.is_complete():
             self.pause_simulation_timer()
+        else:
+            self._step_future = self._step_pool.submit(self.simulation.step)
+        
+        show_trajectories = self.simulation_control.show_trajectories.isChecked()
+        self.canvas.update_plot(snapshot, self.config["FIELD_SIZE"], show_trajectories)
+        
+        # Update progress indicators
+        self.simulation_control.update_progress(snapshot.step_count, stats)
     
     def update_visualization(self):
         """Update the visualization canvas."""
+        self._finish_pending_step()
         show_trajectories = self.simulation_control.show_trajectories.isChecked()
         self.canvas.update_plot(self.simulation, self.config["FIELD_SIZE"], show_trajectories)
     
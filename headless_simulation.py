@@ -8,6 +8,10 @@ can run in headless environments like Replit, outputting results to the console.
 import sys
 import time
 import os
+import io
+import json
+import contextlib
+import multiprocessing as mp
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
@@ -17,6 +21,7 @@ from matplotlib.animation import FuncAnimation
 from config import DEFAULT_CONFIG
 from simulation_core import Simulation
 from gis_utils import GISData
+from checkpoint import CHECKPOINT_FILENAME, save_checkpoint, load_checkpoint, stop_requested
 
 class HeadlessSimulation:
     """Headless version of the drone swarm simulation."""
@@ -36,32 +41,57 @@ class HeadlessSimulation:
         self.step_count = 0
         self.max_steps = self.config["MAX_SIMULATION_STEPS"]
         
-        # Create output directory if it doesn't exist
+        # The output directory is created by run_simulation() once it has
+        # something to write there
         self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
     
-    def run_simulation(self, num_steps=None, generate_plots=True, save_interval=50):
+    def run_simulation(self, num_steps=None, generate_plots=True, save_interval=50,
+                       checkpoint_interval=0, resume=None):
         """
         Run the simulation for a specified number of steps.
         
+        A stop signal (see checkpoint.install_stop_handlers) writes a
+        checkpoint and ends the run after the current step.
+        
         Args:
             num_steps (int): Number of steps to run, or None for max_steps
             generate_plots (bool): Whether to generate plots during simulation
             save_interval (int): Interval at which to save plots
+            checkpoint_interval (int): Save a checkpoint to the output directory
+                every this many steps and at the end; 0 disables checkpoints
+            resume (str): Checkpoint file to continue from
         """
         if num_steps is None:
             num_steps = self.max_steps
         
+        first_step = 0
+        if resume:
+            self.simulation = load_checkpoint(resume, self.config)
+            self.step_count = first_step = self.simulation.step_count
+        checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILENAME)
+        if generate_plots or checkpoint_interval:
+            os.makedirs(self.output_dir, exist_ok=True)
+        
         print(f"Starting headless simulation with {len(self.simulation.drones)} drones, "
               f"{len(self.simulation.targets)} targets, {len(self.simulation.turrets)} turrets")
         print(f"Running for {num_steps} steps...")
         
         start_time = time.time()
         
-        for step in range(num_steps):
+        for step in range(first_step, num_steps):
             self.simulation.step()
             self.step_count += 1
             
+            if checkpoint_interval and self.step_count % checkpoint_interval == 0:
+                save_checkpoint(checkpoint_path, self.simulation, self.config)
+            
+            if stop_requested():
+                os.makedirs(self.output_dir, exist_ok=True)
+                save_checkpoint(checkpoint_path, self.simulation, self.config)
+                print(f"Stop requested at step {self.step_count}; "
+                      f"resume with --resume {checkpoint_path}")
+                return
+            
             # Print progress periodically
             if step % 10 == 0 or step == num_steps - 1:
                 stats = self.simulation.get_statistics()
@@ -80,12 +110,15 @@ class HeadlessSimulation:
         
         end_time = time.time()
         
+        if checkpoint_interval:
+            save_checkpoint(checkpoint_path, self.simulation, self.config, complete=True)
+        
         # Final statistics
         final_stats = self.simulation.get_statistics()
         print("\n--- SIMULATION COMPLETE ---")
         print(f"Total steps: {self.step_count}")
         print(f"Execution time: {end_time - start_time:.2f} seconds")
-        print(f"Steps per second: {self.step_count / (end_time - start_time):.2f}")
+        print(f"Steps per second: {(self.step_count - first_step) / max(end_time - start_time, 1e-9):.2f}")
         self._print_final_report(final_stats)
     
     def _print_stats(self, stats):
@@ -280,20 +313,94 @@ def run_demo(num_steps=200, save_interval=10):
     print("Running headless simulation demonstration...\n")
     
     # Use a smaller configuration for faster demo
+    sim = HeadlessSimulation(demo_config())
+    sim.run_simulation(num_steps=num_steps, save_interval=save_interval)
+    
+    print("\nDemo completed. Check the 'output' directory for plot images.")
+    
+    # Uncomment to generate animation if moviepy is available
+    # sim.generate_animation()
+
+def demo_config():
+    """Smaller configuration used by the demo and seed sweeps."""
     config = DEFAULT_CONFIG.copy()
     config["NUM_DRONES"] = 15
     config["NUM_TARGETS"] = 5
     config["NUM_TURRETS"] = 4
     config["NUM_OBSTACLES"] = 7
     config["WEIGHT_TURRET_AVOIDANCE"] = 2.5  # More cautious drones
+    return config
+
+def run_demo_worker(job):
+    """
+    Run one seeded simulation of a sweep in a worker process.
     
-    sim = HeadlessSimulation(config)
-    sim.run_simulation(num_steps=num_steps, save_interval=save_interval)
+    Args:
+        job (tuple): (seed, config, num_steps, output_dir)
+        
+    Returns:
+        dict: Seed, final statistics, elapsed time and drone trajectories
+    """
+    seed, config, num_steps, output_dir = job
+    np.random.seed(seed)
     
-    print("\nDemo completed. Check the 'output' directory for plot images.")
+    # Workers run without plots and keep the console for the sweep summary
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim = HeadlessSimulation(config, output_dir=os.path.join(output_dir, f"seed_{seed}"))
+        start_time = time.time()
+        sim.run_simulation(num_steps=num_steps, generate_plots=False)
+        elapsed = time.time() - start_time
     
-    # Uncomment to generate animation if moviepy is available
-    # sim.generate_animation()
+    return {
+        "seed": seed,
+        "stats": sim.simulation.get_statistics(),
+        "elapsed": elapsed,
+        "trajectories": [np.array(window) for window in sim.simulation.drone_trails()],
+    }
+
+def run_sweep(seeds, num_steps=200, config=None, processes=None, output_dir="output"):
+    """
+    Run independent seeded simulations in parallel and save the best run.
+    
+    Args:
+        seeds (list): Random seeds, one simulation per seed
+        num_steps (int): Number of steps per simulation
+        config (dict): Simulation configuration, defaults to the demo setup
+        processes (int): Worker processes, defaults to the CPU count
+        output_dir (str): Directory for the sweep results
+        
+    Returns:
+        list: Per-seed results in seed order
+    """
+    config = config or demo_config()
+    processes = processes or os.cpu_count()
+    print(f"Running {len(seeds)} simulations of {num_steps} steps on {processes} processes...")
+    
+    start_time = time.time()
+    with mp.Pool(processes) as pool:
+        results = pool.map(run_demo_worker, [(seed, config, num_steps, output_dir) for seed in seeds])
+    end_time = time.time()
+    
+    for result in results:
+        stats = result["stats"]
+        print(f"Seed {result['seed']}: {stats['targets_destroyed']}/{config['NUM_TARGETS']} targets destroyed, "
+              f"{stats['drones_alive']}/{config['NUM_DRONES']} drones alive after {stats['step_count']} steps")
+    
+    # Most targets destroyed wins, ties go to the run that kept more drones
+    best = max(results, key=lambda r: (r["stats"]["targets_destroyed"], r["stats"]["drones_alive"]))
+    os.makedirs(output_dir, exist_ok=True)
+    trajectory_path = os.path.join(output_dir, "sweep_best_trajectories.npz")
+    np.savez(trajectory_path, *best["trajectories"])
+    summary_path = os.path.join(output_dir, "sweep_summary.json")
+    with open(summary_path, "w") as f:
+        json.dump({
+            "best_seed": best["seed"],
+            "results": [{k: v for k, v in r.items() if k != "trajectories"} for r in results],
+        }, f, indent=2)
+    
+    print(f"\nSweep completed in {end_time - start_time:.2f} seconds, best seed: {best['seed']}")
+    print(f"Summary saved to {summary_path}, best trajectories to {trajectory_path}")
+    return results
 
 if __name__ == "__main__":
     # Parse command line arguments
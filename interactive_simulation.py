@@ -9,13 +9,19 @@ import os
 import time
 import sys
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for Replit compatibility
+# Cheaper Agg rasterization for frames made of many patches and short lines
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.animation import FuncAnimation
 
-from config import DEFAULT_CONFIG
+from config import DEFAULT_CONFIG, STATUS_COLORS, DEFAULT_COLOR
 from simulation_core import Simulation, Drone, Target, Turret, Obstacle
 from gis_utils import GISData
 from audio_system import SpatialAudioSystem, AUDIO_AVAILABLE
@@ -24,6 +30,26 @@ from audio_system import SpatialAudioSystem, AUDIO_AVAILABLE
 OUTPUT_DIR = "output"
 DEFAULT_MAX_STEPS = 200
 DEFAULT_DELAY = 0.1  # Seconds between steps
+PROGRESS_INTERVAL = 10  # Steps between progress reports
+AUDIO_MOVE_THRESHOLD = 0.5  # Distance a drone must move before its sound is re-panned
+MAX_PENDING_SAVES = 2  # Frames allowed to be encoding in the background at once
+
+# Advanced scenario mode flags, packed into InteractiveSimulation.mode_mask
+MODE_ENEMY_DRONES = 1 << 0
+MODE_ROCKETS = 1 << 1
+MODE_ADVANCED_AI = 1 << 2
+
+# (flag, setup method, summary line) for each advanced scenario mode
+ADVANCED_MODES = (
+    (MODE_ENEMY_DRONES, "_add_enemy_drones", "Enemy drones enabled (hunting friendly drones)"),
+    (MODE_ROCKETS, "_enable_rockets", "Anti-drone rockets enabled"),
+    (MODE_ADVANCED_AI, "_enable_advanced_ai", "Advanced AI evasion and interception tactics enabled"),
+)
+
+# Unit vectors for every 5 degrees, used by turret scan lines and debris
+SCAN_STEP_DEG = 5
+SCAN_TABLE = np.stack([np.cos(np.radians(np.arange(0, 360, SCAN_STEP_DEG))),
+                       np.sin(np.radians(np.arange(0, 360, SCAN_STEP_DEG)))], axis=1)
 
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -41,8 +67,14 @@ class InteractiveSimulation:
         self.delay = DEFAULT_DELAY
         self.running = False
         self.paused = False
+        self._pause_event = threading.Event()  # Set while running, cleared while paused
+        self._pause_event.set()
         self.simulation_thread = None
         
+        # Background PNG encoding so the simulation thread doesn't wait on savefig
+        self._viz_pool = ThreadPoolExecutor(max_workers=MAX_PENDING_SAVES)
+        self._pending_saves = deque()
+        
         # Audio system
         self.audio = None
         self.drone_sounds = {}
@@ -58,6 +90,7 @@ class InteractiveSimulation:
         self.enemy_drones_enabled = False
         self.rockets_enabled = False
         self.advanced_ai_enabled = False
+        self.mode_mask = 0
     
     def initialize_simulation(self):
         """Initialize a new simulation with current config."""
@@ -75,30 +108,52 @@ class InteractiveSimulation:
         self.previous_drone_statuses = {d.id: d.alive for d in self.simulation.drones}
         self.previous_target_statuses = {t.id: t.alive for t in self.simulation.targets}
         self.previous_turret_fired = {t.id: False for t in self.simulation.turrets}
+        self._last_audio_pos = self.simulation.drone_state.pos.copy()
         
-        # Apply advanced scenario options
-        if self.enemy_drones_enabled:
-            self._add_enemy_drones()
-            
-        if self.rockets_enabled:
-            self._enable_rockets()
-            
-        if self.advanced_ai_enabled:
-            self._enable_advanced_ai()
+        # Precompute frame-invariant render data for this configuration
+        self._specialize_renderer()
+        
+        # Apply advanced scenario options once, driven by a single mode bitfield
+        self.mode_mask = (
+            (MODE_ENEMY_DRONES if self.enemy_drones_enabled else 0) |
+            (MODE_ROCKETS if self.rockets_enabled else 0) |
+            (MODE_ADVANCED_AI if self.advanced_ai_enabled else 0)
+        )
+        enabled_modes = [(setup, summary) for flag, setup, summary in ADVANCED_MODES
+                         if self.mode_mask & flag]
+        for setup, _ in enabled_modes:
+            getattr(self, setup)()
         
         print(f"\nSimulation initialized with:")
         print(f"- {self.config['NUM_DRONES']} friendly drones")
         print(f"- {self.config['NUM_TARGETS']} targets")
         print(f"- {self.config['NUM_TURRETS']} defensive turrets")
         print(f"- {self.config['NUM_OBSTACLES']} terrain obstacles")
-        if self.enemy_drones_enabled:
-            print(f"- Enemy drones enabled (hunting friendly drones)")
-        if self.rockets_enabled:
-            print(f"- Anti-drone rockets enabled")
-        if self.advanced_ai_enabled:
-            print(f"- Advanced AI evasion and interception tactics enabled")
+        for _, summary in enabled_modes:
+            print(f"- {summary}")
         print()
     
+    def _specialize_renderer(self):
+        """
+        Precompute render data that is fixed for the lifetime of a simulation.
+        
+        Field size, obstacle and turret geometry never change after
+        initialization, so they are resolved once here instead of being
+        looked up on every frame. Turret scan-line endpoints are folded
+        for every scan angle in SCAN_TABLE.
+        """
+        turrets = self.simulation.turrets
+        turret_pos = np.array([t.pos for t in turrets], dtype=float).reshape(-1, 2)
+        turret_range = np.array([t.range for t in turrets], dtype=float)
+        scan_ends = turret_pos[:, None, :] + (turret_range * 0.7)[:, None, None] * SCAN_TABLE[None, :, :]
+        
+        self._render_spec = {
+            "field_size": self.simulation.config["FIELD_SIZE"],
+            "obstacles": [(tuple(o.pos), o.radius) for o in self.simulation.obstacles],
+            "turrets": [(tuple(t.pos), t.range) for t in turrets],
+            "scan_ends": scan_ends,
+        }
+    
     def _add_enemy_drones(self):
         """Add enemy drones that hunt friendly drones."""
         # This is a placeholder for actual implementation
@@ -136,6 +191,7 @@ class InteractiveSimulation:
             
         self.running = True
         self.paused = False
+        self._pause_event.set()
         
         # Start in a separate thread to not block the main thread
         self.simulation_thread = threading.Thread(target=self._run_simulation)
@@ -146,8 +202,11 @@ class InteractiveSimulation:
         
     def _run_simulation(self):
         """Run the simulation steps in a loop."""
+        next_deadline = time.monotonic()
         while self.running and self.step_count < self.max_steps:
-            if not self.paused:
+            # Block while paused instead of spinning on the flag
+            self._pause_event.wait()
+            if self.running:
                 # Step the simulation
                 self.simulation.step()
                 self.step_count += 1
@@ -160,11 +219,12 @@ class InteractiveSimulation:
                 if self.step_count % 5 == 0 or self.step_count == 1:
                     self._generate_visualization()
                 
-                # Print progress
-                drones_alive = sum(1 for d in self.simulation.drones if d.alive)
-                targets_alive = sum(1 for t in self.simulation.targets if t.alive)
-                print(f"Step {self.step_count}: Drones active: {drones_alive}/{len(self.simulation.drones)}, "
-                      f"Targets remaining: {targets_alive}/{len(self.simulation.targets)}")
+                # Print progress at a coarser cadence to keep I/O out of the step loop
+                if self.step_count % PROGRESS_INTERVAL == 0:
+                    drones_alive = sum(1 for d in self.simulation.drones if d.alive)
+                    targets_alive = sum(1 for t in self.simulation.targets if t.alive)
+                    print(f"Step {self.step_count}: Drones active: {drones_alive}/{len(self.simulation.drones)}, "
+                          f"Targets remaining: {targets_alive}/{len(self.simulation.targets)}")
                 
                 # Check if simulation is complete
                 if self.simulation.is_complete():
@@ -180,8 +240,12 @@ class InteractiveSimulation:
                     self.running = False
                     break
                 
-                # Wait for delay time
-                time.sleep(self.delay)
+                # Pace against a monotonic deadline so step time doesn't add to the delay
+                if self.delay > 0:
+                    next_deadline = max(next_deadline + self.delay, time.monotonic())
+                    time.sleep(max(0.0, next_deadline - time.monotonic()))
+        
+        self._flush_visualizations()
         
         if self.step_count >= self.max_steps:
             print(f"\n=== SIMULATION REACHED MAX STEPS ({self.max_steps}) ===")
@@ -194,8 +258,14 @@ class InteractiveSimulation:
         # Update all playing sounds with their current positions
         self.audio.update_active_sounds()
         
+        # Only re-pan drones that moved a perceptible distance since their last update
+        drones = self.simulation.drones
+        positions = self.simulation.drone_state.pos
+        delta = positions - self._last_audio_pos
+        moved = (delta * delta).sum(axis=1) > AUDIO_MOVE_THRESHOLD ** 2
+        
         # Handle drone sounds - buzzing, movement, destruction
-        for drone in self.simulation.drones:
+        for i, drone in enumerate(drones):
             # If drone was alive but is now destroyed, play destruction sound
             if self.previous_drone_statuses.get(drone.id, False) and not drone.alive:
                 # Play drone destroyed sound at drone position
@@ -214,9 +284,11 @@ class InteractiveSimulation:
                     if sound_id:
                         self.drone_sounds[drone.id] = sound_id
                 # Otherwise update the position of existing sound
-                elif drone.id in self.drone_sounds:
+                elif moved[i]:
                     self.audio.update_sound_position(self.drone_sounds[drone.id], drone.pos[0], drone.pos[1])
         
+        self._last_audio_pos[moved] = positions[moved]
+        
         # Handle turret sounds - alerts and firing
         for turret in self.simulation.turrets:
             # Check if turret just fired (cooldown timer just became active)
@@ -249,18 +321,22 @@ class InteractiveSimulation:
     def pause_simulation(self):
         """Pause the simulation."""
         self.paused = True
+        self._pause_event.clear()
         print("Simulation paused. Press 'r' to resume.")
     
     def resume_simulation(self):
         """Resume the simulation."""
         self.paused = False
+        self._pause_event.set()
         print("Simulation resumed.")
     
     def stop_simulation(self):
         """Stop the simulation."""
         self.running = False
+        self._pause_event.set()  # Wake a paused thread so it can exit
         if self.simulation_thread and self.simulation_thread.is_alive():
             self.simulation_thread.join(timeout=1.0)
+        self._flush_visualizations()
         
         # Clean up audio resources
         if self.audio:
@@ -300,14 +376,17 @@ class InteractiveSimulation:
     def _generate_visualization(self, is_final=False):
         """Generate a military-style visualization of the current state."""
         # Create figure with military style dark theme
-        fig, ax = plt.subplots(figsize=(12, 10), facecolor='#0a1929')
+        # A standalone Figure (not registered with pyplot) can be saved from a worker thread
+        fig = Figure(figsize=(12, 10), facecolor='#0a1929')
+        ax = fig.add_subplot()
         ax.set_facecolor('#132f4c')
         
         # Grid and border styling for military look
         ax.grid(color='#1e4976', linestyle='--', linewidth=0.5, alpha=0.5)
         
         # Set plot limits and labels with military styling
-        field_size = self.simulation.config["FIELD_SIZE"]
+        spec = self._render_spec
+        field_size = spec["field_size"]
         ax.set_xlim(0, field_size)
         ax.set_ylim(0, field_size)
         
@@ -326,18 +405,18 @@ class InteractiveSimulation:
             spine.set_linewidth(2)
         
         # Plot terrain features (obstacles) with enhanced visual style
-        for obstacle in self.simulation.obstacles:
+        for obstacle_pos, obstacle_radius in spec["obstacles"]:
             # Mountain/terrain feature
             circle = plt.Circle(
-                obstacle.pos, 
-                obstacle.radius, 
+                obstacle_pos, 
+                obstacle_radius, 
                 color='#654321', 
                 alpha=0.8
             )
             # Terrain elevation contours
             contour_circle = plt.Circle(
-                obstacle.pos, 
-                obstacle.radius * 1.2, 
+                obstacle_pos, 
+                obstacle_radius * 1.2, 
                 color='#654321', 
                 alpha=0.3,
                 fill=False,
@@ -347,26 +426,28 @@ class InteractiveSimulation:
             ax.add_patch(contour_circle)
         
         # Plot defensive turrets with enhanced military styling
-        for turret in self.simulation.turrets:
+        # Rotating scan angle is shared by all turrets this frame
+        scan_idx = self.step_count % len(SCAN_TABLE)
+        for k, (turret_pos, turret_range) in enumerate(spec["turrets"]):
             # Main turret body
             circle = plt.Circle(
-                turret.pos, 
+                turret_pos, 
                 1.5, 
                 color='#ff2a2a', 
                 alpha=0.9
             )
             # Turret effective range
             range_circle = plt.Circle(
-                turret.pos, 
-                turret.range, 
+                turret_pos, 
+                turret_range, 
                 color='#ff2a2a', 
                 alpha=0.15,
                 linestyle='--'
             )
             # Maximum engagement range
             max_range_circle = plt.Circle(
-                turret.pos, 
-                turret.range * 1.1, 
+                turret_pos, 
+                turret_range * 1.1, 
                 color='#ff2a2a', 
                 alpha=0.05,
                 linestyle=':',
@@ -377,12 +458,9 @@ class InteractiveSimulation:
             ax.add_patch(max_range_circle)
             
             # Add targeting lines (simulated active turret scanning)
-            scan_angle = (self.step_count * 5) % 360  # Rotating scan
-            length = turret.range * 0.7
-            dx = length * np.cos(np.radians(scan_angle))
-            dy = length * np.sin(np.radians(scan_angle))
-            ax.plot([turret.pos[0], turret.pos[0] + dx], 
-                    [turret.pos[1], turret.pos[1] + dy], 
+            end_x, end_y = spec["scan_ends"][k, scan_idx]
+            ax.plot([turret_pos[0], end_x], 
+                    [turret_pos[1], end_y], 
                     color='#ff2a2a', linestyle='-', alpha=0.4, linewidth=0.7)
         
         # Plot targets (objectives) with enhanced military styling
@@ -414,11 +492,21 @@ class InteractiveSimulation:
                 ax.add_patch(perimeter)
         
         # Plot drones with enhanced military styling and status indicators
-        from config import STATUS_COLORS, DEFAULT_COLOR
-        
-        for i, drone in enumerate(self.simulation.drones):
+        get_color = STATUS_COLORS.get
+        
+        # Velocity norms for all drones in one batched call
+        drones = self.simulation.drones
+        drone_state = self.simulation.drone_state
+        positions = drone_state.pos
+        velocities = drone_state.velocity
+        speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+        alive = drone_state.alive.copy()
+        arrow_mask = alive & (speeds > 0.1)
+        arrow_colors = []
+        
+        for i, drone in enumerate(drones):
             if drone.alive:
-                color = STATUS_COLORS.get(drone.status, DEFAULT_COLOR)
+                color = get_color(drone.status, DEFAULT_COLOR)
                 
                 # Drone body
                 circle = plt.Circle(
@@ -429,19 +517,9 @@ class InteractiveSimulation:
                 )
                 ax.add_patch(circle)
                 
-                # Draw velocity vector (movement direction and speed indicator)
-                if np.linalg.norm(drone.velocity) > 0.1:
-                    velocity = drone.velocity / np.linalg.norm(drone.velocity) * 2
-                    ax.arrow(
-                        drone.pos[0], 
-                        drone.pos[1], 
-                        velocity[0], 
-                        velocity[1], 
-                        head_width=0.4, 
-                        head_length=0.7, 
-                        fc=color, 
-                        ec=color
-                    )
+                # Velocity vectors are drawn in one batch after the loop
+                if arrow_mask[i]:
+                    arrow_colors.append(color)
                 
                 # Add drone ID
                 ax.text(drone.pos[0], drone.pos[1], f"{i+1}", 
@@ -453,14 +531,11 @@ class InteractiveSimulation:
                     # Get last positions from trajectory
                     # More advanced - use variable segment length based on status
                     history_len = 15 if drone.status == "Attacking" else 10
-                    history_len = min(history_len, len(drone.trajectory))
-                    
-                    # Get the trajectory points safely
-                    trajectory_points = list(drone.trajectory)
-                    recent_points = trajectory_points[-history_len:] if history_len > 0 else trajectory_points
                     
-                    traj_x = [pos[0] for pos in recent_points]
-                    traj_y = [pos[1] for pos in recent_points]
+                    # Recent points come back as one (n, 2) array from the ring buffer
+                    recent_points = drone.trajectory.recent(history_len)
+                    traj_x = recent_points[:, 0]
+                    traj_y = recent_points[:, 1]
                     
                     # Simple line for trajectory
                     ax.plot(traj_x, traj_y, color=color, alpha=0.4, linewidth=1)
@@ -472,35 +547,53 @@ class InteractiveSimulation:
                                   color=color, s=10, marker='>')
             else:
                 # Advanced visualization for destroyed drones
+                px, py = drone.pos[0], drone.pos[1]
                 # Explosion effect
-                ax.scatter(drone.pos[0], drone.pos[1], s=40, color='#ff6600', alpha=0.7)
+                ax.scatter(px, py, s=40, color='#ff6600', alpha=0.7)
                 
                 # Debris pattern
                 for j in range(3):
-                    angle = j * 120 + (i * 40 % 360)  # Randomized debris pattern
+                    angle = (j * 120 + (i * 40 % 360)) % 360  # Randomized debris pattern
                     dist = 0.8
-                    dx = dist * np.cos(np.radians(angle))
-                    dy = dist * np.sin(np.radians(angle))
-                    ax.plot([drone.pos[0], drone.pos[0] + dx], 
-                            [drone.pos[1], drone.pos[1] + dy],
+                    dx, dy = dist * SCAN_TABLE[angle // SCAN_STEP_DEG]
+                    ax.plot([px, px + dx], 
+                            [py, py + dy],
                             color='#ff6600', alpha=0.5, linewidth=0.7)
                 
                 # X marker for destroyed 
                 ax.plot(
-                    [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                    [drone.pos[1] - 0.5, drone.pos[1] + 0.5], 
+                    [px - 0.5, px + 0.5], 
+                    [py - 0.5, py + 0.5], 
                     color='red', 
                     linewidth=2
                 )
                 ax.plot(
-                    [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                    [drone.pos[1] + 0.5, drone.pos[1] - 0.5], 
+                    [px - 0.5, px + 0.5], 
+                    [py + 0.5, py - 0.5], 
                     color='red', 
                     linewidth=2
                 )
         
+        # Draw velocity vectors (movement direction and speed indicator)
+        if arrow_colors:
+            unit = velocities[arrow_mask] / np.maximum(speeds[arrow_mask, None], 1e-9) * 2
+            ax.quiver(
+                positions[arrow_mask, 0], 
+                positions[arrow_mask, 1], 
+                unit[:, 0], 
+                unit[:, 1], 
+                color=arrow_colors, 
+                angles='xy', 
+                scale_units='xy', 
+                scale=1, 
+                units='xy', 
+                width=0.1, 
+                headwidth=4, 
+                headlength=7, 
+                headaxislength=6
+            )
+        
         # Add legend for drone status with military styling
-        from config import STATUS_COLORS
         legend_elements = [
             plt.Line2D([0], [0], marker='o', color='w', 
                       markerfacecolor=color, markersize=10, label=status)
@@ -548,11 +641,23 @@ class InteractiveSimulation:
         # Save the plot with high quality
         filename = f"tactical_view_{self.step_count:03d}.png" if not is_final else "final_tactical_view.png"
         filepath = os.path.join(OUTPUT_DIR, filename)
-        plt.savefig(filepath, dpi=150, facecolor='#0a1929', bbox_inches='tight')
-        plt.close(fig)
+        # Bound the number of frames in flight, then encode this one in the background
+        while len(self._pending_saves) >= MAX_PENDING_SAVES:
+            self._pending_saves.popleft().result()
+        self._pending_saves.append(self._viz_pool.submit(self._save_png, fig, filepath))
         
         print(f"Generated visualization at step {self.step_count}")
         return filepath
+    
+    @staticmethod
+    def _save_png(fig, filepath):
+        """Encode and write a rendered figure to disk."""
+        fig.savefig(filepath, dpi=150, facecolor='#0a1929', bbox_inches='tight')
+    
+    def _flush_visualizations(self):
+        """Wait for all queued visualization frames to be written."""
+        while self._pending_saves:
+            self._pending_saves.popleft().result()
 
     def configure_simulation(self):
         """Allow user to configure simulation parameters."""
@@ -35,8 +35,17 @@ if __name__ == "__main__":
     if is_headless():
         print("Running in headless environment, launching command-line version...")
         try:
-            from headless_simulation import run_demo
-            run_demo(num_steps=200)
+            # "--sweep N" runs N seeded simulations in parallel instead of the demo
+            if "--sweep" in sys.argv:
+                count = sys.argv[sys.argv.index("--sweep") + 1:][:1]
+                if not count or not count[0].isdigit() or int(count[0]) < 1:
+                    print("Usage: python main.py --sweep N  (N = number of seeded runs, at least 1)")
+                    sys.exit(2)
+                from headless_simulation import run_sweep
+                run_sweep(list(range(int(count[0]))), num_steps=200)
+            else:
+                from headless_simulation import run_demo
+                run_demo(num_steps=200)
         except Exception as e:
             print(f"Error running headless simulation: {e}")
             sys.exit(1)
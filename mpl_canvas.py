@@ -2,17 +2,52 @@
 Matplotlib canvas for visualization of the drone swarm simulation.
 """
 
+import os
 import numpy as np
 import matplotlib
-matplotlib.use('Qt5Agg')  # Set the backend
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+
+# Setting DRONE_SIM_HEADLESS_CANVAS=1 renders on plain Agg into memory without
+# importing Qt, e.g. for piping frames to a video encoder. It is opt-in only:
+# offscreen Qt (QT_QPA_PLATFORM=offscreen) and an ambient Agg backend (e.g.
+# MPLBACKEND=Agg) still get the Qt widget and toolbar the GUI needs. The Agg
+# backend is only selected when none has been yet, since switching resets
+# matplotlib's cached state
+_backend = matplotlib.get_backend(auto_select=False)
+HEADLESS = os.environ.get('DRONE_SIM_HEADLESS_CANVAS') == '1'
+if HEADLESS:
+    if _backend is None:
+        matplotlib.use('Agg')
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+else:
+    if _backend is None or _backend.lower() not in ('qt5agg', 'qtagg'):
+        matplotlib.use('Qt5Agg', force=False)  # Set the backend
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+    from PyQt5.QtWidgets import QSizePolicy
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from PyQt5.QtWidgets import QSizePolicy
+from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
 
 from config import STATUS_COLORS, DEFAULT_COLOR
+from simulation_core import DRONE_STATUSES, status_id
+
+LOW_FUEL_ID = status_id("LowFuel")
+
+# Label strings for small integers (drone IDs, assignment counts)
+INT_STRINGS = [str(i) for i in range(1024)]
+
+
+def int_str(value):
+    """Format a non-negative integer label, using the precomputed strings when possible."""
+    return INT_STRINGS[value] if 0 <= value < len(INT_STRINGS) else str(value)
+
+
+# Unit circle sampled once; cooldown wedges take a prefix of it per frame
+ARC_SAMPLES = 64
+_arc_angles = np.linspace(0.0, 2.0 * np.pi, ARC_SAMPLES + 1)
+UNIT_ARC = np.column_stack((np.cos(_arc_angles), np.sin(_arc_angles)))
 
 
 class SimulationCanvas(FigureCanvas):
@@ -23,7 +58,7 @@ class SimulationCanvas(FigureCanvas):
         Initialize the simulation canvas.
         
         Args:
-            parent: Parent widget
+            parent: Parent widget (ignored on the headless Agg canvas)
             width (int): Width in inches
             height (int): Height in inches
             dpi (int): Resolution in dots per inch
@@ -31,241 +66,463 @@ class SimulationCanvas(FigureCanvas):
         self.fig = Figure(figsize=(width, height), dpi=dpi)
         self.axes = self.fig.add_subplot(111)
         
-        # Initialize empty collections for all entities
-        self.drone_markers = []
+        # Persistent artists, created once per scene in init_plot()
+        self.drone_markers = None
+        self.drone_labels = []
+        self._label_status = np.empty(0, dtype=np.int16)
+        self.drone_arrows = None
+        self.fuel_gauges = []
+        self.destroyed_markers = None
         self.target_markers = []
-        self.obstacle_markers = []
-        self.turret_markers = []
-        self.trajectory_lines = []
+        self.target_labels = []
+        self.obstacle_markers = None
+        self.turret_markers = None
+        self.cooldown_arcs = None
+        self.trajectory_lines = None
+        self._animated_artists = []
+        self._scene_key = None
+        self._background = None
+        self._max_fuel = 1.0
+        self._terrain_image = None
+        self._terrain_source = None
+        
+        # RGBA colour per status id, extended when new statuses appear
+        self._status_colors_rgba = np.empty((0, 4))
         
-        # Enhanced visual style
+        # Enhanced visual style; axes decorations are set up once and
+        # survive scene rebuilds, since reset_plot() never clears the axes
         self.fig.patch.set_facecolor('#f0f0f0')
         self.axes.set_facecolor('#e6e6e6')
         self.axes.grid(True, linestyle='--', alpha=0.7)
+        self.axes.set_title("Drone Swarm Simulation")
+        self.axes.set_xlabel("X Position")
+        self.axes.set_ylabel("Y Position")
+        self._layout_done = False
+        
+        # Status colours are constant, so the legend is built once and
+        # stays in the static background used for blitting
+        legend_elements = [
+            patches.Patch(facecolor=color, edgecolor='black', label=status)
+            for status, color in STATUS_COLORS.items()
+        ]
+        self._legend = self.axes.legend(handles=legend_elements, loc='upper right', title="Drone Status")
         
         super(SimulationCanvas, self).__init__(self.fig)
-        self.setParent(parent)
+        if not HEADLESS:
+            self.setParent(parent)
+            
+            FigureCanvas.setSizePolicy(self,
+                                      QSizePolicy.Expanding,
+                                      QSizePolicy.Expanding)
+            FigureCanvas.updateGeometry(self)
         
-        FigureCanvas.setSizePolicy(self,
-                                  QSizePolicy.Expanding,
-                                  QSizePolicy.Expanding)
-        FigureCanvas.updateGeometry(self)
+        # Every full redraw (resize, zoom, pan) refreshes the blit background
+        self.mpl_connect('draw_event', self._on_draw)
     
     def reset_plot(self):
         """Clear all markers and reset the plot."""
-        self.axes.clear()
-        self.drone_markers = []
+        # Remove only the scene artists; ticks, grid, labels and legend are kept
+        axes = self.axes
+        for artist in (*axes.patches, *axes.lines, *axes.collections, *axes.texts, *axes.images):
+            artist.remove()
+        self._terrain_image = None
+        self._terrain_source = None
+        self.drone_markers = None
+        self.drone_labels = []
+        self.drone_arrows = None
+        self.fuel_gauges = []
+        self.destroyed_markers = None
         self.target_markers = []
-        self.obstacle_markers = []
-        self.turret_markers = []
-        self.trajectory_lines = []
+        self.target_labels = []
+        self.obstacle_markers = None
+        self.turret_markers = None
+        self.cooldown_arcs = None
+        self.trajectory_lines = None
+        self._animated_artists = []
+        self._scene_key = None
+        self._background = None
     
-    def update_plot(self, simulation, field_size=100.0, show_trajectories=True):
+    def _add_animated(self, artist):
+        """Register an artist that is redrawn on every frame via blitting."""
+        artist.set_animated(True)
+        self._animated_artists.append(artist)
+        return artist
+    
+    def _add_circles(self, centers, radii, color, alpha):
         """
-        Update the plot with current simulation state.
+        Add a static layer of filled circles as a single collection.
+        
+        Args:
+            centers: Circle centers in data coordinates
+            radii: Circle radii in data units
+            color: Fill colour shared by all circles
+            alpha (float): Opacity shared by all circles
+            
+        Returns:
+            EllipseCollection: The added collection
+        """
+        diameters = 2.0 * np.asarray(radii, dtype=float)
+        circles = EllipseCollection(
+            diameters, 
+            diameters, 
+            np.zeros_like(diameters), 
+            units='xy', 
+            offsets=np.asarray(centers, dtype=float).reshape(-1, 2), 
+            offset_transform=self.axes.transData, 
+            facecolors=color, 
+            edgecolors=color, 
+            alpha=alpha
+        )
+        return self.axes.add_collection(circles, autolim=False)
+    
+    def _status_colors(self):
+        """
+        Get the RGBA colour table indexed by drone status id.
+        
+        Returns:
+            np.ndarray: Array of shape (len(DRONE_STATUSES), 4)
+        """
+        if len(self._status_colors_rgba) != len(DRONE_STATUSES):
+            self._status_colors_rgba = to_rgba_array(
+                [STATUS_COLORS.get(name, DEFAULT_COLOR) for name in DRONE_STATUSES]
+            )
+        return self._status_colors_rgba
+    
+    def _scene_signature(self, simulation, field_size):
+        """
+        Identify the static scene so the plot is only rebuilt when it changes.
+        
+        Args:
+            simulation: The simulation object, or a snapshot of it
+            field_size (float): Size of the simulation field
+            
+        Returns:
+            tuple: Key that changes whenever init_plot() must run again
+        """
+        # Snapshots are new objects every frame but share the source id of
+        # the simulation they were taken from
+        return (
+            simulation.source_id,
+            simulation.generation,
+            field_size,
+            len(simulation.drones),
+            len(simulation.targets),
+            len(simulation.obstacles),
+            len(simulation.turrets),
+        )
+    
+    def init_plot(self, simulation, field_size=100.0):
+        """
+        Build the static scene and the pooled per-entity artists once.
         
         Args:
             simulation: The simulation object
             field_size (float): Size of the simulation field
-            show_trajectories (bool): Whether to show drone trajectories
         """
-        # Clear previous plot
         self.reset_plot()
+        axes = self.axes
+        self._max_fuel = simulation.config["DRONE_MAX_FUEL"]
         
         # Set plot limits
-        self.axes.set_xlim(0, field_size)
-        self.axes.set_ylim(0, field_size)
-        self.axes.set_title("Drone Swarm Simulation")
-        self.axes.set_xlabel("X Position")
-        self.axes.set_ylabel("Y Position")
+        axes.set_xlim(0, field_size)
+        axes.set_ylim(0, field_size)
         
         # Plot GIS data if available
-        if simulation.gis and hasattr(simulation.gis, 'dem_array') and simulation.gis.dem_array is not None:
-            try:
+        self._update_terrain(simulation, field_size)
+        
+        # Obstacles and turrets never move, so each layer is one collection
+        # in the static background
+        self.obstacle_markers = self._add_circles(
+            [obstacle.pos for obstacle in simulation.obstacles],
+            [obstacle.radius for obstacle in simulation.obstacles],
+            color='brown', 
+            alpha=0.7
+        )
+        self._add_circles(
+            [turret.pos for turret in simulation.turrets],
+            [turret.range for turret in simulation.turrets],
+            color='red', 
+            alpha=0.1
+        )
+        self.turret_markers = self._add_circles(
+            [turret.pos for turret in simulation.turrets],
+            [1.0] * len(simulation.turrets),
+            color='red', 
+            alpha=0.9
+        )
+        
+        # Only the cooldown arcs animate, all turrets share one collection
+        self._turret_pos = np.array([turret.pos for turret in simulation.turrets], dtype=float).reshape(-1, 2)
+        self.cooldown_arcs = self._add_animated(
+            axes.add_collection(PolyCollection([], facecolors='orange', edgecolors='orange'), autolim=False)
+        )
+        
+        # Targets toggle visibility when destroyed
+        for target in simulation.targets:
+            target_marker = plt.Rectangle(
+                (target.pos[0] - 1.5, target.pos[1] - 1.5), 
+                3, 3, 
+                color='green', 
+                alpha=0.8
+            )
+            label = axes.text(
+                target.pos[0], 
+                target.pos[1] + 3, 
+                "", 
+                ha='center', 
+                color='black', 
+                clip_on=True,
+                visible=False,
+                bbox=dict(facecolor='white', alpha=0.7, boxstyle='round,pad=0.2')
+            )
+            self.target_markers.append(self._add_animated(axes.add_patch(target_marker)))
+            self.target_labels.append(self._add_animated(label))
+        
+        # Trajectories of all drones share one collection under the markers
+        self.trajectory_lines = self._add_animated(
+            axes.add_collection(LineCollection([], alpha=0.5, linewidths=1))
+        )
+        
+        # All living drones are drawn by one scatter, sized in _on_draw()
+        self.drone_markers = self._add_animated(
+            axes.scatter(np.empty(0), np.empty(0), marker='o', alpha=0.9, edgecolors='face')
+        )
+        
+        # Velocity arrows for every drone slot in a single quiver; hidden
+        # arrows get NaN components, which quiver masks out
+        num_drones = len(simulation.drones)
+        self.drone_arrows = self._add_animated(axes.quiver(
+            np.zeros(num_drones), 
+            np.zeros(num_drones), 
+            np.full(num_drones, np.nan), 
+            np.full(num_drones, np.nan), 
+            angles='xy', 
+            scale_units='xy', 
+            scale=1, 
+            units='xy', 
+            width=0.1, 
+            headwidth=4, 
+            headlength=7, 
+            headaxislength=6
+        ))
+        
+        for drone in simulation.drones:
+            gauge = patches.Rectangle((0, 0), 0, 0.3, color='yellow', visible=False)
+            self.fuel_gauges.append(self._add_animated(axes.add_patch(gauge)))
+        
+        # Destroyed drones are marked with an X by a second scatter
+        self.destroyed_markers = self._add_animated(
+            axes.scatter(np.empty(0), np.empty(0), marker='x', c='red', linewidths=2)
+        )
+        
+        # ID labels are pooled per drone; the text itself never changes
+        for drone in simulation.drones:
+            label = axes.text(
+                drone.pos[0], 
+                drone.pos[1] + 1, 
+                int_str(drone.id), 
+                ha='center', 
+                va='center', 
+                color='white',
+                fontsize=8,
+                clip_on=True,
+                visible=False,
+                bbox=dict(facecolor=DEFAULT_COLOR, alpha=0.7, boxstyle='round,pad=0.1')
+            )
+            self.drone_labels.append(self._add_animated(label))
+        
+        # Status shown by each label, so colours are only pushed on change
+        self._label_status = np.full(len(simulation.drones), -1, dtype=np.int16)
+        
+        # Layout only depends on the decorations, so solve it once
+        if not self._layout_done:
+            self.fig.tight_layout()
+            self._layout_done = True
+        self._scene_key = self._scene_signature(simulation, field_size)
+    
+    def _update_terrain(self, simulation, field_size):
+        """
+        Show the simulation's DEM, uploading it only when the array changes.
+        
+        Args:
+            simulation: The simulation object
+            field_size (float): Size of the simulation field
+            
+        Returns:
+            bool: True if the terrain layer changed and the background is stale
+        """
+        dem_array = getattr(simulation.gis, 'dem_array', None) if simulation.gis else None
+        if dem_array is self._terrain_source:
+            return False
+        self._terrain_source = dem_array
+        
+        if dem_array is None:
+            if self._terrain_image is not None:
+                self._terrain_image.remove()
+                self._terrain_image = None
+            return True
+        
+        extent = [0, field_size, 0, field_size]  # Adjust as needed for your GIS data
+        try:
+            if self._terrain_image is None:
                 # Simple heat map of terrain
-                extent = [0, field_size, 0, field_size]  # Adjust as needed for your GIS data
-                terrain = self.axes.imshow(
-                    simulation.gis.dem_array,
+                self._terrain_image = self.axes.imshow(
+                    dem_array,
                     cmap='terrain',
                     extent=extent,
                     alpha=0.4,
-                    origin='lower'
+                    origin='lower',
+                    interpolation='nearest'
                 )
                 # Could add a colorbar for elevation
-                # self.fig.colorbar(terrain, ax=self.axes, label='Elevation (m)')
-            except Exception as e:
-                print(f"Error displaying terrain: {e}")
-        
-        # Plot obstacles
-        for obstacle in simulation.obstacles:
-            circle = plt.Circle(
-                obstacle.pos, 
-                obstacle.radius, 
-                color='brown', 
-                alpha=0.7
-            )
-            self.axes.add_patch(circle)
-        
-        # Plot turrets with range indicator
-        for turret in simulation.turrets:
-            # Draw turret
-            turret_marker = plt.Circle(
-                turret.pos, 
-                1.0, 
-                color='red', 
-                alpha=0.9
-            )
-            self.axes.add_patch(turret_marker)
-            
-            # Draw range
-            range_circle = plt.Circle(
-                turret.pos, 
-                turret.range, 
-                color='red', 
-                alpha=0.1, 
-                fill=True
-            )
-            self.axes.add_patch(range_circle)
-            
-            # Draw cooldown indicator
+                # self.fig.colorbar(self._terrain_image, ax=self.axes, label='Elevation (m)')
+                self.axes.set_xlim(0, field_size)
+                self.axes.set_ylim(0, field_size)
+            else:
+                self._terrain_image.set_data(dem_array)
+                self._terrain_image.set_extent(extent)
+                self._terrain_image.autoscale()
+        except Exception as e:
+            print(f"Error displaying terrain: {e}")
+        return True
+    
+    def _on_draw(self, event):
+        """Cache the static background after a full redraw and overlay the animated artists."""
+        if self.drone_markers is not None:
+            # Scatter sizes are in points, keep the 0.7 data-unit radius and
+            # the 1 data-unit wide X at the current zoom
+            x0, x1 = self.axes.transData.transform([(0, 0), (1, 0)])[:, 0]
+            unit_pts = abs(x1 - x0) * 72.0 / self.fig.dpi
+            self.drone_markers.set_sizes([(1.4 * unit_pts) ** 2])
+            self.destroyed_markers.set_sizes([unit_pts ** 2])
+        self._background = self.copy_from_bbox(self.axes.bbox)
+        for artist in self._animated_artists:
+            self.axes.draw_artist(artist)
+    
+    def update_plot(self, simulation, field_size=100.0, show_trajectories=True):
+        """
+        Update the plot with current simulation state.
+        
+        Args:
+            simulation: The simulation object or a SimulationSnapshot of it
+            field_size (float): Size of the simulation field
+            show_trajectories (bool): Whether to show drone trajectories
+        """
+        full_redraw = self._scene_key != self._scene_signature(simulation, field_size)
+        if full_redraw:
+            self.init_plot(simulation, field_size)
+        elif self._update_terrain(simulation, field_size):
+            full_redraw = True
+        
+        # Turret cooldown indicators: annular wedges cut from the arc table
+        cooldown_verts = []
+        for k, turret in enumerate(simulation.turrets):
             if turret.cooldown_timer > 0:
                 cooldown_pct = turret.cooldown_timer / turret.cooldown_max
-                arc = patches.Wedge(
-                    turret.pos, 
-                    1.5, 
-                    0, 
-                    360 * cooldown_pct, 
-                    width=0.3, 
-                    color='orange'
-                )
-                self.axes.add_patch(arc)
+                steps = max(1, int(round(ARC_SAMPLES * min(cooldown_pct, 1.0))))
+                arc = UNIT_ARC[:steps + 1]
+                center = self._turret_pos[k]
+                cooldown_verts.append(np.concatenate((center + arc * 1.5, center + arc[::-1] * 1.2)))
+        self.cooldown_arcs.set_verts(cooldown_verts)
         
-        # Plot targets
-        for target in simulation.targets:
-            if target.alive:
-                target_marker = plt.Rectangle(
-                    (target.pos[0] - 1.5, target.pos[1] - 1.5), 
-                    3, 3, 
-                    color='green', 
-                    alpha=0.8
-                )
-                self.axes.add_patch(target_marker)
-                
-                # Show assigned drones count
-                if target.assigned_drones > 0:
-                    self.axes.text(
-                        target.pos[0], 
-                        target.pos[1] + 3, 
-                        f"{target.assigned_drones}", 
-                        ha='center', 
-                        color='black', 
-                        bbox=dict(facecolor='white', alpha=0.7, boxstyle='round,pad=0.2')
-                    )
-        
-        # Plot drones and their trajectories
-        for drone in simulation.drones:
-            # Get status color or default
-            color = STATUS_COLORS.get(drone.status, DEFAULT_COLOR)
+        # Targets
+        for target, marker, label in zip(simulation.targets, self.target_markers, self.target_labels):
+            marker.set_visible(target.alive)
             
-            # Plot drone
-            if drone.alive:
-                drone_marker = plt.Circle(
-                    drone.pos, 
-                    0.7, 
-                    color=color, 
-                    alpha=0.9
-                )
-                self.axes.add_patch(drone_marker)
-                
-                # Display drone ID
-                self.axes.text(
-                    drone.pos[0], 
-                    drone.pos[1] + 1, 
-                    f"{drone.id}", 
-                    ha='center', 
-                    va='center', 
-                    color='white',
-                    fontsize=8,
-                    bbox=dict(facecolor=color, alpha=0.7, boxstyle='round,pad=0.1')
-                )
-                
-                # Plot sensor range (optional, can be disabled for clarity)
-                # sensor_range = plt.Circle(
-                #     drone.pos, 
-                #     drone.config["DRONE_SENSOR_RANGE"], 
-                #     color=color, 
-                #     alpha=0.05, 
-                #     fill=True
-                # )
-                # self.axes.add_patch(sensor_range)
-                
-                # Plot trajectories if enabled
-                if show_trajectories and len(drone.trajectory) > 1:
-                    traj_x = [pos[0] for pos in drone.trajectory]
-                    traj_y = [pos[1] for pos in drone.trajectory]
-                    self.axes.plot(traj_x, traj_y, color=color, alpha=0.5, linewidth=1)
-                
-                # Plot velocity vector (direction)
-                if np.linalg.norm(drone.velocity) > 0.1:
-                    vel_norm = drone.velocity / np.linalg.norm(drone.velocity)
-                    self.axes.arrow(
-                        drone.pos[0], 
-                        drone.pos[1], 
-                        vel_norm[0] * 2, 
-                        vel_norm[1] * 2, 
-                        head_width=0.4, 
-                        head_length=0.7, 
-                        fc=color, 
-                        ec=color
-                    )
-                
-                # Display fuel gauge for low fuel drones
-                if drone.status == "LowFuel":
-                    fuel_pct = drone.fuel / drone.config["DRONE_MAX_FUEL"]
-                    self.axes.add_patch(
-                        patches.Rectangle(
-                            (drone.pos[0] - 0.75, drone.pos[1] - 1.5), 
-                            1.5 * fuel_pct, 
-                            0.3, 
-                            color='yellow'
-                        )
-                    )
+            # Show assigned drones count
+            if target.alive and target.assigned_drones > 0:
+                label.set_text(int_str(target.assigned_drones))
+                label.set_visible(True)
             else:
-                # Draw X for destroyed drones
-                marker_size = 20
-                self.axes.plot(
-                    [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                    [drone.pos[1] - 0.5, drone.pos[1] + 0.5], 
-                    color='red', 
-                    linewidth=2
-                )
-                self.axes.plot(
-                    [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                    [drone.pos[1] + 0.5, drone.pos[1] - 0.5], 
-                    color='red', 
-                    linewidth=2
-                )
+                label.set_visible(False)
         
-        # Add a legend for drone status colors
-        legend_elements = [
-            patches.Patch(facecolor=color, edgecolor='black', label=status)
-            for status, color in STATUS_COLORS.items()
-        ]
-        self.axes.legend(handles=legend_elements, loc='upper right', title="Drone Status")
+        # Drone state is read straight from the simulation's column arrays
+        soa = simulation.drone_state
+        pos = soa.pos
+        vel = soa.velocity
+        alive = soa.alive
+        colors = self._status_colors()[soa.status_id]
+        low_fuel = soa.status_id == LOW_FUEL_ID
+        fuel_pct = soa.fuel / self._max_fuel
         
-        self.fig.tight_layout()
-        self.draw()
-
-
-class SimulationToolbar(NavigationToolbar):
-    """Custom toolbar for simulation canvas."""
+        self.drone_markers.set_offsets(pos[alive])
+        self.drone_markers.set_facecolors(colors[alive])
+        self.destroyed_markers.set_offsets(pos[~alive])
+        
+        # Plot velocity vector (direction); one hypot over the velocity columns
+        # gives every speed, and NaN scales hide the arrows of idle drones
+        vel_x, vel_y = vel[:, 0], vel[:, 1]
+        speed = np.hypot(vel_x, vel_y)
+        moving = alive & (speed > 0.1)
+        scale = np.divide(2.0, speed, out=np.full_like(speed, np.nan), where=moving)
+        self.drone_arrows.set_offsets(pos)
+        self.drone_arrows.set_UVC(vel_x * scale, vel_y * scale)
+        self.drone_arrows.set_color(colors)
+        
+        # Plot trajectories if enabled; ring buffer windows are half-precision
+        # array views, widened to float32 only for the segments being drawn
+        if show_trajectories:
+            windows = simulation.drone_trails()
+            trails = [i for i, window in enumerate(windows) if alive[i] and len(window) > 1]
+            self.trajectory_lines.set_segments([windows[i].astype(np.float32, copy=False) for i in trails])
+            self.trajectory_lines.set_color(colors[trails])
+        else:
+            self.trajectory_lines.set_segments([])
+        
+        # Drone ID labels follow their drone; bbox colour and visibility are
+        # only touched for drones whose status changed since the last frame
+        labels = self.drone_labels
+        for i in np.flatnonzero(alive):
+            labels[i].set_position((pos[i, 0], pos[i, 1] + 1))
+        shown_status = np.where(alive, soa.status_id, -1)
+        for i in np.flatnonzero(shown_status != self._label_status):
+            labels[i].set_visible(bool(alive[i]))
+            labels[i].get_bbox_patch().set_facecolor(colors[i])
+        self._label_status = shown_status
+        
+        for i in range(len(soa)):
+            gauge = self.fuel_gauges[i]
+            
+            # Display fuel gauge for low fuel drones
+            if alive[i] and low_fuel[i]:
+                gauge.set_xy((pos[i, 0] - 0.75, pos[i, 1] - 1.5))
+                gauge.set_width(1.5 * fuel_pct[i])
+                gauge.set_visible(True)
+            else:
+                gauge.set_visible(False)
+        
+        if full_redraw or self._background is None:
+            # A full draw refreshes the background through _on_draw()
+            self.draw()
+            return
+        
+        # Blit: restore the cached static scene and redraw only what moves
+        self.restore_region(self._background)
+        for artist in self._animated_artists:
+            self.axes.draw_artist(artist)
+        self.blit(self.axes.bbox)
     
-    def __init__(self, canvas, parent):
+    def frame_rgba(self):
         """
-        Initialize the simulation toolbar.
+        Get the last rendered frame, e.g. for piping to a video encoder.
         
-        Args:
-            canvas: The canvas to attach to
-            parent: Parent widget
+        Returns:
+            numpy.ndarray: (height, width, 4) uint8 view of the Agg buffer;
+            it is overwritten by the next update_plot() call
         """
-        NavigationToolbar.__init__(self, canvas, parent)
+        return np.asarray(self.buffer_rgba())
+
+
+if not HEADLESS:
+    class SimulationToolbar(NavigationToolbar):
+        """Custom toolbar for simulation canvas."""
+        
+        def __init__(self, canvas, parent):
+            """
+            Initialize the simulation toolbar.
+            
+            Args:
+                canvas: The canvas to attach to
+                parent: Parent widget
+            """
+            NavigationToolbar.__init__(self, canvas, parent)
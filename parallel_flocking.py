@@ -0,0 +1,127 @@
+"""
+Parallel Flocking
+
+Splits the flocking computation of very large swarms across worker
+processes. Drone positions, velocities, alive flags and the resulting forces
+live in shared memory that every worker maps once when it starts, so a step
+only sends each worker the range of drones it is responsible for; no arrays
+are pickled per step.
+
+Each worker runs compute_flocking_forces() on its own row range against the
+whole swarm, which gives the same forces as computing them in one process.
+"""
+
+import weakref
+import multiprocessing as mp
+import numpy as np
+
+from simulation_core import compute_flocking_forces
+
+# Below this many drones the per-step hand-off to the workers costs more
+# than the flocking computation itself
+PARALLEL_MIN_DRONES = 4096
+
+# Shared arrays of the current worker process, set up by _init_worker()
+_worker_arrays = {}
+
+
+def _shared_array(shape, dtype):
+    """
+    Allocate an array in shared memory.
+    
+    Args:
+        shape (tuple): Array shape
+        dtype: NumPy dtype
+    
+    Returns:
+        tuple: (raw buffer to hand to workers, ndarray view of it)
+    """
+    dtype = np.dtype(dtype)
+    raw = mp.RawArray('b', max(1, int(np.prod(shape)) * dtype.itemsize))
+    return raw, np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+def _init_worker(buffers, config):
+    """
+    Map the shared arrays in a worker process.
+    
+    Args:
+        buffers (dict): Name -> (raw buffer, dtype, shape) of each shared array
+        config (dict): Simulation configuration
+    """
+    for name, (raw, dtype, shape) in buffers.items():
+        _worker_arrays[name] = np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+    _worker_arrays["config"] = config
+
+
+def _flocking_rows(bounds):
+    """
+    Compute the flocking forces of one range of drones into shared memory.
+    
+    Args:
+        bounds (tuple): (start, stop) drone range
+    """
+    start, stop = bounds
+    arrays = _worker_arrays
+    arrays["forces"][start:stop] = compute_flocking_forces(
+        arrays["pos"], arrays["velocity"], arrays["alive"], arrays["config"], start, stop
+    )
+
+
+class FlockingPool:
+    """
+    Worker processes computing flocking forces for a swarm of fixed size.
+    """
+    
+    def __init__(self, num_drones: int, config: dict, workers: int):
+        """
+        Start the workers.
+        
+        Args:
+            num_drones (int): Number of drones in the swarm
+            config (dict): Simulation configuration
+            workers (int): Number of worker processes
+        """
+        self.num_drones = num_drones
+        self.workers = workers
+        
+        buffers = {}
+        layout = {
+            "pos": ((num_drones, 2), np.float32),
+            "velocity": ((num_drones, 2), np.float32),
+            "alive": ((num_drones,), bool),
+            "forces": ((num_drones, 2), float),
+        }
+        for name, (shape, dtype) in layout.items():
+            raw, array = _shared_array(shape, dtype)
+            buffers[name] = (raw, np.dtype(dtype), shape)
+            setattr(self, name, array)
+        
+        bounds = np.linspace(0, num_drones, workers + 1).astype(int)
+        self._chunks = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        self._pool = mp.Pool(workers, initializer=_init_worker, initargs=(buffers, dict(config)))
+        # Workers are stopped even if the owner never calls close()
+        self._finalizer = weakref.finalize(self, self._pool.terminate)
+    
+    def compute(self, pos: np.ndarray, velocity: np.ndarray, alive: np.ndarray) -> np.ndarray:
+        """
+        Compute the flocking force of every drone.
+        
+        Args:
+            pos (np.ndarray): Drone positions, shape (N, 2)
+            velocity (np.ndarray): Drone velocities, shape (N, 2)
+            alive (np.ndarray): Mask of drones that count as neighbours, shape (N,)
+        
+        Returns:
+            np.ndarray: Flocking force per drone, shape (N, 2); overwritten by
+            the next call
+        """
+        self.pos[:] = pos
+        self.velocity[:] = velocity
+        self.alive[:] = alive
+        self._pool.map(_flocking_rows, self._chunks)
+        return self.forces
+    
+    def close(self):
+        """Stop the worker processes."""
+        self._finalizer()
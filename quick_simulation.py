@@ -6,21 +6,41 @@ parameters and advanced scenarios including enemy drones and rockets.
 """
 
 import os
+import math
 import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend for Replit
 import matplotlib.pyplot as plt
+from matplotlib.collections import EllipseCollection, LineCollection
 
-from config import DEFAULT_CONFIG
-from simulation_core import Simulation, Drone, Target, Turret, Obstacle
+from config import DEFAULT_CONFIG, STATUS_COLORS, DEFAULT_COLOR
+from simulation_core import Simulation, Drone, DroneState, Target, Turret, Obstacle
 from gis_utils import GISData
 from audio_system import SpatialAudioSystem, AUDIO_AVAILABLE
 
+# KD-tree for turret range queries on large swarms, with a broadcast scan as fallback
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Below this many alive drones one broadcast distance pass beats building a tree
+KDTREE_MIN_DRONES = 128
+
+# Optional MP4 recording of the tactical views (needs imageio with ffmpeg)
+try:
+    import imageio
+    IMAGEIO_AVAILABLE = True
+except ImportError:
+    IMAGEIO_AVAILABLE = False
+
 # Import and use our advanced scenarios if requested
 try:
     from advanced_scenarios import (
-        EnemyDrone, Rocket, AdvancedDroneAI,
+        EnemyDrone, Rocket, AdvancedDroneAI, ScenarioArrays,
         create_enemy_drones, fire_rocket, enhance_drones_with_ai
     )
     ADVANCED_SCENARIOS_AVAILABLE = True
@@ -30,8 +50,76 @@ except ImportError:
 
 # Configuration
 OUTPUT_DIR = "output"
+VIDEO_FILENAME = "tactical.mp4"
+VIDEO_FPS = 6
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Persistent tactical figure, built by _init_scene() on first use
+_scene = None
+
+# Legend handles keyed by (has enemy drones, has rockets)
+_LEGEND_CACHE = {}
+
+# Resolution and zlib level of the saved tactical views; a light compression
+# level trades slightly larger files for much less encoding time
+VIEW_DPI = 100
+PNG_COMPRESS_LEVEL = 1
+
+class DroneRangeIndex:
+    """
+    Spatial index over the alive drones of one side, for turret range queries.
+    
+    Built once per rocket launch step so every turret queries the same index
+    instead of scanning all drones itself.
+    """
+    
+    def __init__(self, drones, positions, alive):
+        """
+        Index the alive drones.
+        
+        Args:
+            drones (list): Drone objects, in the same order as positions
+            positions (np.ndarray): (N, 2) drone positions
+            alive (np.ndarray): (N,) alive mask
+        """
+        self.drones = drones
+        self.indices = np.flatnonzero(alive)
+        self.positions = positions[self.indices]
+        use_tree = SCIPY_AVAILABLE and len(self.indices) >= KDTREE_MIN_DRONES
+        self.tree = cKDTree(self.positions) if use_tree else None
+    
+    def query(self, center, radius):
+        """
+        Find the alive drones within a radius.
+        
+        Args:
+            center (np.ndarray): Query position
+            radius (float): Query radius
+            
+        Returns:
+            list: Drones within the radius
+        """
+        if self.tree is not None:
+            hits = self.tree.query_ball_point(center, radius)
+        else:
+            # Squared distances of all indexed drones in one pass, no sqrt
+            diff = self.positions - center
+            hits = np.flatnonzero(np.einsum('ij,ij->i', diff, diff) < radius * radius)
+        return [self.drones[self.indices[k]] for k in hits]
+
+def count_alive(simulation, enemy_drones):
+    """
+    Count the surviving friendly drones, enemy drones and targets.
+    
+    Returns:
+        tuple: (friendly drones alive, enemy drones alive, targets alive)
+    """
+    return (
+        int(np.count_nonzero(simulation.drone_state.alive)),
+        sum(1 for d in enemy_drones if d.alive),
+        sum(1 for t in simulation.targets if t.alive),
+    )
+
 def print_banner():
     """Print a military-style banner."""
     print("\n" + "=" * 60)
@@ -97,6 +185,11 @@ def get_user_config():
         except ValueError:
             print("Invalid input. Using default values.")
     
+    video_enabled = False
+    if IMAGEIO_AVAILABLE:
+        video_choice = input(f"Record tactical views to {VIDEO_FILENAME} instead of PNG frames? (y/n) [n]: ").lower() or 'n'
+        video_enabled = video_choice == 'y'
+    
     print("\nSTARTING SIMULATION WITH THE FOLLOWING CONFIGURATION:")
     print(f"- {config['NUM_DRONES']} friendly drones")
     print(f"- {config['NUM_TARGETS']} targets")
@@ -110,16 +203,28 @@ def get_user_config():
         print("- Anti-drone rockets enabled")
     if advanced_ai_enabled:
         print("- Advanced AI tactics enabled")
+    if video_enabled:
+        print(f"- Tactical views recorded to {VIDEO_FILENAME}")
     
     return config, max_steps, {
         "enemy_drones": enemy_drones_enabled,
         "num_enemy_drones": num_enemy_drones, 
         "rockets": rockets_enabled,
-        "advanced_ai": advanced_ai_enabled
+        "advanced_ai": advanced_ai_enabled,
+        "video": video_enabled
     }
 
-def run_simulation(config, max_steps, advanced_options):
-    """Run the simulation with the specified configuration."""
+def run_simulation(config, max_steps, advanced_options, throttle_seconds=0.0):
+    """
+    Run the simulation with the specified configuration.
+    
+    Args:
+        config (dict): Simulation configuration
+        max_steps (int): Maximum number of steps to run
+        advanced_options (dict): Advanced scenario options from get_user_config()
+        throttle_seconds (float): Pause after each step, for watching the
+            progress output live; 0 runs at full speed
+    """
     # Initialize core simulation
     gis = GISData()
     simulation = Simulation(config)
@@ -127,7 +232,6 @@ def run_simulation(config, max_steps, advanced_options):
     
     # Initialize audio
     audio = None
-    drone_sounds = {}
     if AUDIO_AVAILABLE:
         try:
             audio = SpatialAudioSystem()
@@ -155,85 +259,115 @@ def run_simulation(config, max_steps, advanced_options):
             enhanced_drones = enhance_drones_with_ai(simulation.drones)
             print(f"Enhanced {len(enhanced_drones)} drones with advanced AI")
     
-    # Prepare for audio tracking
-    previous_drone_statuses = {d.id: d.alive for d in simulation.drones}
-    if enemy_drones:
-        for d in enemy_drones:
-            previous_drone_statuses[d.id] = d.alive
+    # Enemy drones share one column store, like the simulation's own drones
+    enemy_state = DroneState.bind(enemy_drones)
+    
+    # The range index, scenario arrays and plots all rely on single-precision columns
+    for state in (simulation.drone_state, enemy_state):
+        assert state.pos.dtype == np.float32 and state.velocity.dtype == np.float32
+    
+    # Prepare for audio tracking; update_audio diffs against these in place.
+    # Drones also die to enemies and rockets outside Simulation.step(), so
+    # their flags are diffed here rather than taken from the step events
+    prev_friendly_alive = simulation.drone_state.alive.copy()
+    prev_enemy_alive = enemy_state.alive.copy()
+    
+    # Buzzing sound handles by drone row, None where no sound is playing
+    friendly_sounds = [None] * len(simulation.drone_state)
+    enemy_sounds = [None] * len(enemy_state)
+    
+    # Targets only fall inside Simulation.step(), so the count is kept up to
+    # date from its events instead of rescanning every target
+    targets_alive = sum(1 for t in simulation.targets if t.alive)
+    
+    # PNG encoding runs on worker threads so it overlaps the next steps
+    png_pool = ThreadPoolExecutor(max_workers=2)
     
-    previous_target_statuses = {t.id: t.alive for t in simulation.targets}
-    previous_turret_fired = {t.id: False for t in simulation.turrets}
+    # Intermediate views go to one MP4 stream instead of PNG files if requested
+    video_writer = None
+    if advanced_options.get("video"):
+        video_writer = open_video_writer(os.path.join(OUTPUT_DIR, VIDEO_FILENAME))
     
     print("\nStarting simulation...")
     
+    # Neither side gains drones during a run, so the combined list that
+    # enemies and rockets search is built once
+    all_agents = simulation.drones + enemy_drones
+    
     # Run simulation steps
     for step in range(max_steps):
         # Step the core simulation
-        simulation.step()
+        events = simulation.step()
+        targets_alive -= len(events["destroyed_targets"])
         
-        # Update enemy drones
+        # Update enemy drones; agent, obstacle and turret positions are
+        # stacked once and shared by every enemy's distance checks
+        if enemy_drones:
+            arrays = ScenarioArrays(all_agents, simulation.obstacles, simulation.turrets)
         for enemy in enemy_drones:
             if enemy.alive:
-                enemy.update(simulation.drones + enemy_drones, 
+                enemy.update(all_agents, 
                            simulation.targets, 
                            simulation.obstacles, 
                            simulation.turrets, 
-                           gis)
+                           gis,
+                           arrays)
         
-        # Update rockets
-        for rocket in rockets[:]:
-            if rocket.alive:
-                rocket.update(simulation.drones + enemy_drones, simulation.obstacles)
-            else:
-                rockets.remove(rocket)
+        # Update rockets against the positions after the enemies moved
+        if rockets:
+            arrays = ScenarioArrays(all_agents, simulation.obstacles)
+            for rocket in rockets:
+                if rocket.alive:
+                    rocket.update(all_agents, simulation.obstacles, arrays)
+            # Drop spent rockets in one pass, keeping the same list object
+            rockets[:] = [rocket for rocket in rockets if rocket.alive]
         
         # Launch rockets occasionally if enabled
         if advanced_options["rockets"] and step % 15 == 0:
+            # Index both sides once, every turret queries the same indexes
+            enemy_index = DroneRangeIndex(enemy_drones, enemy_state.pos, enemy_state.alive)
+            friendly_index = DroneRangeIndex(
+                simulation.drones,
+                simulation.drone_state.pos,
+                simulation.drone_state.alive
+            )
+            
             for turret in simulation.turrets:
                 if turret.can_shoot():
                     # Find a target drone
-                    possible_targets = []
                     # Try to target enemy drones first
-                    for drone in enemy_drones:
-                        if drone.alive and np.linalg.norm(drone.pos - turret.pos) < turret.range:
-                            possible_targets.append(drone)
+                    possible_targets = enemy_index.query(turret.pos, turret.range)
                     
                     # If no enemy drones in range, target random drones
                     if not possible_targets:
-                        for drone in simulation.drones:
-                            if drone.alive and np.linalg.norm(drone.pos - turret.pos) < turret.range:
-                                possible_targets.append(drone)
+                        possible_targets = friendly_index.query(turret.pos, turret.range)
                     
                     if possible_targets:
-                        target = np.random.choice(possible_targets)
+                        target = possible_targets[np.random.randint(len(possible_targets))]
                         rockets.append(fire_rocket(turret, target, len(rockets) + 1, config))
         
+        # Alive counts are taken once per step and shared with the views
+        alive_counts = (
+            int(np.count_nonzero(simulation.drone_state.alive)),
+            int(np.count_nonzero(enemy_state.alive)),
+            targets_alive,
+        )
+        friendly_drones_alive, enemy_drones_alive, _ = alive_counts
+        
         # Update audio if available
         if audio:
-            update_audio(audio, simulation, enemy_drones, step, 
-                       previous_drone_statuses, 
-                       previous_target_statuses,
-                       previous_turret_fired,
-                       drone_sounds)
-            
-            # Update previous state trackers for next step
-            previous_drone_statuses = {d.id: d.alive for d in simulation.drones}
-            if enemy_drones:
-                for d in enemy_drones:
-                    previous_drone_statuses[d.id] = d.alive
-                    
-            previous_target_statuses = {t.id: t.alive for t in simulation.targets}
-            previous_turret_fired = {t.id: t.cooldown_timer > 0 for t in simulation.turrets}
+            update_audio(audio, simulation, enemy_state, step, events,
+                       prev_friendly_alive,
+                       prev_enemy_alive,
+                       friendly_sounds,
+                       enemy_sounds)
         
         # Generate visualization
         if step % 5 == 0 or step == 0:
-            generate_visualization(simulation, enemy_drones, rockets, step)
+            generate_visualization(simulation, enemy_drones, rockets, step, png_pool=png_pool,
+                                   alive_counts=alive_counts, video_writer=video_writer)
             
         # Print progress
-        friendly_drones_alive = sum(1 for d in simulation.drones if d.alive)
-        enemy_drones_alive = sum(1 for d in enemy_drones if d.alive)
-        targets_alive = sum(1 for t in simulation.targets if t.alive)
-        
         print(f"Step {step+1}: "
               f"Friendly drones: {friendly_drones_alive}/{len(simulation.drones)}, "
               f"Targets: {len(simulation.targets) - targets_alive}/{len(simulation.targets)}, "
@@ -243,12 +377,13 @@ def run_simulation(config, max_steps, advanced_options):
               f"Targets: {len(simulation.targets) - targets_alive}/{len(simulation.targets)}")
         
         # Check if simulation is complete
-        all_targets_destroyed = all(not t.alive for t in simulation.targets)
-        all_friendly_drones_destroyed = all(not d.alive for d in simulation.drones)
+        all_targets_destroyed = targets_alive == 0
+        all_friendly_drones_destroyed = friendly_drones_alive == 0
         
         if all_targets_destroyed or all_friendly_drones_destroyed:
             print(f"Simulation completed at step {step+1}")
-            generate_visualization(simulation, enemy_drones, rockets, step, is_final=True)
+            generate_visualization(simulation, enemy_drones, rockets, step, is_final=True, png_pool=png_pool,
+                                   alive_counts=alive_counts, video_writer=video_writer)
             
             # Play mission complete sound if audio enabled
             if audio:
@@ -257,20 +392,39 @@ def run_simulation(config, max_steps, advanced_options):
             
             break
             
-        # Small delay to prevent overwhelming output
-        time.sleep(0.1)
+        # Optional delay so the progress output can be followed live
+        if throttle_seconds:
+            time.sleep(throttle_seconds)
     
     # Print final stats
-    print_final_stats(simulation, enemy_drones, step)
+    print_final_stats(simulation, enemy_drones, step, alive_counts)
+    close_visualization()
+    png_pool.shutdown(wait=True)
+    if video_writer is not None:
+        video_writer.close()
+        print(f"Tactical video saved to {os.path.join(OUTPUT_DIR, VIDEO_FILENAME)}")
     
     # Clean up audio resources
     if audio:
         audio.cleanup()
 
-def generate_visualization(simulation, enemy_drones, rockets, step, is_final=False):
-    """Generate a military-style visualization of the current state."""
+def _init_scene(simulation, enemy_drones):
+    """
+    Build the persistent tactical figure for a simulation.
+    
+    Static elements (styling, obstacles, turrets, targets) are drawn once;
+    drones, rockets and the status texts are collections and texts that
+    generate_visualization() updates in place on every frame.
+    
+    Args:
+        simulation: The simulation object
+        enemy_drones (list): Enemy drones
+        
+    Returns:
+        dict: Figure, axes and the persistent artists
+    """
     # Create figure with military style dark theme
-    fig, ax = plt.subplots(figsize=(12, 10), facecolor='#0a1929')
+    fig, ax = plt.subplots(figsize=(12, 10), dpi=VIEW_DPI, facecolor='#0a1929')
     ax.set_facecolor('#132f4c')
     
     # Grid and border styling for military look
@@ -281,10 +435,6 @@ def generate_visualization(simulation, enemy_drones, rockets, step, is_final=Fal
     ax.set_xlim(0, field_size)
     ax.set_ylim(0, field_size)
     
-    # Title and axis labels in military style
-    ax.set_title(f"NATO MILITARY SWARM OPERATION - Step {step+1}", 
-                 color='#66b2ff', fontsize=14, fontweight='bold')
-    
     # Coordinate axes in military style
     ax.set_xlabel("X Position (km)", color='#66b2ff')
     ax.set_ylabel("Y Position (km)", color='#66b2ff')
@@ -322,141 +472,84 @@ def generate_visualization(simulation, enemy_drones, rockets, step, is_final=Fal
         )
         ax.add_patch(circle)
         ax.add_patch(range_circle)
-        
-        # Add targeting lines
-        scan_angle = (step * 5) % 360
-        length = turret.range * 0.7
-        dx = length * np.cos(np.radians(scan_angle))
-        dy = length * np.sin(np.radians(scan_angle))
-        ax.plot([turret.pos[0], turret.pos[0] + dx], 
-                [turret.pos[1], turret.pos[1] + dy], 
-                color='#ff2a2a', linestyle='-', alpha=0.4, linewidth=0.7)
     
-    # Plot targets
+    # Targets are hidden once destroyed
+    target_artists = []
     for i, target in enumerate(simulation.targets):
-        if target.alive:
-            square = plt.Rectangle(
-                (target.pos[0] - 2.0, target.pos[1] - 2.0), 
-                4, 4, 
-                color='#00aa00', 
-                alpha=0.8
-            )
-            ax.add_patch(square)
-            ax.text(target.pos[0], target.pos[1], f"T{i+1}", 
-                    ha='center', va='center', color='white', 
-                    fontweight='bold', fontsize=9)
-    
-    # Plot friendly drones
-    from config import STATUS_COLORS, DEFAULT_COLOR
-    
-    for i, drone in enumerate(simulation.drones):
-        if drone.alive:
-            color = STATUS_COLORS.get(drone.status, DEFAULT_COLOR)
-            
-            circle = plt.Circle(
-                drone.pos, 
-                0.7, 
-                color=color, 
-                alpha=0.9
-            )
-            ax.add_patch(circle)
-            
-            # Draw velocity vector
-            if np.linalg.norm(drone.velocity) > 0.1:
-                velocity = drone.velocity / np.linalg.norm(drone.velocity) * 2
-                ax.arrow(
-                    drone.pos[0], 
-                    drone.pos[1], 
-                    velocity[0], 
-                    velocity[1], 
-                    head_width=0.4, 
-                    head_length=0.7, 
-                    fc=color, 
-                    ec=color
-                )
-            
-            ax.text(drone.pos[0], drone.pos[1], f"{i+1}", 
-                    ha='center', va='center', color='white', 
-                    fontweight='bold', fontsize=8)
-        else:
-            # Show destroyed drones
-            ax.scatter(drone.pos[0], drone.pos[1], s=40, color='#ff6600', alpha=0.7)
-            ax.plot(
-                [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                [drone.pos[1] - 0.5, drone.pos[1] + 0.5], 
-                color='red', 
-                linewidth=2
-            )
-            ax.plot(
-                [drone.pos[0] - 0.5, drone.pos[0] + 0.5], 
-                [drone.pos[1] + 0.5, drone.pos[1] - 0.5], 
-                color='red', 
-                linewidth=2
-            )
-    
-    # Plot enemy drones if present
-    for i, enemy in enumerate(enemy_drones):
-        if enemy.alive:
-            # Enemy drones are red
-            circle = plt.Circle(
-                enemy.pos, 
-                0.9,  # Slightly bigger
-                color='#ff0000', 
-                alpha=0.9
-            )
-            ax.add_patch(circle)
-            
-            # Draw velocity vector
-            if np.linalg.norm(enemy.velocity) > 0.1:
-                velocity = enemy.velocity / np.linalg.norm(enemy.velocity) * 2
-                ax.arrow(
-                    enemy.pos[0], 
-                    enemy.pos[1], 
-                    velocity[0], 
-                    velocity[1], 
-                    head_width=0.4, 
-                    head_length=0.7, 
-                    fc='#ff0000', 
-                    ec='#ff0000'
-                )
-            
-            # Enemy ID
-            ax.text(enemy.pos[0], enemy.pos[1], f"E{i+1}", 
-                    ha='center', va='center', color='white', 
-                    fontweight='bold', fontsize=8)
-        else:
-            # Show destroyed enemy drones
-            ax.scatter(enemy.pos[0], enemy.pos[1], s=40, color='#ff6600', alpha=0.7)
-            ax.plot(
-                [enemy.pos[0] - 0.5, enemy.pos[0] + 0.5], 
-                [enemy.pos[1] - 0.5, enemy.pos[1] + 0.5], 
-                color='#ff0000', 
-                linewidth=2
-            )
-            ax.plot(
-                [enemy.pos[0] - 0.5, enemy.pos[0] + 0.5], 
-                [enemy.pos[1] + 0.5, enemy.pos[1] - 0.5], 
-                color='#ff0000', 
-                linewidth=2
-            )
+        square = plt.Rectangle(
+            (target.pos[0] - 2.0, target.pos[1] - 2.0), 
+            4, 4, 
+            color='#00aa00', 
+            alpha=0.8
+        )
+        ax.add_patch(square)
+        label = ax.text(target.pos[0], target.pos[1], f"T{i+1}", 
+                        ha='center', va='center', color='white', 
+                        fontweight='bold', fontsize=9)
+        target_artists.append((square, label))
+    
+    # Drone bodies are circles in data units, one collection per side
+    def circles(diameter, color):
+        return ax.add_collection(EllipseCollection(
+            [diameter], [diameter], [0.0], units='xy', offsets=np.empty((0, 2)),
+            offset_transform=ax.transData, facecolors=color, alpha=0.9
+        ))
+    
+    # ID labels are pooled per drone and moved every frame
+    def labels(names):
+        return [ax.text(0, 0, name, ha='center', va='center', color='white', 
+                        fontweight='bold', fontsize=8, visible=False)
+                for name in names]
+    
+    scene = {
+        "simulation": simulation,
+        "fig": fig,
+        "ax": ax,
+        "targets": target_artists,
+        "friendly_markers": circles(1.4, 'none'),  # Coloured by status per frame
+        "enemy_markers": circles(1.8, '#ff0000'),  # Slightly bigger
+        "wreck_markers": ax.scatter(np.empty(0), np.empty(0), s=40, color='#ff6600', alpha=0.7),
+        "wreck_crosses": ax.add_collection(LineCollection([], colors='red', linewidths=2)),
+        "rocket_markers": ax.scatter(np.empty(0), np.empty(0), color='#ffff00', marker='^', s=50),
+        "rocket_trails": ax.add_collection(LineCollection([], colors='#ffff00', alpha=0.6)),
+        "friendly_labels": labels(f"{i+1}" for i in range(len(simulation.drones))),
+        "enemy_labels": labels(f"E{i+1}" for i in range(len(enemy_drones))),
+        "title": ax.set_title("", color='#66b2ff', fontsize=14, fontweight='bold'),
+        "mission_time": ax.text(0.02, 0.98, "", 
+                                transform=ax.transAxes, color='#66b2ff', 
+                                fontsize=10, verticalalignment='top',
+                                bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7)),
+        "status": ax.text(0.02, 0.02, "",
+                          transform=ax.transAxes, color='#66b2ff',
+                          fontsize=10, verticalalignment='bottom',
+                          bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7)),
+        "frame_artists": [],
+    }
+    return scene
+
+def _place_labels(labels, pos, alive):
+    """Move pooled labels onto the alive drones and hide the rest."""
+    for label, (x, y), shown in zip(labels, pos.tolist(), alive.tolist()):
+        label.set_visible(shown)
+        if shown:
+            label.set_position((x, y))
+
+def _cross_segments(pos):
+    """Two strokes of an X, one data unit wide, centred on each position."""
+    offsets = np.array([[[-0.5, -0.5], [0.5, 0.5]], [[-0.5, 0.5], [0.5, -0.5]]])
+    return (pos[:, None, None, :] + offsets[None]).reshape(-1, 2, 2)
+
+def _build_legend_elements(has_enemies, has_rockets):
+    """
+    Build the legend proxy artists for the tactical view.
     
-    # Plot rockets if present
-    for rocket in rockets:
-        if rocket.alive:
-            # Rocket symbol
-            ax.scatter(rocket.pos[0], rocket.pos[1], color='#ffff00', marker='^', s=50)
-            
-            # Trail
-            if np.linalg.norm(rocket.velocity) > 0:
-                trail_length = 2.0
-                direction = -rocket.velocity / np.linalg.norm(rocket.velocity)
-                trail_end = rocket.pos + direction * trail_length
-                ax.plot([rocket.pos[0], trail_end[0]], 
-                        [rocket.pos[1], trail_end[1]], 
-                        color='#ffff00', alpha=0.6, linestyle='-')
-    
-    # Add legend
-    from config import STATUS_COLORS
+    Args:
+        has_enemies (bool): Whether enemy drones are shown
+        has_rockets (bool): Whether rockets are shown
+        
+    Returns:
+        list: Line2D handles for the legend
+    """
     legend_elements = [
         plt.Line2D([0], [0], marker='o', color='w', 
                   markerfacecolor=color, markersize=10, label=status)
@@ -464,14 +557,14 @@ def generate_visualization(simulation, enemy_drones, rockets, step, is_final=Fal
     ]
     
     # Add enemy drone to legend if present
-    if enemy_drones:
+    if has_enemies:
         legend_elements.append(
             plt.Line2D([0], [0], marker='o', color='w', 
                       markerfacecolor='#ff0000', markersize=10, label='Enemy')
         )
     
     # Add rocket to legend if present
-    if rockets:
+    if has_rockets:
         legend_elements.append(
             plt.Line2D([0], [0], marker='^', color='w', 
                       markerfacecolor='#ffff00', markersize=10, label='Rocket')
@@ -486,25 +579,192 @@ def generate_visualization(simulation, enemy_drones, rockets, step, is_final=Fal
         plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#654321', 
                   markersize=10, label='Terrain')
     ])
+    return legend_elements
+
+def _velocity_arrows(ax, frame_artists, pos, velocity, colors):
+    """
+    Draw heading arrows for moving drones as a single quiver.
+    
+    Arrows are 2.7 units long including a 0.4 x 0.7 head, for every drone
+    moving faster than 0.1.
+    
+    Args:
+        ax: Axes to draw on
+        frame_artists (list): Per-frame artists; the quiver is appended
+        pos (np.ndarray): Drone positions, shape (N, 2)
+        velocity (np.ndarray): Drone velocities, shape (N, 2)
+        colors: One color for all arrows or a list with one per drone
+    """
+    speeds = np.hypot(velocity[:, 0], velocity[:, 1])
+    moving = speeds > 0.1
+    if not moving.any():
+        return
+    arrows = velocity[moving] / speeds[moving, None] * 2.7
+    if not isinstance(colors, str):
+        colors = [c for c, m in zip(colors, moving.tolist()) if m]
+    frame_artists.append(ax.quiver(
+        pos[moving, 0], pos[moving, 1], arrows[:, 0], arrows[:, 1],
+        color=colors, angles='xy', scale_units='xy', scale=1,
+        units='xy', width=0.1, headwidth=4, headlength=7, headaxislength=7
+    ))
+
+def _render_frame(fig):
+    """
+    Render the figure and crop it to its tight bounding box.
+    
+    Args:
+        fig: The figure to render
+        
+    Returns:
+        np.ndarray: RGBA pixels, a copy that later draws will not modify
+    """
+    fig.canvas.draw()
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(matplotlib.rcParams['savefig.pad_inches'])
+    pixels = np.asarray(fig.canvas.buffer_rgba())
+    height, width = pixels.shape[:2]
+    x0, y0 = np.floor(np.array(bbox.p0) * fig.dpi).astype(int)
+    x1, y1 = x0 + int(bbox.width * fig.dpi), y0 + int(bbox.height * fig.dpi)
+    return pixels[max(height - y1, 0):height - max(y0, 0), max(x0, 0):min(x1, width)].copy()
+
+def open_video_writer(filepath, fps=VIDEO_FPS):
+    """
+    Open an MP4 writer for the tactical views.
+    
+    Args:
+        filepath (str): Path of the video file
+        fps (int): Frames per second of the video
+        
+    Returns:
+        The imageio writer, or None if the video cannot be written
+    """
+    if not IMAGEIO_AVAILABLE:
+        print("Warning: imageio not available, saving PNG frames instead")
+        return None
+    try:
+        return imageio.get_writer(filepath, fps=fps, codec='h264', macro_block_size=2)
+    except Exception as e:
+        print(f"Warning: Could not open video writer: {e}")
+        return None
+
+def close_visualization():
+    """Close the cached tactical figure."""
+    global _scene
+    if _scene is not None:
+        plt.close(_scene["fig"])
+        _scene = None
+
+def generate_visualization(simulation, enemy_drones, rockets, step, is_final=False, png_pool=None,
+                           alive_counts=None, video_writer=None):
+    """
+    Generate a military-style visualization of the current state.
+    
+    Args:
+        simulation: The simulation object
+        enemy_drones (list): Enemy drones
+        rockets (list): Rockets in flight
+        step (int): Current step number
+        is_final (bool): Whether this is the final view
+        png_pool (ThreadPoolExecutor): Executor that encodes the PNG in the
+            background; it is written before returning when not given
+        alive_counts (tuple): Counts from count_alive(), computed if not given
+        video_writer: Open video writer; intermediate views are appended to
+            it instead of being saved as PNG files
+        
+    Returns:
+        str: Path of the PNG file, or None if the view only went to the video
+    """
+    global _scene
+    
+    # The figure and static scene are built once per simulation and reused
+    if (_scene is None or _scene["simulation"] is not simulation
+            or len(_scene["enemy_labels"]) != len(enemy_drones)):
+        close_visualization()
+        _scene = _init_scene(simulation, enemy_drones)
+    scene = _scene
+    ax = scene["ax"]
+    
+    # Per-frame arrows and scan lines from the previous frame are dropped
+    for artist in scene["frame_artists"]:
+        artist.remove()
+    frame_artists = scene["frame_artists"] = []
+    
+    # Title in military style
+    scene["title"].set_text(f"NATO MILITARY SWARM OPERATION - Step {step+1}")
+    
+    # Add targeting lines; every turret scans at the same angle, so its
+    # direction is worked out once with scalar math
+    scan_angle = math.radians((step * 5) % 360)
+    scan_cos, scan_sin = math.cos(scan_angle), math.sin(scan_angle)
+    for turret in simulation.turrets:
+        length = turret.range * 0.7
+        dx = length * scan_cos
+        dy = length * scan_sin
+        frame_artists.extend(ax.plot([turret.pos[0], turret.pos[0] + dx], 
+                                     [turret.pos[1], turret.pos[1] + dy], 
+                                     color='#ff2a2a', linestyle='-', alpha=0.4, linewidth=0.7))
     
-    legend = ax.legend(handles=legend_elements, loc='upper right', 
-                      title="NATO ELEMENTS", framealpha=0.7,
-                      facecolor='#173a5e', edgecolor='#66b2ff')
-    legend.get_title().set_color('#66b2ff')
-    for text in legend.get_texts():
-        text.set_color('#e0e0e0')
+    # Plot targets
+    for target, (square, label) in zip(simulation.targets, scene["targets"]):
+        square.set_visible(target.alive)
+        label.set_visible(target.alive)
+    
+    # Plot friendly drones
+    # Friendly drone state is read from the simulation's column arrays
+    soa = simulation.drone_state
+    alive = soa.alive
+    colors = [STATUS_COLORS.get(drone.status, DEFAULT_COLOR)
+              for drone, is_alive in zip(simulation.drones, alive) if is_alive]
+    scene["friendly_markers"].set_offsets(soa.pos[alive])
+    scene["friendly_markers"].set_facecolors(colors)
+    _place_labels(scene["friendly_labels"], soa.pos, alive)
+    
+    # Draw velocity vectors
+    _velocity_arrows(ax, frame_artists, soa.pos[alive], soa.velocity[alive], colors)
+    
+    # Plot enemy drones if present
+    enemy_pos = np.array([enemy.pos for enemy in enemy_drones], dtype=np.float32).reshape(-1, 2)
+    enemy_velocity = np.array([enemy.velocity for enemy in enemy_drones], dtype=np.float32).reshape(-1, 2)
+    enemy_alive = np.array([enemy.alive for enemy in enemy_drones], dtype=bool)
+    scene["enemy_markers"].set_offsets(enemy_pos[enemy_alive])
+    _place_labels(scene["enemy_labels"], enemy_pos, enemy_alive)
+    _velocity_arrows(ax, frame_artists, enemy_pos[enemy_alive], enemy_velocity[enemy_alive], '#ff0000')
+    
+    # Show destroyed drones of both sides
+    wrecks = np.concatenate((soa.pos[~alive], enemy_pos[~enemy_alive]))
+    scene["wreck_markers"].set_offsets(wrecks)
+    scene["wreck_crosses"].set_segments(_cross_segments(wrecks))
+    
+    # Plot rockets if present, with a trail behind each moving one
+    live_rockets = [rocket for rocket in rockets if rocket.alive]
+    rocket_pos = np.array([rocket.pos for rocket in live_rockets], dtype=float).reshape(-1, 2)
+    scene["rocket_markers"].set_offsets(rocket_pos)
+    trail_length = 2.0
+    trails = []
+    for rocket in live_rockets:
+        if np.linalg.norm(rocket.velocity) > 0:
+            direction = -rocket.velocity / np.linalg.norm(rocket.velocity)
+            trails.append([rocket.pos, rocket.pos + direction * trail_length])
+    scene["rocket_trails"].set_segments(trails)
+    
+    # Add legend; it only changes when enemies or rockets appear or vanish
+    legend_key = (bool(enemy_drones), bool(rockets))
+    if scene.get("legend_key") != legend_key:
+        if legend_key not in _LEGEND_CACHE:
+            _LEGEND_CACHE[legend_key] = _build_legend_elements(*legend_key)
+        legend = ax.legend(handles=_LEGEND_CACHE[legend_key], loc='upper right', 
+                          title="NATO ELEMENTS", framealpha=0.7,
+                          facecolor='#173a5e', edgecolor='#66b2ff')
+        legend.get_title().set_color('#66b2ff')
+        for text in legend.get_texts():
+            text.set_color('#e0e0e0')
+        scene["legend_key"] = legend_key
     
     # Add mission time
     mission_time = f"T+{step+1:03d}"
-    ax.text(0.02, 0.98, f"MISSION TIME: {mission_time}", 
-           transform=ax.transAxes, color='#66b2ff', 
-           fontsize=10, verticalalignment='top',
-           bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7))
+    scene["mission_time"].set_text(f"MISSION TIME: {mission_time}")
     
     # Add mission status
-    friendly_drones_alive = sum(1 for d in simulation.drones if d.alive)
-    enemy_drones_alive = sum(1 for d in enemy_drones if d.alive)
-    targets_alive = sum(1 for t in simulation.targets if t.alive)
+    friendly_drones_alive, enemy_drones_alive, targets_alive = alive_counts or count_alive(simulation, enemy_drones)
     
     status_text = (
         f"FRIENDLY DRONES: {friendly_drones_alive}/{len(simulation.drones)}\n"
@@ -514,101 +774,101 @@ def generate_visualization(simulation, enemy_drones, rockets, step, is_final=Fal
     if enemy_drones:
         status_text += f"\nENEMY DRONES: {enemy_drones_alive}/{len(enemy_drones)}"
     
-    ax.text(0.02, 0.02, status_text,
-           transform=ax.transAxes, color='#66b2ff',
-           fontsize=10, verticalalignment='bottom',
-           bbox=dict(boxstyle="round,pad=0.3", fc='#173a5e', ec='#66b2ff', alpha=0.7))
+    scene["status"].set_text(status_text)
     
     # Save the plot
     filename = f"tactical_view_{step+1:03d}.png" if not is_final else "final_tactical_view.png"
     filepath = os.path.join(OUTPUT_DIR, filename)
-    plt.savefig(filepath, dpi=150, facecolor='#0a1929', bbox_inches='tight')
-    plt.close(fig)
+    if video_writer is not None:
+        # The video needs a fixed frame size, so it takes the whole canvas
+        fig = scene["fig"]
+        fig.canvas.draw()
+        video_writer.append_data(np.asarray(fig.canvas.buffer_rgba())[..., :3])
+        if not is_final:
+            print(f"Recorded tactical view for step {step+1}")
+            return None
+    frame = _render_frame(scene["fig"])
+    if png_pool is not None:
+        png_pool.submit(plt.imsave, filepath, frame, pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
+    else:
+        plt.imsave(filepath, frame, pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
     
     print(f"Generated tactical visualization: {filename}")
     return filepath
 
-def update_audio(audio, simulation, enemy_drones, step, prev_drone_status, 
-               prev_target_status, prev_turret_fired, drone_sounds):
-    """Update spatial audio based on simulation state."""
+def update_audio(audio, simulation, enemy_state, step, events, prev_friendly_alive,
+               prev_enemy_alive, friendly_sounds, enemy_sounds):
+    """
+    Update spatial audio based on simulation state.
+    
+    The prev_* bool arrays hold last step's alive flags; destroyed drones are
+    found by diffing them against the current state, after which they are
+    overwritten in place for the next call.
+    
+    Args:
+        audio (SpatialAudioSystem): Audio system to drive
+        simulation (Simulation): Simulation instance
+        enemy_state (DroneState): Column store bound to the enemy drones
+        step (int): Current step number
+        events (dict): Return value of this step's Simulation.step()
+        prev_friendly_alive (np.ndarray): Friendly alive flags from last step
+        prev_enemy_alive (np.ndarray): Enemy alive flags from last step
+        friendly_sounds (list): Buzzing sound ids by friendly drone row
+        enemy_sounds (list): Buzzing sound ids by enemy drone row
+    """
     # Update all playing sounds with their current positions
     audio.update_active_sounds()
     
-    # Handle drone sounds - buzzing, movement, destruction
-    for drone in simulation.drones:
-        # If drone was alive but is now destroyed, play destruction sound
-        if prev_drone_status.get(drone.id, False) and not drone.alive:
-            # Play drone destroyed sound at drone position
-            audio.play_drone_destroyed(drone.pos[0], drone.pos[1])
+    # Handle friendly and enemy drone sounds - buzzing, movement, destruction;
+    # both sides are read straight from their column arrays
+    for state, prev_alive, sounds in ((simulation.drone_state, prev_friendly_alive, friendly_sounds),
+                                      (enemy_state, prev_enemy_alive, enemy_sounds)):
+        # Drones that were alive last step but are now destroyed
+        for i in np.flatnonzero(prev_alive & ~state.alive).tolist():
+            x, y = state.pos[i].tolist()
             
-            # Stop any drone buzzing sound
-            if drone.id in drone_sounds:
-                audio.stop_sound(drone_sounds[drone.id])
-                del drone_sounds[drone.id]
-        
-        # If drone is alive, play or update drone buzzing
-        elif drone.alive:
-            # If drone sound doesn't exist yet, create it
-            if drone.id not in drone_sounds:
-                sound_id = audio.play_drone_sound(drone.id, drone.pos[0], drone.pos[1])
-                if sound_id:
-                    drone_sounds[drone.id] = sound_id
-            # Otherwise update the position of existing sound
-            elif drone.id in drone_sounds:
-                audio.update_sound_position(drone_sounds[drone.id], drone.pos[0], drone.pos[1])
-    
-    # Handle enemy drone sounds
-    for enemy in enemy_drones:
-        # If enemy drone was alive but is now destroyed, play destruction sound
-        if prev_drone_status.get(enemy.id, False) and not enemy.alive:
-            # Play drone destroyed sound at drone position (different tone for enemy)
-            audio.play_drone_destroyed(enemy.pos[0], enemy.pos[1])
+            # Play drone destroyed sound at drone position
+            audio.play_drone_destroyed(x, y)
             
             # Stop any drone buzzing sound
-            if enemy.id in drone_sounds:
-                audio.stop_sound(drone_sounds[enemy.id])
-                del drone_sounds[enemy.id]
+            if sounds[i] is not None:
+                audio.stop_sound(sounds[i])
+                sounds[i] = None
+        np.copyto(prev_alive, state.alive)
         
-        # If enemy drone is alive, play or update buzzing
-        elif enemy.alive:
+        # Play or update buzzing for every drone still alive
+        alive = np.flatnonzero(state.alive)
+        for i, drone_id, (x, y) in zip(alive.tolist(), state.id[alive].tolist(), state.pos[alive].tolist()):
             # If drone sound doesn't exist yet, create it
-            if enemy.id not in drone_sounds:
-                sound_id = audio.play_drone_sound(enemy.id, enemy.pos[0], enemy.pos[1])
-                if sound_id:
-                    drone_sounds[enemy.id] = sound_id
+            if sounds[i] is None:
+                sounds[i] = audio.play_drone_sound(drone_id, x, y) or None
             # Otherwise update the position of existing sound
-            elif enemy.id in drone_sounds:
-                audio.update_sound_position(drone_sounds[enemy.id], enemy.pos[0], enemy.pos[1])
+            else:
+                audio.update_sound_position(sounds[i], x, y)
+    
+    # Handle turret sounds - firing, for the turrets that shot this step
+    for i in events["fired_turrets"].tolist():
+        turret = simulation.turrets[i]
+        audio.play_turret_fire(turret.id, turret.pos[0], turret.pos[1])
     
-    # Handle turret sounds - alerts and firing
+    # Occasional turret ping/alert based on step count
     for turret in simulation.turrets:
-        # Check if turret just fired (cooldown timer just became active)
-        just_fired = turret.cooldown_timer > 0 and not prev_turret_fired.get(turret.id, False)
-        
-        if just_fired:
-            # Play turret firing sound
-            audio.play_turret_fire(turret.id, turret.pos[0], turret.pos[1])
-            
-        # Occasional turret ping/alert based on step count
         if step % 10 == turret.id % 10:
             audio.play_turret_alert(turret.id, turret.pos[0], turret.pos[1])
     
     # Handle target sounds - destruction
-    for target in simulation.targets:
-        # If target was alive but is now destroyed, play destruction sound
-        if prev_target_status.get(target.id, False) and not target.alive:
-            # Play target destroyed sound
-            audio.play_target_destroyed(target.pos[0], target.pos[1])
-            
-            # Also play warning sound when target is destroyed (signifies mission progress)
-            field_size = simulation.config["FIELD_SIZE"]
-            audio.play_warning(field_size/2, field_size/2)  # Play centered
+    for i in events["destroyed_targets"].tolist():
+        # Target was alive but is now destroyed, play destruction sound
+        target = simulation.targets[i]
+        audio.play_target_destroyed(target.pos[0], target.pos[1])
+        
+        # Also play warning sound when target is destroyed (signifies mission progress)
+        field_size = simulation.config["FIELD_SIZE"]
+        audio.play_warning(field_size/2, field_size/2)  # Play centered
 
-def print_final_stats(simulation, enemy_drones, step):
+def print_final_stats(simulation, enemy_drones, step, alive_counts=None):
     """Print final simulation statistics."""
-    friendly_drones_alive = sum(1 for d in simulation.drones if d.alive)
-    enemy_drones_alive = sum(1 for d in enemy_drones if d.alive)
-    targets_alive = sum(1 for t in simulation.targets if t.alive)
+    friendly_drones_alive, enemy_drones_alive, targets_alive = alive_counts or count_alive(simulation, enemy_drones)
     
     friendly_drones_lost = len(simulation.drones) - friendly_drones_alive
     targets_destroyed = len(simulation.targets) - targets_alive
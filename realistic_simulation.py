@@ -7,19 +7,193 @@ simulations with realistic terrain, advanced tactical AI, and military-grade vis
 
 import os
 import sys
+import shutil
+import hashlib
 import argparse
+import importlib.util
 import time
-from enhanced_simulation import run_enhanced_simulation, EnhancedSimulation
-from config import DEFAULT_CONFIG
-from geo_data_manager import GeoDataManager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from config import make_config
 
-def main():
+# The simulation and map modules pull in matplotlib, rasterio and the rest of
+# the simulation stack, so they are imported inside the functions that use
+# them; this keeps `--help` and argument errors instant.
+
+# Resolution of the initial tactical map
+MAP_DPI = 150
+
+# Accepted values of the scenario options
+TIMES_OF_DAY = ("day", "dusk", "night")
+WEATHER_CONDITIONS = ("clear", "cloudy", "rain", "fog")
+MISSION_TYPES = ("strike", "recon", "defend", "escort")
+THREAT_LEVELS = ("low", "medium", "high")
+
+def _map_cache_path(dpi=MAP_DPI):
+    """
+    Locate the cached rendering of the initial tactical map.
+    
+    The map is built from synthetic terrain with fixed seeds, so it only
+    changes when geo_data_manager.py does; the key hashes that file's size
+    and modification time together with the resolution and save layout.
+    
+    Args:
+        dpi (int): Resolution of the rendering
+        
+    Returns:
+        str: Path of the cached PNG under $XDG_CACHE_HOME/dronenav
+    """
+    source = importlib.util.find_spec("geo_data_manager").origin
+    stat = os.stat(source)
+    key = hashlib.blake2b(f"{stat.st_size}:{stat.st_mtime_ns}:{dpi}:fixed".encode(), digest_size=8).hexdigest()
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "dronenav", f"tactical_map_{key}.png")
+
+def save_tactical_map(map_file, dpi=MAP_DPI):
+    """
+    Write the initial tactical map, rendering it only on a cache miss.
+    
+    Args:
+        map_file (str): Destination PNG path
+        dpi (int): Resolution of the rendering
+    """
+    cache_path = _map_cache_path(dpi)
+    if not os.path.exists(cache_path):
+        # Select the non-interactive backend before pyplot is first imported
+        # (geo_data_manager imports it) so no GUI toolkit is probed
+        import matplotlib
+        matplotlib.use("Agg")
+        from geo_data_manager import GeoDataManager
+        import matplotlib.pyplot as plt
+        
+        # Initialize map data; terrain and map features are independent, so
+        # they load side by side
+        print("Initializing geographic data...")
+        geo_manager = GeoDataManager()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            loads = [pool.submit(geo_manager.load_terrain_data),
+                     pool.submit(geo_manager.load_map_data)]
+            for load in loads:
+                load.result()
+        
+        # Generate initial tactical map
+        print("Generating tactical map...")
+        tactical_map = geo_manager.render_full_map(
+            show_terrain=True,
+            show_features=True
+        )
+        # render_full_map lays the figure out with subplots_adjust, so it is
+        # saved as-is; bbox_inches='tight' would draw it a second time just
+        # to measure the margins
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + f".{os.getpid()}.tmp"
+            tactical_map.savefig(tmp_path, dpi=dpi, format='png')
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # No writable cache; render straight to the destination
+            tactical_map.savefig(map_file, dpi=dpi)
+            plt.close(tactical_map)
+            return
+        plt.close(tactical_map)
+    else:
+        print("Using cached tactical map")
+    shutil.copyfile(cache_path, map_file)
+
+def _validate_args(parser, args):
+    """
+    Reject bad argument combinations before any simulation code is loaded.
+    
+    Also creates the output directory, so an unwritable path fails here
+    rather than after the terrain has been built.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser used to report errors
+        args (argparse.Namespace): Parsed arguments
+    """
+    if args.num_drones < 1:
+        parser.error("--num-drones must be at least 1")
+    if args.num_enemies < 0:
+        parser.error("--num-enemies cannot be negative")
+    if args.num_steps < 1:
+        parser.error("--num-steps must be at least 1")
+    if args.save_interval < 1:
+        parser.error("--save-interval must be at least 1")
+    if args.checkpoint_interval < 0:
+        parser.error("--checkpoint-interval cannot be negative")
+    if args.resume and not os.path.isfile(args.resume):
+        parser.error(f"--resume checkpoint not found: {args.resume}")
+    
+    try:
+        os.makedirs(args.output_dir, exist_ok=True)
+    except OSError as e:
+        parser.error(f"cannot create output directory {args.output_dir}: {e}")
+    if not os.access(args.output_dir, os.W_OK):
+        parser.error(f"output directory is not writable: {args.output_dir}")
+
+def _print_block(title, rows):
+    """
+    Print a titled block of "label: value" lines with a single write.
+    
+    Args:
+        title (str): Block heading
+        rows (list): (label, value) pairs; an empty label gives a blank line
+    """
+    lines = [f"\n{title}:"]
+    lines.extend(f"{label}: {value}" if label else "" for label, value in rows)
+    print("\n".join(lines), flush=True)
+
+def _sniff_mode(argv):
+    """
+    Pick the run mode from the raw arguments, before any parser is built.
+    
+    Args:
+        argv (list): Command-line arguments without the program name
+        
+    Returns:
+        str: "demo" if --demo was given, otherwise "single"
+    """
+    return "demo" if "--demo" in argv else "single"
+
+def _sniff_option(argv, name, default):
+    """
+    Read one option's value from the raw arguments, without a parser.
+    
+    Accepts both "--name value" and "--name=value"; the last occurrence wins.
+    
+    Args:
+        argv (list): Command-line arguments without the program name
+        name (str): Option name including the leading dashes
+        default: Value returned when the option is absent
+        
+    Returns:
+        The option's value, or default
+    """
+    value = default
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith(name + "="):
+            value = arg[len(name) + 1:]
+    return value
+
+def main(argv=None):
     """
     Main entry point for realistic drone swarm simulation.
     
     Parses command-line arguments and runs the simulation with the specified
     parameters, including terrain, weather, time of day, and mission type.
+    
+    Args:
+        argv (list): Command-line arguments, sys.argv[1:] if not given
     """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # The demo only honours --output-dir, so skip building the parser
+    if _sniff_mode(argv) == "demo":
+        generate_demo(_sniff_option(argv, "--output-dir", "output"))
+        return
+    
     parser = argparse.ArgumentParser(
         description="NATO Military Drone Swarm Simulation with Real-World Maps",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -34,18 +208,18 @@ def main():
                       help="Maximum number of simulation steps")
     
     # Environmental conditions
-    parser.add_argument("--time", type=str, choices=["day", "dusk", "night"],
+    parser.add_argument("--time", type=str, choices=TIMES_OF_DAY,
                       default="day", help="Time of day affecting visibility")
     parser.add_argument("--weather", type=str, 
-                      choices=["clear", "cloudy", "rain", "fog"],
+                      choices=WEATHER_CONDITIONS,
                       default="clear", help="Weather conditions")
     
     # Mission parameters
     parser.add_argument("--mission", type=str,
-                      choices=["strike", "recon", "defend", "escort"],
+                      choices=MISSION_TYPES,
                       default="strike", help="Mission type")
     parser.add_argument("--threat", type=str,
-                      choices=["low", "medium", "high"],
+                      choices=THREAT_LEVELS,
                       default="medium", help="Threat level")
     
     # Output options
@@ -55,50 +229,50 @@ def main():
                       help="Interval for saving visualization frames")
     parser.add_argument("--show-map", action="store_true",
                       help="Show the tactical map after generation")
+    parser.add_argument("--checkpoint-interval", type=int, default=0,
+                      help="Save a checkpoint every N steps (0 disables)")
+    parser.add_argument("--resume", type=str, default=None,
+                      help="Resume from a checkpoint file")
+    parser.add_argument("--demo", action="store_true",
+                      help="Run the predefined demonstration scenarios instead "
+                           "(only --output-dir applies)")
     
-    # Parse the arguments
-    args = parser.parse_args()
+    # Parse the arguments and validate them (this also prepares the output
+    # directory) before paying for any simulation imports
+    args = parser.parse_args(argv)
+    _validate_args(parser, args)
     
-    # Prepare output directory
-    os.makedirs(args.output_dir, exist_ok=True)
+    from enhanced_simulation import run_enhanced_simulation
+    from checkpoint import install_stop_handlers
+    
+    # SIGTERM/SIGUSR1 (or the end of a SLURM allocation) checkpoint the run
+    # to the output directory and stop it instead of losing it
+    install_stop_handlers()
     
     # Prepare configuration
-    config = DEFAULT_CONFIG.copy()
-    config["NUM_DRONES"] = args.num_drones
+    config = make_config(NUM_DRONES=args.num_drones)
     
     # Generate the initial map visualization
     print("\nNATO MILITARY DRONE SWARM SIMULATION")
     print("=====================================")
-    print(f"Initializing geographic data...")
-    
-    # Initialize map data
-    geo_manager = GeoDataManager()
-    geo_manager.load_terrain_data()
-    geo_manager.load_map_data()
-    
-    # Generate initial tactical map
-    print("Generating tactical map...")
-    tactical_map = geo_manager.render_full_map(
-        show_terrain=True,
-        show_features=True
-    )
     map_file = os.path.join(args.output_dir, "tactical_map_initial.png")
-    tactical_map.savefig(map_file, dpi=150, bbox_inches='tight')
+    save_tactical_map(map_file)
     print(f"Tactical map saved to {map_file}")
     
     # Show mission parameters
-    print("\nMISSION PARAMETERS:")
-    print(f"Time: {args.time.upper()}")
-    print(f"Weather: {args.weather.upper()}")
-    print(f"Mission Type: {args.mission.upper()}")
-    print(f"Threat Level: {args.threat.upper()}")
-    print(f"Friendly Drones: {args.num_drones}")
-    print(f"Enemy Drones: {args.num_enemies}")
+    _print_block("MISSION PARAMETERS", [
+        ("Time", args.time.upper()),
+        ("Weather", args.weather.upper()),
+        ("Mission Type", args.mission.upper()),
+        ("Threat Level", args.threat.upper()),
+        ("Friendly Drones", args.num_drones),
+        ("Enemy Drones", args.num_enemies),
+    ])
     
     # Run the simulation
     print("\nStarting simulation...")
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     simulation = run_enhanced_simulation(
         config=config,
         num_steps=args.num_steps,
@@ -107,38 +281,99 @@ def main():
         weather=args.weather,
         mission_type=args.mission,
         output_dir=args.output_dir,
-        save_interval=args.save_interval
+        save_interval=args.save_interval,
+        checkpoint_interval=args.checkpoint_interval,
+        resume=args.resume
     )
-    end_time = time.time()
+    elapsed_ns = time.perf_counter_ns() - start_ns
     
     # Show final statistics
     stats = simulation.get_statistics()
     
-    print("\nMISSION STATISTICS:")
-    print(f"Simulation time: {end_time - start_time:.2f} seconds")
-    print(f"Mission steps: {stats.get('step_count', 0)}")
-    print(f"Drones remaining: {stats['drones_alive']}/{stats['total_drones']}")
-    print(f"Enemy drones destroyed: {stats.get('enemy_drones_destroyed', 0)}/{args.num_enemies}")
-    print(f"Targets destroyed: {stats['targets_destroyed']}/{stats['total_targets']}")
-    
     if stats['mission_complete']:
-        print("Mission status: SUCCESS")
+        mission_status = "SUCCESS"
     elif stats['mission_failed']:
-        print("Mission status: FAILED")
+        mission_status = "FAILED"
     else:
-        print("Mission status: INCOMPLETE")
+        mission_status = "INCOMPLETE"
     
-    # Show output file information
-    print(f"\nVisualization frames saved to: {args.output_dir}/")
-    print(f"Final tactical map: {args.output_dir}/tactical_map_{stats.get('step_count', args.num_steps-1):03d}.png")
+    _print_block("MISSION STATISTICS", [
+        ("Simulation time", f"{elapsed_ns / 1e9:.2f} seconds"),
+        ("Mission steps", stats.get('step_count', 0)),
+        ("Drones remaining", f"{stats['drones_alive']}/{stats['total_drones']}"),
+        ("Enemy drones destroyed", f"{stats.get('enemy_drones_destroyed', 0)}/{args.num_enemies}"),
+        ("Targets destroyed", f"{stats['targets_destroyed']}/{stats['total_targets']}"),
+        ("Mission status", mission_status),
+        ("", ""),
+        ("Visualization frames saved to", f"{args.output_dir}/"),
+        ("Final tactical map", f"{args.output_dir}/tactical_map_{stats.get('step_count', args.num_steps-1):03d}.png"),
+    ])
+
+def _run_one_scenario(index, scenario, scenario_dir, resume):
+    """
+    Run one demo scenario in a worker process.
+    
+    The scenario's console output goes to simulation.log in its directory so
+    the parallel runs do not interleave on the terminal. Forked workers all
+    start from the parent's random state, so a fresh run is seeded with the
+    scenario index; a resumed run gets its random state from the checkpoint.
+    
+    Args:
+        index (int): Scenario index
+        scenario (dict): Scenario definition from generate_demo()
+        scenario_dir (str): Output directory of the scenario
+        resume (str): Checkpoint to resume from, or None
+        
+    Returns:
+        int: The scenario index
+    """
+    import contextlib
+    import numpy as np
+    from enhanced_simulation import run_enhanced_simulation
+    from checkpoint import install_stop_handlers
+    
+    install_stop_handlers()
+    if resume is None:
+        np.random.seed(index)
+    config = make_config(NUM_DRONES=scenario["num_drones"])
+    
+    with open(os.path.join(scenario_dir, "simulation.log"), "w") as log, \
+            contextlib.redirect_stdout(log):
+        run_enhanced_simulation(
+            config=config,
+            num_steps=scenario["num_steps"],
+            with_enemy_drones=(scenario["num_enemies"] > 0),
+            time_of_day=scenario["time"],
+            weather=scenario["weather"],
+            mission_type=scenario["mission"],
+            output_dir=scenario_dir,
+            save_interval=20,
+            checkpoint_interval=20,
+            resume=resume
+        )
+    return index
 
 def generate_demo(output_dir="output"):
     """
     Generate a demonstration of the realistic simulation with a set of predefined scenarios.
     
+    Scenarios run in parallel worker processes. Each one checkpoints into its
+    own directory, so re-running the demo skips finished scenarios and
+    resumes an interrupted one.
+    
     Args:
         output_dir (str): Directory for output files
     """
+    # Each worker runs its own simulation, so keep BLAS to one thread per
+    # process; this has to be set before NumPy is first imported
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("MKL_NUM_THREADS", "1")
+    from checkpoint import CHECKPOINT_FILENAME, read_checkpoint_header, install_stop_handlers
+    
+    # A stop signal sent to the whole job reaches the workers too; the parent
+    # waits for them to checkpoint rather than dying first
+    install_stop_handlers()
+    
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
     
@@ -177,6 +412,7 @@ def generate_demo(output_dir="output"):
     print("=========================================")
     print("Generating demonstrations of multiple scenarios...")
     
+    pending = []
     for i, scenario in enumerate(scenarios):
         scenario_dir = os.path.join(output_dir, f"scenario_{i+1}")
         os.makedirs(scenario_dir, exist_ok=True)
@@ -186,28 +422,28 @@ def generate_demo(output_dir="output"):
         print(f"Weather: {scenario['weather'].upper()}")
         print(f"Mission: {scenario['mission'].upper()}")
         
-        config = DEFAULT_CONFIG.copy()
-        config["NUM_DRONES"] = scenario["num_drones"]
+        # All scenarios share the same map, so it is rendered at most once
+        save_tactical_map(os.path.join(scenario_dir, "tactical_map_initial.png"))
         
-        # Run the simulation for this scenario
-        run_enhanced_simulation(
-            config=config,
-            num_steps=scenario["num_steps"],
-            with_enemy_drones=(scenario["num_enemies"] > 0),
-            time_of_day=scenario["time"],
-            weather=scenario["weather"],
-            mission_type=scenario["mission"],
-            output_dir=scenario_dir,
-            save_interval=20
-        )
-        
-        print(f"Scenario {i+1} completed. Output saved to {scenario_dir}/")
+        checkpoint_path = os.path.join(scenario_dir, CHECKPOINT_FILENAME)
+        header = read_checkpoint_header(checkpoint_path)
+        if header and (header["complete"] or header["step_count"] >= scenario["num_steps"]):
+            print(f"Scenario {i+1} already completed. Output in {scenario_dir}/")
+            continue
+        pending.append((i, scenario, scenario_dir, checkpoint_path if header else None))
+    
+    # The scenarios share no state, so they run side by side, one per process
+    if pending:
+        print(f"\nRunning {len(pending)} scenario(s) in parallel...")
+        with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as executor:
+            futures = {executor.submit(_run_one_scenario, *args): args[2] for args in pending}
+            for future in as_completed(futures):
+                i = future.result()
+                scenario_dir = futures[future]
+                print(f"Scenario {i+1} completed. Output saved to {scenario_dir}/")
     
     print("\nAll demonstration scenarios completed.")
     print(f"Output saved to {output_dir}/")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == "--demo":
-        generate_demo()
-    else:
-        main()
\ No newline at end of file
+    main()
\ No newline at end of file
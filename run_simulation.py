@@ -6,8 +6,30 @@ This provides an easy way to customize simulation runs without editing code.
 """
 
 import argparse
-from headless_simulation import HeadlessSimulation
-from config import DEFAULT_CONFIG
+from config import DEFAULT_CONFIG, make_config
+
+# Command-line option (argparse dest) for each configuration key it sets
+CONFIG_OPTIONS = {
+    "drones": "NUM_DRONES",
+    "targets": "NUM_TARGETS",
+    "turrets": "NUM_TURRETS",
+    "obstacles": "NUM_OBSTACLES",
+    "field_size": "FIELD_SIZE",
+    "drone_speed": "DRONE_MAX_SPEED",
+    "drone_fuel": "DRONE_MAX_FUEL",
+    "fuel_consumption": "DRONE_FUEL_CONSUMPTION_RATE",
+    "sensor_range": "DRONE_SENSOR_RANGE",
+    "turret_range": "TURRET_RANGE",
+    "turret_cooldown": "TURRET_COOLDOWN",
+    "cohesion": "WEIGHT_COHESION",
+    "separation": "WEIGHT_SEPARATION",
+    "alignment": "WEIGHT_ALIGNMENT",
+    "target_seeking": "WEIGHT_TARGET_SEEKING",
+    "obstacle_avoidance": "WEIGHT_OBSTACLE_AVOIDANCE",
+    "turret_avoidance": "WEIGHT_TURRET_AVOIDANCE",
+    "flocking_workers": "FLOCKING_WORKERS",
+    "flocking_backend": "FLOCKING_BACKEND",
+}
 
 def main():
     """Main entry point for running customized simulations."""
@@ -19,53 +41,45 @@ def main():
     # Basic simulation parameters
     parser.add_argument("--steps", type=int, default=200,
                        help="Number of simulation steps")
-    parser.add_argument("--drones", type=int, default=DEFAULT_CONFIG["NUM_DRONES"],
-                       help="Number of drones in the swarm")
-    parser.add_argument("--targets", type=int, default=DEFAULT_CONFIG["NUM_TARGETS"],
-                       help="Number of targets")
-    parser.add_argument("--turrets", type=int, default=DEFAULT_CONFIG["NUM_TURRETS"],
-                       help="Number of defensive turrets")
-    parser.add_argument("--obstacles", type=int, default=DEFAULT_CONFIG["NUM_OBSTACLES"],
-                       help="Number of obstacles in the terrain")
+    parser.add_argument("--drones", type=int, help="Number of drones in the swarm")
+    parser.add_argument("--targets", type=int, help="Number of targets")
+    parser.add_argument("--turrets", type=int, help="Number of defensive turrets")
+    parser.add_argument("--obstacles", type=int, help="Number of obstacles in the terrain")
     
     # Field parameters
-    parser.add_argument("--field-size", type=float, default=DEFAULT_CONFIG["FIELD_SIZE"],
-                       help="Size of the simulation field")
+    parser.add_argument("--field-size", type=float, help="Size of the simulation field")
     
     # Drone parameters
-    parser.add_argument("--drone-speed", type=float, default=DEFAULT_CONFIG["DRONE_MAX_SPEED"],
-                       help="Maximum drone speed")
-    parser.add_argument("--drone-fuel", type=float, default=DEFAULT_CONFIG["DRONE_MAX_FUEL"],
-                       help="Maximum drone fuel")
-    parser.add_argument("--fuel-consumption", type=float, 
-                       default=DEFAULT_CONFIG["DRONE_FUEL_CONSUMPTION_RATE"],
+    parser.add_argument("--drone-speed", type=float, help="Maximum drone speed")
+    parser.add_argument("--drone-fuel", type=float, help="Maximum drone fuel")
+    parser.add_argument("--fuel-consumption", type=float,
                        help="Fuel consumption rate per step")
-    parser.add_argument("--sensor-range", type=float, default=DEFAULT_CONFIG["DRONE_SENSOR_RANGE"],
-                       help="Drone sensor detection range")
+    parser.add_argument("--sensor-range", type=float, help="Drone sensor detection range")
     
     # Turret parameters
-    parser.add_argument("--turret-range", type=float, default=DEFAULT_CONFIG["TURRET_RANGE"],
-                       help="Defensive turret range")
-    parser.add_argument("--turret-cooldown", type=int, default=DEFAULT_CONFIG["TURRET_COOLDOWN"],
-                       help="Turret reload time (in steps)")
+    parser.add_argument("--turret-range", type=float, help="Defensive turret range")
+    parser.add_argument("--turret-cooldown", type=int, help="Turret reload time (in steps)")
     
     # Behavior weights
-    parser.add_argument("--cohesion", type=float, default=DEFAULT_CONFIG["WEIGHT_COHESION"],
-                       help="Weight for cohesion behavior")
-    parser.add_argument("--separation", type=float, default=DEFAULT_CONFIG["WEIGHT_SEPARATION"],
-                       help="Weight for separation behavior")
-    parser.add_argument("--alignment", type=float, default=DEFAULT_CONFIG["WEIGHT_ALIGNMENT"],
-                       help="Weight for alignment behavior")
-    parser.add_argument("--target-seeking", type=float, 
-                       default=DEFAULT_CONFIG["WEIGHT_TARGET_SEEKING"],
+    parser.add_argument("--cohesion", type=float, help="Weight for cohesion behavior")
+    parser.add_argument("--separation", type=float, help="Weight for separation behavior")
+    parser.add_argument("--alignment", type=float, help="Weight for alignment behavior")
+    parser.add_argument("--target-seeking", type=float,
                        help="Weight for target seeking behavior")
-    parser.add_argument("--obstacle-avoidance", type=float, 
-                       default=DEFAULT_CONFIG["WEIGHT_OBSTACLE_AVOIDANCE"],
+    parser.add_argument("--obstacle-avoidance", type=float,
                        help="Weight for obstacle avoidance behavior")
-    parser.add_argument("--turret-avoidance", type=float, 
-                       default=DEFAULT_CONFIG["WEIGHT_TURRET_AVOIDANCE"],
+    parser.add_argument("--turret-avoidance", type=float,
                        help="Weight for turret avoidance behavior")
     
+    # Performance
+    parser.add_argument("--flocking-workers", type=int,
+                       help="Worker processes for flocking of very large swarms (0 = in-process)")
+    parser.add_argument("--flocking-backend", choices=("numpy", "cupy"),
+                       help="Array library for flocking; cupy runs it on the GPU")
+    
+    # Defaults of the configuration options come straight from DEFAULT_CONFIG
+    parser.set_defaults(**{dest: DEFAULT_CONFIG[key] for dest, key in CONFIG_OPTIONS.items()})
+    
     # Output options
     parser.add_argument("--output-dir", type=str, default="output",
                        help="Directory for output files")
@@ -74,29 +88,26 @@ def main():
     parser.add_argument("--no-plots", action="store_true",
                        help="Disable plot generation for faster simulation")
     
+    # Checkpointing
+    parser.add_argument("--checkpoint-interval", type=int, default=0,
+                       help="Save a checkpoint every N steps (0 disables)")
+    parser.add_argument("--resume", type=str, default=None,
+                       help="Resume from a checkpoint file")
+    
     args = parser.parse_args()
     
+    # Imported only once there is a simulation to run; it loads matplotlib
+    # and the simulation stack, which `--help` does not need
+    from headless_simulation import HeadlessSimulation
+    from checkpoint import install_stop_handlers, stop_requested
+    
+    # SIGTERM/SIGUSR1 (or the end of a SLURM allocation) checkpoint the run
+    # to the output directory and stop it instead of losing it
+    install_stop_handlers()
+    
     # Create custom configuration with user-provided parameters
-    config = DEFAULT_CONFIG.copy()
-    config.update({
-        "NUM_DRONES": args.drones,
-        "NUM_TARGETS": args.targets,
-        "NUM_TURRETS": args.turrets,
-        "NUM_OBSTACLES": args.obstacles,
-        "FIELD_SIZE": args.field_size,
-        "DRONE_MAX_SPEED": args.drone_speed,
-        "DRONE_MAX_FUEL": args.drone_fuel,
-        "DRONE_FUEL_CONSUMPTION_RATE": args.fuel_consumption,
-        "DRONE_SENSOR_RANGE": args.sensor_range,
-        "TURRET_RANGE": args.turret_range,
-        "TURRET_COOLDOWN": args.turret_cooldown,
-        "WEIGHT_COHESION": args.cohesion,
-        "WEIGHT_SEPARATION": args.separation,
-        "WEIGHT_ALIGNMENT": args.alignment,
-        "WEIGHT_TARGET_SEEKING": args.target_seeking,
-        "WEIGHT_OBSTACLE_AVOIDANCE": args.obstacle_avoidance,
-        "WEIGHT_TURRET_AVOIDANCE": args.turret_avoidance
-    })
+    options = vars(args)
+    config = make_config(**{key: options[dest] for dest, key in CONFIG_OPTIONS.items()})
     
     # Print simulation parameters
     print("=== NATO MILITARY DRONE SWARM SIMULATION ===")
@@ -114,10 +125,12 @@ def main():
     sim.run_simulation(
         num_steps=args.steps,
         generate_plots=not args.no_plots,
-        save_interval=args.interval
+        save_interval=args.interval,
+        checkpoint_interval=args.checkpoint_interval,
+        resume=args.resume
     )
     
-    print("\nSimulation complete!")
+    print("\nSimulation stopped." if stop_requested() else "\nSimulation complete!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,10 +2,591 @@
 Core simulation components for the drone swarm simulation.
 """
 
+import copy
+import math
 import numpy as np
-from collections import deque
 from typing import List, Optional, Dict, Tuple
 
+# Try to import numba for the compiled integration kernel (the optional "jit" extra)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+class TrajectoryBuffer:
+    """
+    Fixed-capacity ring buffer of recent positions.
+    
+    Points are stored in a single contiguous (capacity, 2) array that is
+    overwritten in place, so appending never allocates and the recent
+    history can be read back as one array instead of a list of copies.
+    The points and the append count can be moved into rows of larger
+    arrays with bind(), so a whole swarm's trails can be appended at once.
+    """
+    
+    def __init__(self, capacity: int = 20, dtype=np.float32):
+        """
+        Initialize the buffer.
+        
+        Args:
+            capacity (int): Maximum number of positions kept
+            dtype: NumPy dtype used to store positions
+        """
+        self.capacity = capacity
+        self.points = np.zeros((capacity, 2), dtype=dtype)
+        # Total number of positions appended, kept in slot _slot of _heads
+        self._heads = np.zeros(1, dtype=np.int64)
+        self._slot = 0
+    
+    @property
+    def head(self) -> int:
+        return int(self._heads[self._slot])
+    
+    @head.setter
+    def head(self, value: int):
+        self._heads[self._slot] = value
+    
+    def bind(self, points: np.ndarray, heads: np.ndarray, slot: int):
+        """
+        Move the buffer into shared storage, keeping its history.
+        
+        Args:
+            points (np.ndarray): (capacity, 2) array to store positions in
+            heads (np.ndarray): Array of append counts
+            slot (int): Index of this buffer's count within heads
+        """
+        points[:] = self.points
+        heads[slot] = self.head
+        self.points = points
+        self._heads = heads
+        self._slot = slot
+    
+    def append(self, pos: np.ndarray):
+        """Record a position, overwriting the oldest one when full."""
+        self.points[self.head % self.capacity] = pos
+        self.head += 1
+    
+    def clear(self):
+        """Forget all recorded positions."""
+        self.head = 0
+    
+    def recent(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Get the most recent positions in chronological order.
+        
+        Args:
+            n (Optional[int]): Number of positions to return (all if None)
+            
+        Returns:
+            np.ndarray: Array of shape (k, 2), a view when not wrapped
+        """
+        count = len(self) if n is None else max(0, min(n, len(self)))
+        start = (self.head - count) % self.capacity
+        if start + count <= self.capacity:
+            return self.points[start:start + count]
+        return np.take(self.points, np.arange(start, start + count) % self.capacity, axis=0)
+    
+    def __len__(self) -> int:
+        return min(self.head, self.capacity)
+    
+    def __iter__(self):
+        return iter(self.recent())
+    
+    def __getitem__(self, index):
+        return self.recent()[index]
+
+
+# Number of recent positions kept per drone for drawing its trail
+TRAJECTORY_LENGTH = 20
+
+# Status names in id order; statuses outside this list are appended on first use
+DRONE_STATUSES = ["Idle", "Moving", "Attacking", "Avoiding", "LowFuel", "NoFuel", "Destroyed"]
+
+# Config values drones and turrets cache for their per-step work; when any of
+# them changes in a running simulation the caches are refreshed
+CACHED_CONFIG_KEYS = (
+    "DRONE_FUEL_CONSUMPTION_RATE", "DRONE_MAX_FUEL", "LOW_FUEL_THRESHOLD",
+    "DRONE_ATTACK_RANGE", "DRONE_SENSOR_RANGE", "DRONE_INITIAL_AVOID_FACTOR",
+    "DRONE_LEARNED_AVOID_INCREASE", "WEIGHT_TARGET_SEEKING", "WEIGHT_OBSTACLE_AVOIDANCE",
+    "WEIGHT_TURRET_AVOIDANCE", "WEIGHT_COHESION", "WEIGHT_SEPARATION",
+    "WEIGHT_ALIGNMENT", "FIELD_SIZE",
+)
+_STATUS_IDS = {name: i for i, name in enumerate(DRONE_STATUSES)}
+
+
+def status_id(status: str) -> int:
+    """
+    Get the integer id of a drone status, registering unknown statuses.
+    
+    Args:
+        status (str): Status name
+        
+    Returns:
+        int: Index of the status in DRONE_STATUSES
+    """
+    code = _STATUS_IDS.get(status)
+    if code is None:
+        code = _STATUS_IDS[status] = len(DRONE_STATUSES)
+        DRONE_STATUSES.append(status)
+    return code
+
+
+class DroneState:
+    """
+    Structure-of-arrays storage for drone state.
+    
+    Each field is one contiguous array indexed by drone slot, so whole-swarm
+    queries (positions, speeds, alive masks, status counts) are single NumPy
+    operations instead of a Python loop over drone objects.
+    """
+    
+    # Bumped by every alive or status write through a Drone, so cached
+    # results (see Simulation.get_statistics) notice changes made outside
+    # Simulation.step()
+    version = 0
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize empty storage.
+        
+        Args:
+            capacity (int): Number of drone slots
+        """
+        self.size = capacity
+        self.id = np.zeros(capacity, dtype=np.int32)
+        # Kinematics are single precision: the field is ~100 units wide, so
+        # float32 is far finer than anything the physics or the plot resolves
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.fuel = np.zeros(capacity, dtype=float)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.status_id = np.zeros(capacity, dtype=np.int8)
+        # Per-step flocking, obstacle and turret avoidance forces (and
+        # whether the last is strong enough to count as avoiding), valid
+        # only while forces_ready is set
+        self.flocking = np.zeros((capacity, 2), dtype=np.float32)
+        self.obstacle_force = np.zeros((capacity, 2), dtype=float)
+        self.turret_force = np.zeros((capacity, 2), dtype=float)
+        self.turret_alert = np.zeros(capacity, dtype=bool)
+        self.forces_ready = False
+        # Trail ring buffers backing each drone's TrajectoryBuffer; display
+        # only, so half precision is plenty
+        self.trail = np.zeros((capacity, TRAJECTORY_LENGTH, 2), dtype=np.float16)
+        self.trail_head = np.zeros(capacity, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def copy(self) -> 'DroneState':
+        """
+        Copy the columns into a detached store.
+        
+        Returns:
+            DroneState: Independent copy that later steps will not modify
+        """
+        state = DroneState(0)
+        for name in ('id', 'pos', 'velocity', 'fuel', 'alive', 'status_id', 'flocking',
+                     'obstacle_force', 'turret_force', 'turret_alert', 'trail', 'trail_head'):
+            setattr(state, name, getattr(self, name).copy())
+        state.size = self.size
+        return state
+    
+    @classmethod
+    def bind(cls, drones: List['Drone']) -> 'DroneState':
+        """
+        Move the state of the given drones into one shared store.
+        
+        Args:
+            drones (List[Drone]): Drones to bind, in slot order
+            
+        Returns:
+            DroneState: The new store backing all the drones
+        """
+        state = cls(len(drones))
+        for index, drone in enumerate(drones):
+            drone._bind(state, index)
+        return state
+
+
+class EntityState:
+    """
+    Structure-of-arrays storage for the geometry of targets, turrets and obstacles.
+    
+    These entities never move, so their positions and ranges are gathered
+    once into contiguous arrays and each entity's `pos` is rebound to its
+    row. Whole-swarm distance queries can then broadcast drone positions
+    against one (M, 2) array instead of visiting every entity object.
+    Mutable per-entity state (alive flags, cooldowns) stays on the objects.
+    """
+    
+    def __init__(self, targets: list, turrets: list, obstacles: list):
+        """
+        Gather the geometry of the given entities.
+        
+        Args:
+            targets (list): Targets, in list order
+            turrets (list): Turrets, in list order; each needs a `range`
+            obstacles (list): Obstacles, in list order; each needs a `radius`
+        """
+        self.target_pos = self._gather(targets)
+        self.turret_pos = self._gather(turrets)
+        self.turret_range = np.array([turret.range for turret in turrets], dtype=float)
+        self.turret_range_sq = self.turret_range * self.turret_range
+        self.obstacle_pos = self._gather(obstacles)
+        self.obstacle_radius = np.array([obstacle.radius for obstacle in obstacles], dtype=float)
+    
+    @staticmethod
+    def _gather(entities: list) -> np.ndarray:
+        """Copy entity positions into one (M, 2) array and rebind each `pos` to its row."""
+        pos = np.zeros((len(entities), 2), dtype=float)
+        for index, entity in enumerate(entities):
+            pos[index] = entity.pos
+            entity.pos = pos[index]
+        return pos
+    
+    def matches(self, targets: list, turrets: list, obstacles: list) -> bool:
+        """
+        Check whether the store still covers the given entity lists.
+        
+        Args:
+            targets (list): Current targets
+            turrets (list): Current turrets
+            obstacles (list): Current obstacles
+        
+        Returns:
+            bool: False if entities were added or removed since binding
+        """
+        return (len(self.target_pos) == len(targets) and
+                len(self.turret_pos) == len(turrets) and
+                len(self.obstacle_pos) == len(obstacles))
+
+
+class SimulationSnapshot:
+    """
+    Frozen copy of the simulation state needed to draw one frame.
+    
+    Rendering from a snapshot lets the next Simulation.step() run on a worker
+    thread at the same time. Drone columns and trajectories are copied;
+    targets and turrets are shallow copies; obstacles never change and are
+    shared.
+    """
+    
+    def __init__(self, simulation: 'Simulation'):
+        """
+        Capture the current state of a simulation.
+        
+        Args:
+            simulation (Simulation): Simulation to capture
+        """
+        self.config = simulation.config
+        self.gis = simulation.gis
+        self.source_id = simulation.source_id
+        self.step_count = simulation.step_count
+        self.generation = simulation.generation
+        self.drones = list(simulation.drones)
+        self.targets = [copy.copy(target) for target in simulation.targets]
+        self.turrets = [copy.copy(turret) for turret in simulation.turrets]
+        self.obstacles = simulation.obstacles
+        self.drone_state = simulation.drone_state.copy()
+        self._trails = [trail.copy() for trail in simulation.drone_trails()]
+    
+    def drone_trails(self) -> List[np.ndarray]:
+        """Get the captured trajectory window of every drone."""
+        return self._trails
+
+
+# Swarms at least this large find neighbours through a uniform grid
+# instead of a dense pairwise distance matrix
+GRID_MIN_DRONES = 128
+
+
+def _ragged_arange(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate arange(start, start + count) for every (start, count) pair."""
+    total = counts.sum()
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+    ends = np.cumsum(counts)
+    return np.repeat(starts - (ends - counts), counts) + np.arange(total)
+
+
+def find_neighbor_pairs(pos: np.ndarray, alive: np.ndarray, radius: float,
+                        start: int = 0, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find all ordered pairs of distinct drones closer than a radius.
+    
+    Small swarms use one dense broadcast. Larger swarms bucket drones into a
+    uniform grid with cells of side `radius`, so each drone is only tested
+    against the occupants of its own and the 8 surrounding cells.
+    
+    Args:
+        pos (np.ndarray): Drone positions, shape (N, 2)
+        alive (np.ndarray): Mask of drones that can be neighbours, shape (N,)
+        radius (float): Neighbourhood radius
+        start (int): First drone to find neighbours for
+        stop (Optional[int]): End of the range of drones to find neighbours
+            for (all remaining drones if None)
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Index arrays (i, j) where j is a
+        living neighbour of i, with i in [start, stop)
+    """
+    num_drones = len(pos)
+    stop = num_drones if stop is None else stop
+    radius_sq = radius * radius
+    
+    if num_drones < GRID_MIN_DRONES:
+        offsets = pos[start:stop, None, :] - pos[None, :, :]
+        dist_sq = np.einsum('ijk,ijk->ij', offsets, offsets)
+        neighbors = (dist_sq < radius_sq) & alive[None, :]
+        rows = np.arange(stop - start)
+        neighbors[rows, rows + start] = False
+        i, j = np.nonzero(neighbors)
+        return i + start, j
+    
+    # Bucket living drones by cell, sorted so each cell is a contiguous run
+    cells = np.floor((pos - pos.min(axis=0)) / radius).astype(np.intp)
+    nx, ny = cells.max(axis=0) + 1
+    cell_id = cells[:, 1] * nx + cells[:, 0]
+    members = np.flatnonzero(alive)
+    members = members[np.argsort(cell_id[members], kind='stable')]
+    cell_count = np.bincount(cell_id[members], minlength=nx * ny)
+    cell_start = np.cumsum(cell_count) - cell_count
+    
+    pair_i = []
+    pair_j = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            cx = cells[start:stop, 0] + dx
+            cy = cells[start:stop, 1] + dy
+            inside = np.flatnonzero((cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny))
+            other = cy[inside] * nx + cx[inside]
+            counts = cell_count[other]
+            pair_i.append(np.repeat(inside + start, counts))
+            pair_j.append(members[_ragged_arange(cell_start[other], counts)])
+    
+    i = np.concatenate(pair_i)
+    j = np.concatenate(pair_j)
+    delta = pos[i] - pos[j]
+    keep = (i != j) & (np.einsum('ij,ij->i', delta, delta) < radius_sq)
+    return i[keep], j[keep]
+
+
+def _dense_flocking_forces(pos: np.ndarray, vel: np.ndarray, alive: np.ndarray,
+                           config: dict) -> np.ndarray:
+    """
+    Flocking forces from one (N, N) neighbour matrix, for small swarms.
+    
+    Cohesion and alignment are masked matrix products and separation is one
+    einsum over the offset tensor. Arguments and result are as for
+    compute_flocking_forces().
+    """
+    sensor_range = config["DRONE_SENSOR_RANGE"]
+    
+    # offsets[i, j] points from neighbour j to drone i
+    offsets = pos[:, None, :] - pos[None, :, :]
+    dist_sq = np.einsum('ijk,ijk->ij', offsets, offsets)
+    neighbors = (dist_sq < sensor_range * sensor_range) & alive[None, :]
+    np.fill_diagonal(neighbors, False)
+    weights = neighbors.astype(pos.dtype)
+    counts = weights.sum(axis=1)
+    inv_counts = (1.0 / np.maximum(counts, 1))[:, None]
+    
+    # Cohesion: steer towards center of mass of nearby drones
+    cohesion = (weights @ pos * inv_counts - pos) * config["WEIGHT_COHESION"]
+    
+    # Alignment: steer towards average heading of nearby drones
+    alignment = (weights @ vel * inv_counts - vel) * config["WEIGHT_ALIGNMENT"]
+    
+    # Separation: (offset / dist) * (range / dist), stronger when closer;
+    # drones on top of each other push apart in a random direction
+    coincident = neighbors & (dist_sq < 1e-12)
+    scale = np.divide(sensor_range, dist_sq, out=np.zeros_like(dist_sq), where=neighbors & ~coincident)
+    push = np.einsum('ij,ijk->ik', scale, offsets)
+    if coincident.any():
+        i, _ = np.nonzero(coincident)
+        np.add.at(push, i, (np.random.rand(len(i), 2) * 2 - 1) * sensor_range)
+    separation = push * config["WEIGHT_SEPARATION"]
+    
+    forces = cohesion + separation + alignment
+    forces[counts == 0] = 0.0
+    return forces
+
+
+def compute_flocking_forces(pos: np.ndarray, vel: np.ndarray, alive: np.ndarray,
+                            config: dict, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """
+    Compute cohesion, separation and alignment forces for a whole swarm.
+    
+    Small swarms fuse the three rules into products with a dense neighbour
+    matrix. Larger swarms find neighbour pairs on a grid and accumulate the
+    rules per drone with bincount. Either way the neighbour scan runs as a
+    handful of array operations instead of a Python loop. Large swarms can
+    also be computed one row range at a time, which is how parallel_flocking
+    splits the work across processes.
+    
+    Args:
+        pos (np.ndarray): Drone positions, shape (N, 2)
+        vel (np.ndarray): Drone velocities, shape (N, 2)
+        alive (np.ndarray): Mask of drones that count as neighbours, shape (N,)
+        config (dict): Simulation configuration
+        start (int): First drone to compute the force for
+        stop (Optional[int]): End of the range of drones to compute forces
+            for (all remaining drones if None)
+        
+    Returns:
+        np.ndarray: Combined flocking force per drone in [start, stop),
+        shape (stop - start, 2)
+    """
+    num_drones = len(pos)
+    stop = num_drones if stop is None else stop
+    if num_drones < GRID_MIN_DRONES:
+        return _dense_flocking_forces(pos, vel, alive, config)[start:stop]
+    
+    sensor_range = config["DRONE_SENSOR_RANGE"]
+    num_rows = stop - start
+    forces = np.zeros((num_rows, 2))
+    
+    i, j = find_neighbor_pairs(pos, alive, sensor_range, start, stop)
+    if len(i) == 0:
+        return forces
+    
+    # offsets point from each neighbour to the drone
+    offsets = pos[i] - pos[j]
+    dist_sq = np.einsum('ij,ij->i', offsets, offsets)
+    
+    # From here on i indexes the rows of the result
+    i = i - start
+    pos_rows = pos[start:stop]
+    vel_rows = vel[start:stop]
+    counts = np.bincount(i, minlength=num_rows)
+    has_neighbors = counts > 0
+    inv_counts = 1.0 / np.maximum(counts, 1)
+    
+    # Separation: (offset / dist) * (range / dist), stronger when closer;
+    # drones on top of each other push apart in a random direction
+    coincident = dist_sq < 1e-12
+    scale = np.divide(sensor_range, dist_sq, out=np.zeros_like(dist_sq), where=~coincident)
+    push = offsets * scale[:, None]
+    if coincident.any():
+        push[coincident] = (np.random.rand(coincident.sum(), 2) * 2 - 1) * sensor_range
+    
+    for axis in range(2):
+        # Cohesion: steer towards center of mass of nearby drones
+        center = np.bincount(i, weights=pos[j, axis], minlength=num_rows) * inv_counts
+        cohesion = (center - pos_rows[:, axis]) * config["WEIGHT_COHESION"]
+        
+        separation = np.bincount(i, weights=push[:, axis], minlength=num_rows) * config["WEIGHT_SEPARATION"]
+        
+        # Alignment: steer towards average heading of nearby drones
+        heading = np.bincount(i, weights=vel[j, axis], minlength=num_rows) * inv_counts
+        alignment = (heading - vel_rows[:, axis]) * config["WEIGHT_ALIGNMENT"]
+        
+        forces[:, axis] = np.where(has_neighbors, cohesion + separation + alignment, 0.0)
+    
+    return forces
+
+
+def _integrate_drones_numpy(pos: np.ndarray, vel: np.ndarray, steering: np.ndarray,
+                           moving: np.ndarray, max_speed: np.ndarray, field_size: float):
+    """NumPy implementation of integrate_drones()."""
+    index = np.flatnonzero(moving)
+    v = vel[index]
+    v += steering[index]
+    
+    # Limit velocity to max speed
+    speed = np.sqrt(np.einsum('ij,ij->i', v, v))
+    limit = max_speed[index]
+    over = speed > limit
+    v[over] = v[over] / speed[over, None] * limit[over, None]
+    
+    # Update position, bouncing off the field edges with energy loss
+    p = pos[index] + v
+    outside = (p < 0) | (p > field_size)
+    np.clip(p, 0, field_size, out=p)
+    v[outside] *= -0.5
+    
+    pos[index] = p
+    vel[index] = v
+
+
+def _integrate_drones_loop(pos, vel, steering, moving, max_speed, field_size):
+    """Per-drone loop implementation of integrate_drones(), compiled with numba."""
+    for i in range(pos.shape[0]):
+        if not moving[i]:
+            continue
+        vx = np.float32(vel[i, 0] + steering[i, 0])
+        vy = np.float32(vel[i, 1] + steering[i, 1])
+        
+        # Limit velocity to max speed
+        speed = np.sqrt(vx * vx + vy * vy)
+        if speed > max_speed[i]:
+            vx = vx / speed * max_speed[i]
+            vy = vy / speed * max_speed[i]
+        
+        # Update position, bouncing off the field edges with energy loss;
+        # clamps and a multiplier instead of branches
+        px = pos[i, 0] + vx
+        py = pos[i, 1] + vy
+        vx *= np.float32(1.0 - 1.5 * ((px < 0) | (px > field_size)))
+        vy *= np.float32(1.0 - 1.5 * ((py < 0) | (py > field_size)))
+        px = min(max(px, 0.0), field_size)
+        py = min(max(py, 0.0), field_size)
+        
+        pos[i, 0] = px
+        pos[i, 1] = py
+        vel[i, 0] = vx
+        vel[i, 1] = vy
+
+
+if NUMBA_AVAILABLE:
+    _integrate_drones_loop = njit(cache=True)(_integrate_drones_loop)
+
+
+def integrate_drones(pos: np.ndarray, vel: np.ndarray, steering: np.ndarray,
+                     moving: np.ndarray, max_speed: np.ndarray, field_size: float):
+    """
+    Apply one step of steering and motion to a whole swarm in place.
+    
+    Matches Drone.update's integration: add the steering force, cap the
+    speed, move, and bounce off the field edges with energy loss. Uses a
+    numba-compiled loop when numba is installed, NumPy otherwise.
+    
+    Args:
+        pos (np.ndarray): Drone positions, shape (N, 2), updated in place
+        vel (np.ndarray): Drone velocities, shape (N, 2), updated in place
+        steering (np.ndarray): Steering force per drone, shape (N, 2)
+        moving (np.ndarray): Mask of drones to integrate, shape (N,)
+        max_speed (np.ndarray): Speed limit per drone, same dtype as vel
+        field_size (float): Side length of the square field
+    """
+    if NUMBA_AVAILABLE:
+        _integrate_drones_loop(pos, vel, steering, moving, max_speed, float(field_size))
+    else:
+        _integrate_drones_numpy(pos, vel, steering, moving, max_speed, field_size)
+
+
+def warm_up_kernels():
+    """
+    Compile the numba kernels ahead of the first simulation step.
+    
+    numba compiles a kernel, or loads it from its on-disk cache, on the first
+    call; long-running front ends call this at startup so the first step of
+    a simulation is not held up by it. Does nothing without numba.
+    """
+    if NUMBA_AVAILABLE:
+        # Same argument types as the calls from Simulation._update_drones_batched()
+        pos = np.zeros((1, 2), dtype=np.float32)
+        vel = np.zeros((1, 2), dtype=np.float32)
+        integrate_drones(pos, vel, np.zeros((1, 2)), np.ones(1, dtype=bool),
+                         np.ones(1, dtype=np.float32), 1.0)
+
+
+# Shared zero force returned by hot paths instead of a fresh np.zeros(2)
+_ZERO_VECTOR = np.zeros(2)
+_ZERO_VECTOR.flags.writeable = False
+
+
 class Target:
     """Target entity that drones can attack."""
     
@@ -49,8 +630,15 @@ class Turret:
         self.pos = np.array([x, y], dtype=float)
         self.config = config
         self.range = config["TURRET_RANGE"]
+        self.range_sq = self.range * self.range  # For sqrt-free range checks
         self.cooldown_timer = 0
         self.cooldown_max = config["TURRET_COOLDOWN"]
+        self.refresh_config()
+    
+    def refresh_config(self):
+        """Re-read the cached config values, e.g. after the config was edited."""
+        notify_range = self.config["DRONE_SENSOR_RANGE"] / 2  # Drones this close to a kill learn of it
+        self.notify_range_sq = notify_range * notify_range
     
     def get_pos(self) -> np.ndarray:
         """Get turret position."""
@@ -60,55 +648,101 @@ class Turret:
         """Check if turret can shoot."""
         return self.cooldown_timer <= 0
     
-    def find_target(self, drones: List['Drone']) -> Optional['Drone']:
+    def find_target(self, drones: List['Drone'], dist_sq: Optional[np.ndarray] = None) -> Optional['Drone']:
         """
         Find the closest drone within range.
         
         Args:
             drones (List[Drone]): List of drones to check
+            dist_sq (Optional[np.ndarray]): Precomputed squared distance from
+                this turret to each drone, in list order, infinite for drones
+                that are destroyed or out of fuel
             
         Returns:
             Optional[Drone]: The closest drone or None
         """
+        if dist_sq is not None:
+            # Only drones in range are visited, nearest first; drones already
+            # out of action are excluded by the caller, so only kills made
+            # earlier in the same step still need checking
+            in_range = np.flatnonzero(dist_sq < self.range_sq)
+            for index in in_range[np.argsort(dist_sq[in_range], kind='stable')]:
+                drone = drones[index]
+                if drone.alive:
+                    return drone
+            return None
+        
         closest_drone = None
-        min_dist_sq = self.range**2
+        min_dist_sq = self.range_sq
         for drone in drones:
             if drone.alive and drone.status != "NoFuel":
-                dist_sq = np.sum((drone.pos - self.pos)**2)
+                dx, dy = drone.pos - self.pos
+                dist_sq = dx * dx + dy * dy
                 if dist_sq < min_dist_sq:
                     min_dist_sq = dist_sq
                     closest_drone = drone
         return closest_drone
     
-    def shoot(self, drone: Optional['Drone'], all_drones: List['Drone']):
+    def shoot(self, drone: Optional['Drone'], all_drones: List['Drone'],
+              drone_pos: Optional[np.ndarray] = None):
         """
         Shoot at a drone.
         
         Args:
             drone (Optional[Drone]): The drone to shoot at
             all_drones (List[Drone]): All drones in the simulation
+            drone_pos (Optional[np.ndarray]): Positions of all_drones in list
+                order, shape (N, 2); lets the nearby-drone scan run as one
+                array operation
+            
+        Returns:
+            bool: True if the turret fired
         """
         if self.can_shoot() and drone and drone.alive:
             drone.alive = False
             drone.status = "Destroyed"
             self.cooldown_timer = self.cooldown_max
             # Notify nearby drones (simple learning mechanism)
-            for d_notify in all_drones:
-                if d_notify.alive and np.linalg.norm(d_notify.pos - drone.pos) < self.config["DRONE_SENSOR_RANGE"] / 2:
+            notify_range_sq = self.notify_range_sq
+            if drone_pos is not None:
+                offsets = drone_pos - drone.pos
+                nearby = np.flatnonzero(np.einsum('ij,ij->i', offsets, offsets) < notify_range_sq)
+                candidates = [all_drones[index] for index in nearby]
+            else:
+                candidates = []
+                for d in all_drones:
+                    if d.alive:
+                        dx, dy = d.pos - drone.pos
+                        if dx * dx + dy * dy < notify_range_sq:
+                            candidates.append(d)
+            for d_notify in candidates:
+                if d_notify.alive:
                     d_notify.register_threat(self.id, drone.pos)
+            return True
+        return False
     
-    def update(self, drones: List['Drone']):
+    def update(self, drones: List['Drone'], dist_sq: Optional[np.ndarray] = None,
+               drone_pos: Optional[np.ndarray] = None) -> bool:
         """
         Update turret state.
         
         Args:
             drones (List[Drone]): All drones in the simulation
+            dist_sq (Optional[np.ndarray]): Precomputed squared distance from
+                this turret to each drone, in list order, infinite for drones
+                that are destroyed or out of fuel
+            drone_pos (Optional[np.ndarray]): Positions of the drones in list
+                order, shape (N, 2)
+            
+        Returns:
+            bool: True if the turret fired this step
         """
         if self.cooldown_timer > 0:
             self.cooldown_timer -= 1
         if self.can_shoot():
-            target_drone = self.find_target(drones)
-            self.shoot(target_drone, drones)
+            target_drone = self.find_target(drones, dist_sq)
+            return self.shoot(target_drone, drones, drone_pos)
+        return False
 
 
 class Obstacle:
@@ -132,6 +766,8 @@ class Obstacle:
         self.size = size
         self.radius = size / 2.0
         self.config = config
+        self.effective_radius = self.radius + config["OBSTACLE_AVOIDANCE_DISTANCE"]
+        self.effective_radius_sq = self.effective_radius * self.effective_radius  # For sqrt-free range checks
     
     def get_pos(self) -> np.ndarray:
         """Get obstacle position."""
@@ -145,16 +781,22 @@ class Obstacle:
             drone_pos (np.ndarray): Position of the drone
             
         Returns:
-            np.ndarray: Repulsion vector
+            np.ndarray: Repulsion vector; read-only when zero
         """
-        vec_to_obs = drone_pos - self.pos
-        dist_to_obs = np.linalg.norm(vec_to_obs)
-        effective_radius = self.radius + self.config["OBSTACLE_AVOIDANCE_DISTANCE"]
-        if 0 < dist_to_obs < effective_radius:
-            strength = (1.0 - dist_to_obs / effective_radius)**2
-            repulsion_direction = vec_to_obs / dist_to_obs if dist_to_obs > 1e-6 else np.random.rand(2) * 2 - 1
-            return repulsion_direction * strength
-        return np.zeros(2)
+        # Scalar math: most drones are out of range and need no array at all
+        x, y = self.pos.tolist()
+        dx = float(drone_pos[0]) - x
+        dy = float(drone_pos[1]) - y
+        dist_sq = dx * dx + dy * dy
+        
+        # Only drones inside the avoidance radius need the actual distance
+        if not 0 < dist_sq < self.effective_radius_sq:
+            return _ZERO_VECTOR
+        dist_to_obs = math.sqrt(dist_sq)
+        strength = (1.0 - dist_to_obs / self.effective_radius)**2
+        if dist_to_obs > 1e-6:
+            return np.array((dx / dist_to_obs * strength, dy / dist_to_obs * strength))
+        return (np.random.rand(2) * 2 - 1) * strength
 
 
 class Drone:
@@ -172,17 +814,130 @@ class Drone:
             y (float): Y position
             config (dict): Simulation configuration
         """
+        # Kinematics and status live in a DroneState; a lone drone owns a
+        # single-slot store until a Simulation binds it to the shared one
+        self._bind(DroneState(1), 0)
         self.id = drone_id
-        self.pos = np.array([x, y], dtype=float)
-        self.velocity = np.zeros(2, dtype=float)
+        self.pos = (x, y)
         self.alive = True
         self.config = config
         self.fuel = config["DRONE_MAX_FUEL"]
         self.max_speed = config["DRONE_MAX_SPEED"]
         self.target: Optional[Target] = None
         self.status = "Idle"
-        self.trajectory = deque(maxlen=20)  # Fixed length for GUI perf
+        self.trajectory = TrajectoryBuffer(TRAJECTORY_LENGTH, dtype=np.float16)  # Fixed length for GUI perf, display-only precision
+        self.trajectory.bind(self._state.trail[self._index], self._state.trail_head, self._index)
         self.turret_avoidance_factors: Dict[int, float] = {}  # Specific avoidance factors per turret ID
+        
+        self.refresh_config()
+    
+    def refresh_config(self):
+        """
+        Re-read the config constants used every step.
+        
+        They are cached to skip the lookups; Simulation.step() calls this
+        when any of them changed, so config edits apply to a running
+        simulation.
+        """
+        config = self.config
+        self._fuel_rate = config["DRONE_FUEL_CONSUMPTION_RATE"]
+        self._max_fuel = config["DRONE_MAX_FUEL"]
+        self._low_fuel_threshold = config["LOW_FUEL_THRESHOLD"]
+        self._attack_range_sq = config["DRONE_ATTACK_RANGE"] ** 2
+        self._sensor_range = config["DRONE_SENSOR_RANGE"]
+        self._initial_avoid_factor = config["DRONE_INITIAL_AVOID_FACTOR"]
+        self._learned_avoid_increase = config["DRONE_LEARNED_AVOID_INCREASE"]
+        self._w_target = config["WEIGHT_TARGET_SEEKING"]
+        self._w_obstacle = config["WEIGHT_OBSTACLE_AVOIDANCE"]
+        self._w_turret = config["WEIGHT_TURRET_AVOIDANCE"]
+        self._w_cohesion = config["WEIGHT_COHESION"]
+        self._w_separation = config["WEIGHT_SEPARATION"]
+        self._w_alignment = config["WEIGHT_ALIGNMENT"]
+        self._field_size = config["FIELD_SIZE"]
+    
+    def __setstate__(self, state: dict):
+        """Restore a pickled drone, re-creating its row views into the store."""
+        self.__dict__.update(state)
+        if '_state' in state:
+            self._pos = self._state.pos[self._index]
+            self._velocity = self._state.velocity[self._index]
+            self.trajectory.points = self._state.trail[self._index]
+    
+    def _bind(self, state: DroneState, index: int):
+        """
+        Move this drone's state into a slot of the given store.
+        
+        Args:
+            state (DroneState): Store to move into
+            index (int): Slot index within the store
+        """
+        old = self.__dict__.get('_state')
+        if old is not None:
+            old_index = self._index
+            state.id[index] = old.id[old_index]
+            state.pos[index] = old.pos[old_index]
+            state.velocity[index] = old.velocity[old_index]
+            state.fuel[index] = old.fuel[old_index]
+            state.alive[index] = old.alive[old_index]
+            state.status_id[index] = old.status_id[old_index]
+        self._state = state
+        self._index = index
+        # Row views are cached so pos/velocity reads stay cheap
+        self._pos = state.pos[index]
+        self._velocity = state.velocity[index]
+        trajectory = self.__dict__.get('trajectory')
+        if trajectory is not None:
+            trajectory.bind(state.trail[index], state.trail_head, index)
+    
+    @property
+    def id(self) -> int:
+        return int(self._state.id[self._index])
+    
+    @id.setter
+    def id(self, value: int):
+        self._state.id[self._index] = value
+    
+    @property
+    def pos(self) -> np.ndarray:
+        return self._pos
+    
+    @pos.setter
+    def pos(self, value):
+        self._pos[:] = value
+    
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._velocity
+    
+    @velocity.setter
+    def velocity(self, value):
+        self._velocity[:] = value
+    
+    @property
+    def fuel(self) -> float:
+        return float(self._state.fuel[self._index])
+    
+    @fuel.setter
+    def fuel(self, value: float):
+        self._state.fuel[self._index] = value
+    
+    @property
+    def alive(self) -> bool:
+        return bool(self._state.alive[self._index])
+    
+    @alive.setter
+    def alive(self, value: bool):
+        self._state.alive[self._index] = value
+        self._state.version += 1
+    
+    @property
+    def status(self) -> str:
+        return DRONE_STATUSES[self._state.status_id[self._index]]
+    
+    @status.setter
+    def status(self, value: str):
+        self._state.status_id[self._index] = status_id(value)
+        self._state.version += 1
     
     def get_pos(self) -> np.ndarray:
         """Get drone position."""
@@ -213,8 +968,8 @@ class Drone:
             turret_id (int): ID of the turret
             hit_location (np.ndarray): Location where a drone was hit
         """
-        current_factor = self.turret_avoidance_factors.get(turret_id, self.config["DRONE_INITIAL_AVOID_FACTOR"])
-        new_factor = min(current_factor + self.config["DRONE_LEARNED_AVOID_INCREASE"], 5.0)  # Cap max avoidance
+        current_factor = self.turret_avoidance_factors.get(turret_id, self._initial_avoid_factor)
+        new_factor = min(current_factor + self._learned_avoid_increase, 5.0)  # Cap max avoidance
         self.turret_avoidance_factors[turret_id] = new_factor
     
     def calculate_steering_force(self, drones: List['Drone'], targets: List[Target],
@@ -230,96 +985,162 @@ class Drone:
             gis: GIS data handler
             
         Returns:
-            np.ndarray: Steering force vector
+            np.ndarray: Steering force vector, zero on the step the drone
+            strikes its target
         """
         # --- Target Seeking ---
         target_force = np.zeros(2)
         if self.target and self.target.alive:
             target_pos_actual = self.target.get_pos()
             desired_velocity = target_pos_actual - self.pos
-            dist_to_target = np.linalg.norm(desired_velocity)
+            dist_sq = desired_velocity[0] * desired_velocity[0] + desired_velocity[1] * desired_velocity[1]
             
-            if dist_to_target < self.config["DRONE_ATTACK_RANGE"]:
+            if dist_sq < self._attack_range_sq:
+                # The strike takes the drone's whole step: it coasts on its
+                # current velocity and no other force is worth computing
                 self.attack()
-            elif dist_to_target > 1e-6:
+                return np.zeros(2)
+            elif dist_sq > 1e-12:
+                dist_to_target = math.sqrt(dist_sq)
                 desired_velocity = (desired_velocity / dist_to_target) * self.max_speed
-                target_force = (desired_velocity - self.velocity) * self.config["WEIGHT_TARGET_SEEKING"]
+                target_force = (desired_velocity - self.velocity) * self._w_target
         
         # --- Obstacle Avoidance ---
+        # Inside Simulation.step() this is precomputed for the whole swarm
+        if self._state.forces_ready:
+            obstacle_force = self._state.obstacle_force[self._index]
+        else:
+            obstacle_force = self._obstacle_force(obstacles)
+        
+        # --- Turret Avoidance ---
+        # Inside Simulation.step() this is precomputed for the whole swarm
+        if self._state.forces_ready:
+            turret_force = self._state.turret_force[self._index]
+            if self._state.turret_alert[self._index] and self.status != "NoFuel" and self.alive:
+                self.status = "Avoiding"
+        else:
+            turret_force = self._turret_force(turrets)
+        
+        # --- Flocking Behavior ---
+        # Inside Simulation.step() the forces for the whole swarm are
+        # precomputed in one pass; other callers fall back to a local scan
+        if self._state.forces_ready:
+            flocking_force = self._state.flocking[self._index]
+        else:
+            flocking_force = self._flocking_force(drones)
+        
+        # Combine all forces
+        steering_force = (
+            target_force + 
+            obstacle_force + 
+            turret_force + 
+            flocking_force
+        )
+        
+        # Terrain influence if GIS is available
+        if hasattr(gis, 'get_slope'):
+            slope = gis.get_slope(self.pos[0], self.pos[1])
+            if slope > 30:  # Steep slope, reduce speed
+                steering_force *= max(0.5, 1.0 - (slope - 30) / 60.0)
+        
+        return steering_force
+    
+    def _obstacle_force(self, obstacles: List[Obstacle]) -> np.ndarray:
+        """
+        Calculate the combined obstacle avoidance force.
+        
+        Args:
+            obstacles (List[Obstacle]): Obstacles to avoid
+            
+        Returns:
+            np.ndarray: Combined obstacle repulsion
+        """
         obstacle_force = np.zeros(2)
         for obstacle in obstacles:
-            obstacle_force += obstacle.get_repulsion_vector(self.pos) * self.config["WEIGHT_OBSTACLE_AVOIDANCE"]
+            obstacle_force += obstacle.get_repulsion_vector(self.pos) * self._w_obstacle
+        return obstacle_force
+    
+    def _turret_force(self, turrets: List[Turret]) -> np.ndarray:
+        """
+        Calculate the turret avoidance force, marking the drone as Avoiding
+        when a turret is close.
         
-        # --- Turret Avoidance ---
+        Args:
+            turrets (List[Turret]): Turrets to avoid
+            
+        Returns:
+            np.ndarray: Combined turret avoidance force
+        """
         turret_force = np.zeros(2)
         for turret in turrets:
             vec_to_turret = self.pos - turret.pos
-            dist_to_turret = np.linalg.norm(vec_to_turret)
+            dist_sq = vec_to_turret[0] * vec_to_turret[0] + vec_to_turret[1] * vec_to_turret[1]
             
-            # Enhanced avoidance for turrets that have hit nearby drones
-            turret_specific_factor = self.turret_avoidance_factors.get(
-                turret.id, self.config["DRONE_INITIAL_AVOID_FACTOR"]
-            )
-            
-            if 0 < dist_to_turret < turret.range:
+            # Only turrets in range need the actual distance
+            if 0 < dist_sq < turret.range_sq:
+                dist_to_turret = math.sqrt(dist_sq)
+                
+                # Enhanced avoidance for turrets that have hit nearby drones
+                turret_specific_factor = self.turret_avoidance_factors.get(turret.id, self._initial_avoid_factor)
+                
                 # Avoidance strength increases as drone gets closer
                 avoidance_str = (1.0 - dist_to_turret / turret.range) ** 2
                 avoid_dir = vec_to_turret / dist_to_turret if dist_to_turret > 1e-6 else np.random.rand(2) * 2 - 1
-                turret_force += avoid_dir * avoidance_str * self.config["WEIGHT_TURRET_AVOIDANCE"] * turret_specific_factor
+                turret_force += avoid_dir * avoidance_str * self._w_turret * turret_specific_factor
                 
                 # Set status to Avoiding if strong avoidance
                 if avoidance_str > 0.5 and self.status != "NoFuel" and self.alive:
                     self.status = "Avoiding"
         
-        # --- Flocking Behavior ---
+        return turret_force
+    
+    def _flocking_force(self, drones: List['Drone']) -> np.ndarray:
+        """
+        Calculate the flocking force from the given drones.
+        
+        Args:
+            drones (List[Drone]): Drones considered as potential neighbours
+            
+        Returns:
+            np.ndarray: Combined cohesion, separation and alignment force
+        """
         # 1. Cohesion: steer towards center of mass of nearby drones
         # 2. Separation: avoid crowding nearby drones
         # 3. Alignment: steer towards average heading of nearby drones
         
-        nearby_drones = [d for d in drones if d.id != self.id and d.alive and 
-                        np.linalg.norm(d.pos - self.pos) < self.config["DRONE_SENSOR_RANGE"]]
+        sensor_range = self._sensor_range
+        others = [d for d in drones if d.id != self.id and d.alive]
+        if not others:
+            return np.zeros(2)
         
-        cohesion_force = np.zeros(2)
-        separation_force = np.zeros(2)
-        alignment_force = np.zeros(2)
+        # One broadcast distance test against all candidates
+        pos = np.array([d.pos for d in others], dtype=float)
+        vec_away = self.pos - pos
+        dist_sq = np.einsum('ij,ij->i', vec_away, vec_away)
+        nearby = dist_sq < sensor_range * sensor_range
+        if not nearby.any():
+            return np.zeros(2)
         
-        if nearby_drones:
-            # Cohesion
-            center_of_mass = np.mean([d.pos for d in nearby_drones], axis=0)
-            cohesion_force = (center_of_mass - self.pos) * self.config["WEIGHT_COHESION"]
-            
-            # Separation
-            for drone in nearby_drones:
-                vec_away = self.pos - drone.pos
-                dist = np.linalg.norm(vec_away)
-                if dist < 1e-6:  # Avoid division by zero
-                    vec_away = np.random.rand(2) * 2 - 1
-                    dist = 1.0
-                
-                # Separation force is stronger when drones are closer
-                separation_force += (vec_away / dist) * (self.config["DRONE_SENSOR_RANGE"] / max(dist, 1e-6)) * self.config["WEIGHT_SEPARATION"]
-            
-            # Alignment
-            avg_velocity = np.mean([d.velocity for d in nearby_drones], axis=0)
-            alignment_force = (avg_velocity - self.velocity) * self.config["WEIGHT_ALIGNMENT"]
+        # Cohesion
+        center_of_mass = pos[nearby].mean(axis=0)
+        cohesion_force = (center_of_mass - self.pos) * self._w_cohesion
         
-        # Combine all forces
-        steering_force = (
-            target_force + 
-            obstacle_force + 
-            turret_force + 
-            cohesion_force + 
-            separation_force + 
-            alignment_force
-        )
+        # Separation force is stronger when drones are closer; drones on top
+        # of this one push in a random direction
+        vec_away = vec_away[nearby]
+        dist = np.sqrt(dist_sq[nearby])
+        coincident = dist < 1e-6
+        if coincident.any():
+            vec_away[coincident] = np.random.rand(coincident.sum(), 2) * 2 - 1
+            dist[coincident] = 1.0
+        push = vec_away * (sensor_range / (dist * dist))[:, None]
+        separation_force = push.sum(axis=0) * self._w_separation
         
-        # Terrain influence if GIS is available
-        if hasattr(gis, 'get_slope'):
-            slope = gis.get_slope(self.pos[0], self.pos[1])
-            if slope > 30:  # Steep slope, reduce speed
-                steering_force *= max(0.5, 1.0 - (slope - 30) / 60.0)
+        # Alignment
+        avg_velocity = np.array([d.velocity for d, near in zip(others, nearby) if near]).mean(axis=0)
+        alignment_force = (avg_velocity - self.velocity) * self._w_alignment
         
-        return steering_force
+        return cohesion_force + separation_force + alignment_force
     
     def attack(self):
         """Attack the assigned target."""
@@ -330,10 +1151,10 @@ class Drone:
                 # Reset target assignment
                 self.assign_target(None)
     
-    def update(self, drones: List['Drone'], targets: List[Target], 
-               obstacles: List[Obstacle], turrets: List[Turret], gis):
+    def _steer(self, drones: List['Drone'], targets: List[Target],
+               obstacles: List[Obstacle], turrets: List[Turret], gis) -> Optional[np.ndarray]:
         """
-        Update drone state.
+        Burn fuel and decide this step's steering force, without moving.
         
         Args:
             drones (List[Drone]): All drones in the simulation
@@ -341,21 +1162,41 @@ class Drone:
             obstacles (List[Obstacle]): All obstacles in the simulation
             turrets (List[Turret]): All turrets in the simulation
             gis: GIS data handler
+            
+        Returns:
+            Optional[np.ndarray]: Steering force, or None if the drone is
+            destroyed or out of fuel and does not move
         """
         if not self.alive or self.status == "NoFuel":
-            return
+            return None
         
         # Reduce fuel
-        self.fuel -= self.config["DRONE_FUEL_CONSUMPTION_RATE"]
+        self.fuel -= self._fuel_rate
         if self.fuel <= 0:
             self.fuel = 0
             self.status = "NoFuel"
-            return
-        elif self.fuel / self.config["DRONE_MAX_FUEL"] < self.config["LOW_FUEL_THRESHOLD"]:
+            return None
+        elif self.fuel / self._max_fuel < self._low_fuel_threshold:
             self.status = "LowFuel"
         
         # Calculate steering force
-        steering_force = self.calculate_steering_force(drones, targets, obstacles, turrets, gis)
+        return self.calculate_steering_force(drones, targets, obstacles, turrets, gis)
+    
+    def update(self, drones: List['Drone'], targets: List[Target], 
+               obstacles: List[Obstacle], turrets: List[Turret], gis):
+        """
+        Update drone state.
+        
+        Args:
+            drones (List[Drone]): All drones in the simulation
+            targets (List[Target]): All targets in the simulation
+            obstacles (List[Obstacle]): All obstacles in the simulation
+            turrets (List[Turret]): All turrets in the simulation
+            gis: GIS data handler
+        """
+        steering_force = self._steer(drones, targets, obstacles, turrets, gis)
+        if steering_force is None:
+            return
         
         # Apply steering force to velocity
         self.velocity += steering_force
@@ -368,18 +1209,13 @@ class Drone:
         # Update position
         self.pos += self.velocity
         
-        # Boundary handling (wrap or bounce)
-        field_size = self.config["FIELD_SIZE"]
-        for i in range(2):
-            if self.pos[i] < 0:
-                self.pos[i] = 0
-                self.velocity[i] *= -0.5  # Bounce with energy loss
-            elif self.pos[i] > field_size:
-                self.pos[i] = field_size
-                self.velocity[i] *= -0.5  # Bounce with energy loss
+        # Boundary handling: clamp to the field and bounce with energy loss
+        outside = (self.pos < 0) | (self.pos > self._field_size)
+        np.clip(self.pos, 0, self._field_size, out=self.pos)
+        self.velocity[outside] *= -0.5
         
         # Update trajectory history for visualization
-        self.trajectory.append(np.copy(self.pos))
+        self.trajectory.append(self.pos)
 
 
 class Simulation:
@@ -396,11 +1232,19 @@ class Simulation:
         """
         self.config = config
         self.drones: List[Drone] = []
+        self.drone_state = DroneState(0)
         self.targets: List[Target] = []
         self.obstacles: List[Obstacle] = []
         self.turrets: List[Turret] = []
+        self.entity_state = EntityState([], [], [])
         self.step_count = 0
+        self.generation = 0  # Bumped on every re-initialization
         self.gis = None
+        # Statistics of the current step, computed on first request
+        self._stats = None
+        self._stats_version = None  # DroneState.version the cached stats were taken at
+        self._stats_dirty = True
+        self._config_values = None  # CACHED_CONFIG_KEYS values the caches hold
         self.initialize()
     
     def initialize(self):
@@ -411,6 +1255,7 @@ class Simulation:
         self.obstacles.clear()
         self.turrets.clear()
         self.step_count = 0
+        self.generation += 1
         
         field_size = self.config["FIELD_SIZE"]
         
@@ -438,6 +1283,82 @@ class Simulation:
             x = np.random.uniform(0, field_size)
             y = np.random.uniform(0, field_size)
             self.turrets.append(Turret(i, x, y, self.config))
+        
+        self.bind_drone_state()
+        self.bind_entity_state()
+    
+    def __getstate__(self) -> dict:
+        """Pickle the simulation without its flocking worker processes."""
+        state = self.__dict__.copy()
+        state.pop('_flocking_pool', None)
+        return state
+    
+    def __setstate__(self, state: dict):
+        """Restore a pickled simulation, re-sharing entity positions with the store."""
+        self.__dict__.update(state)
+        self._stats = None
+        self.bind_entity_state()
+    
+    def _sync_drone_state(self):
+        """Rebind the drone store if drones were added or removed since binding."""
+        if len(self.drone_state) != len(self.drones):
+            self.bind_drone_state()
+    
+    def _refresh_config_caches(self):
+        """Refresh drone and turret config caches if the config was edited in place."""
+        values = tuple(self.config[key] for key in CACHED_CONFIG_KEYS)
+        if values == self.__dict__.get('_config_values'):
+            return
+        for entity in (*self.drones, *self.turrets):
+            if hasattr(entity, 'refresh_config'):
+                entity.refresh_config()
+        self._config_values = values
+    
+    def _active_mask(self) -> np.ndarray:
+        """Mask of drones that are alive and not out of fuel, from the drone store."""
+        state = self.drone_state
+        return state.alive & (state.status_id != _STATUS_IDS["NoFuel"])
+    
+    def bind_drone_state(self):
+        """
+        Back all simulation drones with one shared DroneState.
+        
+        Call this after adding or removing drones outside initialize().
+        """
+        self.drone_state = DroneState.bind(self.drones)
+        self._stats_dirty = True
+    
+    def bind_entity_state(self):
+        """
+        Gather target, turret and obstacle geometry into one EntityState.
+        
+        Call this after adding or removing those entities outside initialize().
+        """
+        self.entity_state = EntityState(self.targets, self.turrets, self.obstacles)
+        self._stats_dirty = True
+    
+    def drone_trails(self) -> List[np.ndarray]:
+        """
+        Get the recent trajectory of every drone, in drone order.
+        
+        Returns:
+            List[np.ndarray]: One (k, 2) array per drone
+        """
+        return [drone.trajectory.recent() for drone in self.drones]
+    
+    @property
+    def source_id(self) -> int:
+        """Identity of this simulation, carried over to its snapshots."""
+        return id(self)
+    
+    def snapshot(self) -> SimulationSnapshot:
+        """
+        Capture the state needed for rendering.
+        
+        Returns:
+            SimulationSnapshot: Copy that stays valid while the simulation steps
+        """
+        return SimulationSnapshot(self)
     
     def set_gis(self, gis):
         """
@@ -449,49 +1370,245 @@ class Simulation:
         self.gis = gis
     
     def step(self):
-        """Execute one simulation step."""
+        """
+        Execute one simulation step.
+        
+        Returns:
+            dict: Index arrays of what changed during the step, under
+            "destroyed_drones", "destroyed_targets" and "fired_turrets";
+            callers can skip their own diffing when these are empty
+        """
         self.step_count += 1
+        self._stats_dirty = True
+        self._refresh_config_caches()
+        self._sync_drone_state()
+        if not self.entity_state.matches(self.targets, self.turrets, self.obstacles):
+            self.bind_entity_state()
+        state = self.drone_state
+        alive_before = state.alive.copy()
+        targets_before = self._target_alive()
+        
+        # Turret-to-drone offsets for the whole step; drones only move during
+        # their own update, after every turret has fired
+        turret_offsets = state.pos[None, :, :] - self.entity_state.turret_pos[:, None, :]
+        turret_dist_sq = np.einsum('tnk,tnk->tn', turret_offsets, turret_offsets)
+        # Destroyed and grounded drones are never targeted or steered
+        active = self._active_mask()
+        turret_dist_sq[:, ~active] = np.inf
         
         # Update turrets
-        for turret in self.turrets:
-            turret.update(self.drones)
+        fired = np.fromiter((turret.update(self.drones, turret_dist_sq[k], state.pos)
+                             for k, turret in enumerate(self.turrets)),
+                            dtype=bool, count=len(self.turrets))
+        
+        # Flocking, obstacle and turret avoidance forces for the whole swarm
+        # in one vectorized pass each
+        state.flocking[:] = self._compute_flocking()
+        self._compute_obstacle_avoidance(active)
+        self._compute_turret_avoidance(turret_offsets, turret_dist_sq)
+        state.forces_ready = True
         
         # Update drones
-        for drone in self.drones:
-            drone.update(self.drones, self.targets, self.obstacles, self.turrets, self.gis)
+        try:
+            if all(type(drone).update is Drone.update for drone in self.drones):
+                self._update_drones_batched()
+            else:
+                for drone in self.drones:
+                    drone.update(self.drones, self.targets, self.obstacles, self.turrets, self.gis)
+        finally:
+            state.forces_ready = False
         
         # Auto-assign targets to idle drones
         self.assign_targets()
+        
+        return {
+            "destroyed_drones": np.flatnonzero(alive_before & ~state.alive),
+            "destroyed_targets": np.flatnonzero(targets_before & ~self._target_alive()),
+            "fired_turrets": np.flatnonzero(fired),
+        }
+    
+    def _compute_flocking(self) -> np.ndarray:
+        """
+        Compute the flocking forces of the whole swarm.
+        
+        With FLOCKING_BACKEND set to "cupy" the forces are computed on the
+        GPU (see gpu_flocking). Otherwise, with FLOCKING_WORKERS above 1,
+        very large swarms are split across that many worker processes (see
+        parallel_flocking); the workers are started on first use and
+        restarted if the swarm changes size.
+        
+        Returns:
+            np.ndarray: Flocking force per drone, shape (N, 2)
+        """
+        state = self.drone_state
+        if self.config.get("FLOCKING_BACKEND", "numpy") == "cupy":
+            from gpu_flocking import gpu_flocking_forces, CUPY_AVAILABLE
+            if CUPY_AVAILABLE:
+                return gpu_flocking_forces(state.pos, state.velocity, state.alive, self.config)
+        
+        workers = self.config.get("FLOCKING_WORKERS", 0)
+        if workers > 1:
+            from parallel_flocking import FlockingPool, PARALLEL_MIN_DRONES
+            if len(state) >= PARALLEL_MIN_DRONES:
+                pool = self.__dict__.get('_flocking_pool')
+                if pool is None or pool.num_drones != len(state):
+                    if pool is not None:
+                        pool.close()
+                    pool = self._flocking_pool = FlockingPool(len(state), self.config, workers)
+                return pool.compute(state.pos, state.velocity, state.alive)
+        return compute_flocking_forces(state.pos, state.velocity, state.alive, self.config)
+    
+    def _update_drones_batched(self):
+        """
+        Update every drone, steering one at a time but moving all at once.
+        
+        Each drone's steering only reads its own position and the forces
+        precomputed from the start-of-step positions, so deciding all of them
+        first and then integrating the whole swarm in one integrate_drones()
+        call gives the same result as the per-drone update() loop with those
+        precomputed (Jacobi) forces. It does not reproduce the original
+        sequential (Gauss-Seidel) update, where each drone saw the positions
+        of the drones already moved earlier in the same step.
+        """
+        state = self.drone_state
+        steering = np.zeros((len(self.drones), 2))
+        moving = np.zeros(len(self.drones), dtype=bool)
+        for index, drone in enumerate(self.drones):
+            force = drone._steer(self.drones, self.targets, self.obstacles, self.turrets, self.gis)
+            if force is not None:
+                steering[index] = force
+                moving[index] = True
+        
+        max_speed = np.fromiter((drone.max_speed for drone in self.drones),
+                                dtype=state.velocity.dtype, count=len(self.drones))
+        integrate_drones(state.pos, state.velocity, steering, moving, max_speed, self.config["FIELD_SIZE"])
+        
+        # Update trajectory history for visualization; every drone's
+        # TrajectoryBuffer is a row of the store, so all append at once
+        index = np.flatnonzero(moving)
+        state.trail[index, state.trail_head[index] % TRAJECTORY_LENGTH] = state.pos[index]
+        state.trail_head[index] += 1
+    
+    def _compute_obstacle_avoidance(self, active: np.ndarray):
+        """
+        Fill the drone store's obstacle avoidance forces for the whole swarm.
+        
+        All drone-obstacle distances are tested in one pass and only pairs
+        inside an obstacle's avoidance radius do any further work.
+        Obstacles with their own get_repulsion_vector fall back to the
+        per-drone loop.
+        
+        Args:
+            active (np.ndarray): Mask of drones that will steer this step
+        """
+        state = self.drone_state
+        entities = self.entity_state
+        state.obstacle_force[:] = 0.0
+        
+        if not all(type(obstacle).get_repulsion_vector is Obstacle.get_repulsion_vector
+                   for obstacle in self.obstacles):
+            for index in np.flatnonzero(active):
+                state.obstacle_force[index] = self.drones[index]._obstacle_force(self.obstacles)
+            return
+        
+        effective_radius = entities.obstacle_radius + self.config["OBSTACLE_AVOIDANCE_DISTANCE"]
+        offsets = state.pos[None, :, :] - entities.obstacle_pos[:, None, :]
+        dist_sq = np.einsum('onk,onk->on', offsets, offsets)
+        o, n = np.nonzero((dist_sq > 0) & (dist_sq < (effective_radius * effective_radius)[:, None]) & active[None, :])
+        if len(o) == 0:
+            return
+        
+        # Only pairs in range need the actual distance
+        dist = np.sqrt(dist_sq[o, n])
+        strength = (1.0 - dist / effective_radius[o]) ** 2
+        direction = offsets[o, n] / dist[:, None]
+        tiny = dist <= 1e-6
+        if tiny.any():
+            direction[tiny] = np.random.rand(tiny.sum(), 2) * 2 - 1
+        
+        # Pairs come obstacle-major, so each drone sums its obstacles in list order
+        np.add.at(state.obstacle_force, n,
+                  direction * strength[:, None] * self.config["WEIGHT_OBSTACLE_AVOIDANCE"])
+    
+    def _compute_turret_avoidance(self, offsets: np.ndarray, dist_sq: np.ndarray):
+        """
+        Fill the drone store's turret avoidance forces for the whole swarm.
+        
+        Only living drones within range of a turret do any work; each drone's
+        learned avoidance factor is looked up per pair.
+        
+        Args:
+            offsets (np.ndarray): Drone minus turret positions, shape (T, N, 2)
+            dist_sq (np.ndarray): Squared turret-drone distances, shape (T, N),
+                infinite for drones that are out of action
+        """
+        state = self.drone_state
+        entities = self.entity_state
+        state.turret_force[:] = 0.0
+        state.turret_alert[:] = False
+        
+        t, n = np.nonzero((dist_sq > 0) & (dist_sq < entities.turret_range_sq[:, None]))
+        if len(t) == 0:
+            return
+        
+        dist = np.sqrt(dist_sq[t, n])
+        # Avoidance strength increases as drone gets closer
+        strength = (1.0 - dist / entities.turret_range[t]) ** 2
+        direction = offsets[t, n] / dist[:, None]
+        tiny = dist <= 1e-6
+        if tiny.any():
+            direction[tiny] = np.random.rand(tiny.sum(), 2) * 2 - 1
+        
+        # Enhanced avoidance for turrets that have hit nearby drones
+        default_factor = self.config["DRONE_INITIAL_AVOID_FACTOR"]
+        factors = np.array([self.drones[k].turret_avoidance_factors.get(self.turrets[m].id, default_factor)
+                            for m, k in zip(t, n)])
+        
+        # Pairs come turret-major, so each drone sums its turrets in list order
+        np.add.at(state.turret_force, n,
+                  direction * (strength * factors * self.config["WEIGHT_TURRET_AVOIDANCE"])[:, None])
+        state.turret_alert[n[strength > 0.5]] = True
+    
+    def _target_alive(self) -> np.ndarray:
+        """Alive flags of the targets as a bool array."""
+        return np.fromiter((t.alive for t in self.targets), dtype=bool, count=len(self.targets))
     
     def assign_targets(self):
-        """Assign targets to idle drones."""
+        """
+        Assign targets to idle drones.
+        
+        Each idle drone takes the target with the lowest distance plus a
+        penalty of 10 per drone already assigned to it, skipping targets at
+        TARGET_ASSIGNMENT_LIMIT. All drone-target distances are computed in
+        one (D, T) matrix; the drones then pick in order with one argmin per
+        row, so the counts raised by earlier picks still steer later ones.
+        """
         # Find idle drones that need targets
-        idle_drones = [d for d in self.drones if d.alive and d.target is None and d.status != "NoFuel"]
+        idle_index = [index for index in np.flatnonzero(self._active_mask())
+                      if self.drones[index].target is None]
         
         # Find alive targets
-        alive_targets = [t for t in self.targets if t.alive]
+        target_index = np.flatnonzero(self._target_alive())
         
-        for drone in idle_drones:
-            # Find best target based on distance and current assignments
-            best_target = None
-            best_score = float('inf')
-            
-            for target in alive_targets:
-                if target.assigned_drones >= self.config["TARGET_ASSIGNMENT_LIMIT"]:
-                    continue
-                
-                # Score based on distance and current assignments
-                dist = np.linalg.norm(drone.pos - target.pos)
-                assignment_penalty = target.assigned_drones * 10  # Penalty for targets with many assignments
-                score = dist + assignment_penalty
-                
-                if score < best_score:
-                    best_score = score
-                    best_target = target
+        if not idle_index or not len(target_index):
+            return
+        
+        offsets = (self.drone_state.pos[idle_index][:, None, :] -
+                   self.entity_state.target_pos[target_index][None, :, :])
+        dist = np.sqrt(np.einsum("ijk,ijk->ij", offsets, offsets))
+        assigned = np.array([self.targets[k].assigned_drones for k in target_index], dtype=float)
+        limit = self.config["TARGET_ASSIGNMENT_LIMIT"]
+        
+        for drone_index, row in zip(idle_index, dist):
+            # Score based on distance and current assignments
+            score = np.where(assigned >= limit, np.inf, row + assigned * 10)
+            best = int(np.argmin(score))
+            if score[best] == np.inf:
+                continue
             
             # Assign the best target
-            if best_target:
-                drone.assign_target(best_target)
+            self.drones[drone_index].assign_target(self.targets[target_index[best]])
+            assigned[best] += 1
     
     def is_complete(self):
         """Check if simulation is complete."""
@@ -500,12 +1617,12 @@ class Simulation:
             return True
         
         # Check if all targets are destroyed
-        if all(not target.alive for target in self.targets):
+        if not self._target_alive().any():
             return True
         
         # Check if all drones are destroyed or out of fuel
-        active_drones = any(drone.alive and drone.status != "NoFuel" for drone in self.drones)
-        if not active_drones:
+        self._sync_drone_state()
+        if not self._active_mask().any():
             return True
         
         return False
@@ -514,16 +1631,38 @@ class Simulation:
         """
         Get current simulation statistics.
         
+        The counts are computed once per step; later calls return copies of
+        the cached result until a drone is killed or changes status, or the
+        number of remaining targets changes, e.g. from hits outside step().
+        
         Returns:
             dict: Simulation statistics
         """
+        self._sync_drone_state()
+        version = self.drone_state.version
+        if (self._stats_dirty or self._stats is None or self._stats_version != version
+                or self._stats["targets_remaining"] != int(self._target_alive().sum())):
+            self._stats = self._compute_statistics()
+            self._stats_version = version
+            self._stats_dirty = False
+        stats = dict(self._stats)
+        stats["drone_statuses"] = dict(stats["drone_statuses"])
+        return stats
+    
+    def _compute_statistics(self) -> dict:
+        """Count drones, targets and drone statuses from the entity stores."""
+        state = self.drone_state
+        
+        # Every status counted in one pass over the status ids
+        status_counts = np.bincount(state.status_id, minlength=len(DRONE_STATUSES))
+        targets_remaining = int(self._target_alive().sum())
         stats = {
             "step_count": self.step_count,
-            "drones_alive": sum(1 for d in self.drones if d.alive),
-            "drones_active": sum(1 for d in self.drones if d.alive and d.status != "NoFuel"),
-            "targets_remaining": sum(1 for t in self.targets if t.alive),
-            "targets_destroyed": self.config["NUM_TARGETS"] - sum(1 for t in self.targets if t.alive),
-            "drone_statuses": {status: sum(1 for d in self.drones if d.status == status) for status in 
+            "drones_alive": int(state.alive.sum()),
+            "drones_active": int(self._active_mask().sum()),
+            "targets_remaining": targets_remaining,
+            "targets_destroyed": self.config["NUM_TARGETS"] - targets_remaining,
+            "drone_statuses": {status: int(status_counts[_STATUS_IDS[status]]) for status in
                               ["Idle", "Moving", "Attacking", "Avoiding", "LowFuel", "NoFuel", "Destroyed"]}
         }
         return stats
@@ -3,17 +3,45 @@ NATO Military Drone Swarm Visualization Viewer
 
 This simple script displays the generated tactical visualizations
 from the drone swarm simulation.
+
+Frames are shown as plain Qt pixmaps, so navigating only swaps the image.
+Decoded frames are kept in an LRU cache, downscaled once to the viewer size
+so the cache stays small; short sequences are decoded in full in the
+background at startup, longer ones around the current frame.
 """
 
 import os
 import sys
 import glob
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Button, Slider
-from PIL import Image
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QLabel, QSlider, QSizePolicy
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+
+# Frames on each side of the current one that are decoded ahead of time
+PREFETCH_FRAMES = 2
+
+# Decoded frames kept in memory; sequences this short are decoded in full
+FRAME_CACHE_SIZE = 64
 
-class TacticalViewer:
+# Frames larger than this are downscaled once when decoded
+MAX_FRAME_SIZE = (1200, 1000)
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def load_frame(path):
+    # Decode a frame, shrunk to at most MAX_FRAME_SIZE
+    image = QImage(path)
+    if image.width() > MAX_FRAME_SIZE[0] or image.height() > MAX_FRAME_SIZE[1]:
+        image = image.scaled(*MAX_FRAME_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+class TacticalViewer(QMainWindow):
     def __init__(self):
+        super().__init__()
         self.output_dir = 'output'
         self.current_index = 0
         self.files = self.get_image_files()
@@ -23,6 +51,15 @@ class TacticalViewer:
             print("Please run the simulation first using 'python direct_simulation.py'")
             sys.exit(1)
         
+        # Background decoding: frame index -> Future of load_frame()
+        self.loader = ThreadPoolExecutor(max_workers=2)
+        self.prefetched = {}
+        self.pixmap = None
+        
+        # Short sequences fit the cache whole, so decode all of them up front
+        if len(self.files) <= FRAME_CACHE_SIZE:
+            self.prefetch(range(len(self.files)))
+        
         self.setup_viewer()
     
     def get_image_files(self):
@@ -42,71 +79,115 @@ class TacticalViewer:
         return tactical_files
     
     def setup_viewer(self):
-        # Set up the figure and axis for display
-        self.fig, self.ax = plt.subplots(figsize=(12, 10))
-        plt.subplots_adjust(bottom=0.15)
-        
         # Add title with military styling
-        self.fig.canvas.manager.set_window_title('NATO Military Drone Swarm Tactical Viewer')
+        self.setWindowTitle('NATO Military Drone Swarm Tactical Viewer')
+        self.resize(1200, 1000)
         
-        # Display the first image
-        self.display_current_image()
+        central = QWidget(self)
+        layout = QVBoxLayout(central)
         
-        # Add navigation buttons
-        ax_prev = plt.axes([0.2, 0.05, 0.1, 0.075])
-        ax_next = plt.axes([0.7, 0.05, 0.1, 0.075])
-        self.btn_prev = Button(ax_prev, 'Previous', color='0.85', hovercolor='0.95')
-        self.btn_next = Button(ax_next, 'Next', color='0.85', hovercolor='0.95')
-        self.btn_prev.on_clicked(self.prev_image)
-        self.btn_next.on_clicked(self.next_image)
+        self.title_label = QLabel()
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.title_label.setStyleSheet("color: blue; font-size: 14pt;")
+        layout.addWidget(self.title_label)
         
-        # Add a slider for direct navigation
-        ax_slider = plt.axes([0.35, 0.05, 0.3, 0.03])
-        self.slider = Slider(ax_slider, 'Frame', 0, len(self.files)-1, 
-                            valinit=0, valstep=1)
-        self.slider.on_changed(self.slider_update)
+        # The image label may shrink below the frame size; frames are scaled to fit
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        layout.addWidget(self.image_label, stretch=1)
         
-        # Show the viewer
-        plt.show()
-    
-    def display_current_image(self):
-        # Clear previous image
-        self.ax.clear()
+        # Add navigation buttons and a slider for direct navigation
+        controls = QHBoxLayout()
+        self.btn_prev = QPushButton('Previous')
+        self.btn_next = QPushButton('Next')
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(0, len(self.files) - 1)
+        self.btn_prev.clicked.connect(self.prev_image)
+        self.btn_next.clicked.connect(self.next_image)
+        self.slider.valueChanged.connect(self.slider_update)
+        controls.addWidget(self.btn_prev)
+        controls.addWidget(QLabel('Frame'))
+        controls.addWidget(self.slider, stretch=1)
+        controls.addWidget(self.btn_next)
+        layout.addLayout(controls)
         
-        # Load and display current image
-        img = Image.open(self.files[self.current_index])
-        self.ax.imshow(img)
+        self.setCentralWidget(central)
         
-        # Remove axis ticks for cleaner display
-        self.ax.set_xticks([])
-        self.ax.set_yticks([])
+        # Display the first image
+        self.display_current_image()
+    
+    def load_image(self, index):
+        # Decoded frame, waiting for its prefetch if one is still running
+        future = self.prefetched.get(index)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return load_frame(self.files[index])
+    
+    def prefetch(self, indices):
+        # Decode frames into the cache in the background
+        for index in indices:
+            if index not in self.prefetched:
+                self.prefetched[index] = self.loader.submit(load_frame, self.files[index])
+    
+    def prefetch_neighbors(self):
+        # Decode the frames around the current one. Finished decodes live on
+        # in the cache, so their futures are forgotten; unless the whole
+        # sequence is being preloaded, queued decodes of frames that left
+        # the window are cancelled so they do not hold up the ones now needed
+        window = range(max(self.current_index - PREFETCH_FRAMES, 0),
+                       min(self.current_index + PREFETCH_FRAMES + 1, len(self.files)))
+        preload_all = len(self.files) <= FRAME_CACHE_SIZE
+        pending = {}
+        for index, future in self.prefetched.items():
+            if future.done():
+                continue
+            if preload_all or index in window:
+                pending[index] = future
+            else:
+                future.cancel()
+        self.prefetched = pending
+        self.prefetch(window)
+    
+    def show_scaled(self):
+        # Fit the current frame into the image label, keeping its aspect ratio
+        if self.pixmap is not None:
+            self.image_label.setPixmap(self.pixmap.scaled(
+                self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+    
+    def display_current_image(self):
+        # Swapping the pixmap is the only work per frame
+        self.pixmap = QPixmap.fromImage(self.load_image(self.current_index))
+        self.show_scaled()
         
         # Set title showing current frame
         frame_num = os.path.basename(self.files[self.current_index]).split('_')[-1].split('.')[0]
-        self.ax.set_title(f"NATO Tactical View - Frame {frame_num} of {len(self.files)}", 
-                         fontsize=14, color='blue')
+        self.title_label.setText(f"NATO Tactical View - Frame {frame_num} of {len(self.files)}")
         
-        # Update the figure
-        self.fig.canvas.draw_idle()
+        self.prefetch_neighbors()
     
-    def prev_image(self, event):
-        # Show previous image
+    def prev_image(self):
+        # Show previous image; the slider change redraws
         if self.current_index > 0:
-            self.current_index -= 1
-            self.display_current_image()
-            self.slider.set_val(self.current_index)
+            self.slider.setValue(self.current_index - 1)
     
-    def next_image(self, event):
-        # Show next image
+    def next_image(self):
+        # Show next image; the slider change redraws
         if self.current_index < len(self.files) - 1:
-            self.current_index += 1
-            self.display_current_image()
-            self.slider.set_val(self.current_index)
+            self.slider.setValue(self.current_index + 1)
     
     def slider_update(self, val):
         # Update image based on slider position
         self.current_index = int(val)
         self.display_current_image()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.show_scaled()
+    
+    def closeEvent(self, event):
+        self.loader.shutdown(wait=False, cancel_futures=True)
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     print("\nNATO MILITARY DRONE SWARM TACTICAL VIEWER")
@@ -114,4 +195,7 @@ if __name__ == "__main__":
     print("Use the slider and buttons to navigate through the tactical visualizations.")
     print("Close the window to exit the viewer.\n")
     
-    viewer = TacticalViewer()
\ No newline at end of file
+    app = QApplication(sys.argv)
+    viewer = TacticalViewer()
+    viewer.show()
+    sys.exit(app.exec_())
@@ -9,8 +9,7 @@ import os
 import json
 import time
 import threading
-import base64
-from io import BytesIO
+import queue
 from flask import Flask, render_template, jsonify, send_from_directory, Response, request
 
 import matplotlib
@@ -19,7 +18,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from config import DEFAULT_CONFIG
-from enhanced_simulation import EnhancedSimulation, generate_tactical_visualization
+from enhanced_simulation import EnhancedSimulation, TacticalRasterizer, tactical_snapshot
+from simulation_core import warm_up_kernels
 from geo_data_manager import GeoDataManager
 
 # Create Flask app
@@ -32,10 +32,99 @@ sim_thread = None
 sim_running = False
 sim_step = 0
 sim_stats = {}
+sim_complete = False
+# Bumped whenever the published status changes; doubles as its ETag
+sim_stats_version = 0
 current_plot_data = None
-sim_lock = threading.Lock()
+# Guards sim_step, sim_stats, sim_complete and sim_stats_version as request
+# handlers see them; the simulation object itself is only used by the
+# simulation thread, so stepping it needs no lock
+state_lock = threading.Lock()
 output_dir = "static/output"
 
+# Frames are drawn by a render thread from snapshots of the simulation; the
+# queue holds only the newest snapshot, older ones are dropped unrendered
+render_queue = queue.Queue(maxsize=1)
+render_thread = None
+plot_lock = threading.Lock()
+
+# Set once current_plot_data is replaced by a new frame; each frame gets a
+# fresh event, so every stream waiting on the old one wakes up
+frame_event = threading.Event()
+
+# Frames on /api/stream are repeated this often even when nothing changes,
+# which lets streams of disconnected browsers end
+STREAM_KEEPALIVE = 5.0
+
+# Frames are streamed straight to the browser, so light PNG compression
+# trades slightly larger images for much less encoding time
+PNG_COMPRESS_LEVEL = 1
+
+# Set once the page template has been written by this process
+templates_ready = False
+
+# Rasterizer of the web frames; its matplotlib background is rendered once
+# per simulation and every frame is drawn onto a copy of it
+frame_raster = None
+
+class FrameBuffer:
+    """
+    Reusable write target for encoding PNG frames.
+    
+    PIL writes the encoded image in chunks; they are copied into one
+    preallocated bytearray that doubles when a frame does not fit, so
+    steady-state encoding allocates nothing until the frame is taken out.
+    """
+    
+    def __init__(self, capacity=256 * 1024):
+        """
+        Initialize the buffer.
+        
+        Args:
+            capacity (int): Initial size in bytes
+        """
+        self.data = bytearray(capacity)
+        self.size = 0
+    
+    def reset(self):
+        """Start a new frame, keeping the allocated storage"""
+        self.size = 0
+    
+    def write(self, chunk):
+        """
+        Append a chunk of encoded data.
+        
+        Args:
+            chunk: Bytes-like object
+        
+        Returns:
+            int: Number of bytes written
+        """
+        length = len(chunk)
+        end = self.size + length
+        if end > len(self.data):
+            grown = bytearray(max(end, 2 * len(self.data)))
+            grown[:self.size] = memoryview(self.data)[:self.size]
+            self.data = grown
+        self.data[self.size:end] = chunk
+        self.size = end
+        return length
+    
+    def flush(self):
+        """Nothing is buffered beyond the bytearray itself"""
+    
+    def getvalue(self):
+        """
+        Copy out the current frame.
+        
+        Returns:
+            bytes: Encoded frame; stays valid when the buffer is reused
+        """
+        return bytes(memoryview(self.data)[:self.size])
+
+# Only the render thread encodes frames, so one buffer is reused for all of them
+png_buffer = FrameBuffer()
+
 # Ensure output directories exist
 os.makedirs(output_dir, exist_ok=True)
 os.makedirs("static", exist_ok=True)
@@ -45,7 +134,7 @@ def initialize_simulation(config=None, time_of_day="day",
                          weather="clear", mission_type="strike", 
                          with_enemy_drones=True, num_enemies=3):
     """Initialize the enhanced simulation with provided config"""
-    global simulation, sim_step
+    global simulation, sim_step, sim_complete, sim_stats_version
     if config is None:
         config = DEFAULT_CONFIG.copy()
     
@@ -63,16 +152,60 @@ def initialize_simulation(config=None, time_of_day="day",
         num_enemies = min(num_enemies, config["NUM_DRONES"] // 2)  # Cap enemies at half of friendly drones
         simulation.create_enemy_drones(num_enemies, enhanced=True)
     
-    sim_step = 0
+    with state_lock:
+        sim_step = 0
+        sim_complete = False
+        sim_stats_version += 1
     return simulation
 
+def publish_snapshot(is_final=False):
+    """Hand the current simulation state to the render thread, replacing any unrendered snapshot"""
+    snapshot = tactical_snapshot(simulation)
+    snapshot["step"] = sim_step
+    snapshot["is_final"] = is_final
+    try:
+        render_queue.put_nowait(snapshot)
+    except queue.Full:
+        # Only this thread puts, so once the stale snapshot is gone there is room
+        try:
+            render_queue.get_nowait()
+        except queue.Empty:
+            pass
+        render_queue.put_nowait(snapshot)
+
+def render_worker():
+    """Background thread turning simulation snapshots into plot data"""
+    global current_plot_data, frame_event
+    while True:
+        snapshot = render_queue.get()
+        try:
+            plot_data = generate_plot_data(snapshot)
+        except Exception as e:
+            print(f"Error generating plot: {e}")
+            continue
+        with plot_lock:
+            current_plot_data = plot_data
+            ready, frame_event = frame_event, threading.Event()
+        ready.set()
+
+def start_render_thread():
+    """Start the render thread unless it is already running"""
+    global render_thread
+    if render_thread is None:
+        render_thread = threading.Thread(target=render_worker)
+        render_thread.daemon = True
+        render_thread.start()
+
 def simulation_thread_func(max_steps=200, step_delay=0.1):
     """Background thread to run the simulation"""
-    global sim_running, sim_step, sim_stats, current_plot_data
+    global sim_running, sim_step, sim_stats, sim_complete, sim_stats_version
     
     # Military-grade simulation runs faster with multi-step processing
     STEPS_PER_CYCLE = 2  # Process multiple simulation steps per visual update
+    TARGET_FPS = 10  # Frames handed to the render thread per second at most
     
+    last_plotted_step = sim_step
+    last_plot_time = 0.0
     last_time = time.time()
     steps_this_second = 0
     fps_counter = 0
@@ -88,61 +221,82 @@ def simulation_thread_func(max_steps=200, step_delay=0.1):
             last_time = current_time
         
         # Process multiple simulation steps for performance
+        steps_done = 0
         for _ in range(STEPS_PER_CYCLE):
-            if sim_running and sim_step < max_steps and not simulation.is_complete():
-                with sim_lock:
-                    try:
-                        simulation.step()
-                        sim_step += 1
-                        sim_stats = simulation.get_statistics()
-                        
-                        # Add performance metrics
-                        if 'performance' not in sim_stats:
-                            sim_stats['performance'] = {}
-                        sim_stats['performance']['fps'] = fps_counter
-                        
-                        steps_this_second += 1
-                    except Exception as e:
-                        print(f"Error in simulation step: {e}")
-                        sim_running = False
-                        break
-        
-        # Generate plot for visualization - more frequently for real-time feel
-        with sim_lock:
-            if sim_step % 2 == 0 or sim_step == 1:
+            if sim_running and sim_step + steps_done < max_steps and not simulation.is_complete():
                 try:
-                    current_plot_data = generate_plot_data(sim_step)
+                    simulation.step()
+                    steps_done += 1
+                    steps_this_second += 1
                 except Exception as e:
-                    print(f"Error generating plot: {e}")
+                    print(f"Error in simulation step: {e}")
+                    sim_running = False
+                    break
+        
+        # Statistics are read at most a few times a second, so they are
+        # gathered once per cycle rather than after every step
+        if steps_done:
+            stats = simulation.get_statistics()
+            
+            # Add performance metrics
+            if 'performance' not in stats:
+                stats['performance'] = {}
+            stats['performance']['fps'] = fps_counter
+            complete = simulation.is_complete()
+            
+            # Publish the finished dict; it is never modified afterwards
+            with state_lock:
+                sim_step += steps_done
+                sim_stats = stats
+                sim_complete = complete
+                sim_stats_version += 1
+        
+        # Generate plot for visualization at most once per cycle and TARGET_FPS
+        # times a second, whatever the number of steps per cycle; only the
+        # snapshot is taken here, outside any lock, the render thread draws it
+        now = time.monotonic()
+        if sim_step != last_plotted_step and now - last_plot_time >= 1.0 / TARGET_FPS:
+            try:
+                publish_snapshot()
+            except Exception as e:
+                print(f"Error generating plot: {e}")
+            last_plotted_step = sim_step
+            last_plot_time = now
         
         # Minimal delay for CPU management but maintain fast simulation
         time.sleep(step_delay)
     
     # Final statistics when complete
     sim_running = False
-    with sim_lock:
-        sim_stats = simulation.get_statistics()
-        current_plot_data = generate_plot_data(sim_step, is_final=True)
-
-def generate_plot_data(step, is_final=False):
-    """Generate tactical visualization and return as base64 image"""
-    # Create the tactical visualization
-    fig = generate_tactical_visualization(simulation, step, is_final)
-    
-    # Save the plot to a BytesIO object
-    img_data = BytesIO()
-    plt.savefig(img_data, format='png', dpi=100, facecolor='#0a1929', bbox_inches='tight')
-    img_data.seek(0)
-    plt.close(fig)
+    stats = simulation.get_statistics()
+    complete = simulation.is_complete()
+    with state_lock:
+        sim_stats = stats
+        sim_complete = complete
+        sim_stats_version += 1
+    publish_snapshot(is_final=True)
+
+def generate_plot_data(snapshot):
+    """Generate tactical visualization of a snapshot and return it as PNG bytes"""
+    global frame_raster
+    if frame_raster is None or frame_raster.source is not snapshot["source"]:
+        frame_raster = TacticalRasterizer(snapshot)
+    image = frame_raster.render(snapshot, snapshot["step"])
     
-    # Convert to base64 for embedding in HTML
-    img_base64 = base64.b64encode(img_data.getvalue()).decode('utf-8')
-    return img_base64
+    # Encode into the reusable buffer; the copy taken out of it is what
+    # streams hold on to while the next frame is encoded
+    png_buffer.reset()
+    image.save(png_buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return png_buffer.getvalue()
 
 @app.route('/')
 def index():
     """Main page route"""
-    create_template_files()  # Always ensure template exists
+    global templates_ready
+    # The template only changes with the code, so it is written once per process
+    if not templates_ready:
+        create_template_files()
+        templates_ready = True
     return render_template('index.html')
 
 @app.route('/static/<path:path>')
@@ -198,8 +352,10 @@ def start_simulation():
         initialize_simulation()
     
     # Start simulation thread
+    start_render_thread()
     sim_running = True
-    sim_step = 0
+    with state_lock:
+        sim_step = 0
     sim_thread = threading.Thread(target=simulation_thread_func)
     sim_thread.daemon = True
     sim_thread.start()
@@ -220,49 +376,71 @@ def stop_simulation():
 @app.route('/api/reset_simulation', methods=['GET', 'POST'])
 def reset_simulation():
     """Reset the simulation"""
-    global sim_running, simulation, sim_step
+    global sim_running, simulation
     
     # Stop if running
     sim_running = False
     if sim_thread and sim_thread.is_alive():
         sim_thread.join(timeout=1.0)
     
-    # Reinitialize with default parameters
+    # Reinitialize with default parameters; this also resets the step
     initialize_simulation()
-    sim_step = 0
     
     return jsonify({'status': 'success', 'message': 'Simulation reset'})
 
 @app.route('/api/simulation_status')
 def simulation_status():
     """Get current simulation status"""
-    global sim_running, sim_step, sim_stats, current_plot_data
+    global sim_running, sim_step, sim_stats, sim_complete
     
-    with sim_lock:
+    # Frames are not included; the browser receives them from /api/stream.
+    # The counters are copies published by the simulation thread, so this
+    # never waits for a simulation step
+    with state_lock:
         status = {
             'running': sim_running,
             'step': sim_step,
             'stats': sim_stats,
-            'complete': simulation.is_complete() if simulation else False,
-            'plot_data': current_plot_data
+            'complete': sim_complete,
         }
+        etag = f"{sim_stats_version}-{int(sim_running)}"
+    
+    # Polls that arrive before anything changed get an empty 304
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(status)
+    response.set_etag(etag)
+    # Make the browser revalidate every poll instead of reusing its copy
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def current_frame():
+    """Return the latest frame as PNG bytes, or the placeholder before the first one"""
+    with plot_lock:
+        frame = current_plot_data
+    if not frame:
+        with open('static/placeholder.png', 'rb') as f:
+            frame = f.read()
+    return frame
+
+@app.route('/api/stream')
+def stream():
+    """Stream the frames as raw PNG images, one multipart part per new frame"""
+    def generate():
+        while True:
+            # Grab the event before the frame so a frame rendered in between is not missed
+            with plot_lock:
+                ready = frame_event
+            yield b'--frame\r\nContent-Type: image/png\r\n\r\n' + current_frame() + b'\r\n'
+            ready.wait(timeout=STREAM_KEEPALIVE)
     
-    return jsonify(status)
+    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/current_image.png')
 def get_current_image():
     """Return current simulation state as PNG image"""
-    global current_plot_data
-    
-    if not current_plot_data:
-        # Return a placeholder image
-        with open('static/placeholder.png', 'rb') as f:
-            image_data = f.read()
-    else:
-        # Decode base64 data to binary
-        image_data = base64.b64decode(current_plot_data)
-    
-    return Response(image_data, mimetype='image/png')
+    return Response(current_frame(), mimetype='image/png')
 
 @app.route('/api/simulation_config', methods=['GET'])
 def get_simulation_config():
@@ -396,7 +574,7 @@ def create_template_files():
             <div class="col-md-9">
                 <div class="simulation-container">
                     <div id="visualization">
-                        <img id="sim-image" src="/current_image.png" class="img-fluid" alt="Simulation Visualization">
+                        <img id="sim-image" src="/api/stream" class="img-fluid" alt="Simulation Visualization">
                     </div>
                     <div class="text-center mt-2">
                         <div class="status-label">
@@ -641,10 +819,10 @@ def create_template_files():
             }
         }
 
-        // Reload the visualization image
+        // Reconnect the visualization stream
         function reloadImage() {
             // Add timestamp to prevent caching
-            simImage.src = `/current_image.png?t=${Date.now()}`;
+            simImage.src = `/api/stream?t=${Date.now()}`;
         }
 
         // Poll for simulation status
@@ -670,11 +848,6 @@ def create_template_files():
                 .then(data => {
                     updateStats(data);
                     
-                    // Update image if plot data is available
-                    if (data.plot_data) {
-                        reloadImage();
-                    }
-                    
                     // Update control state
                     if (!data.running && statusInterval) {
                         updateControlState(false);
@@ -711,21 +884,22 @@ def create_template_files():
 </html>
 """
 
-    # Create the template file
-    with open('templates/index.html', 'w') as f:
+    # Create the template file, leaving it alone when it is already current
+    template_path = 'templates/index.html'
+    if os.path.exists(template_path):
+        with open(template_path) as f:
+            if f.read() == index_html:
+                return
+    with open(template_path, 'w') as f:
         f.write(index_html)
-    
-    # Create placeholder image
+
+def create_placeholder_image(geo_manager):
+    """Create the image shown before the first frame, unless it already exists"""
     placeholder_path = 'static/placeholder.png'
     if not os.path.exists(placeholder_path):
         fig, ax = plt.subplots(figsize=(10, 8), facecolor='#0a1929')
         ax.set_facecolor('#132f4c')
         
-        # Create GeoDataManager for initial map
-        geo_manager = GeoDataManager()
-        geo_manager.load_terrain_data()
-        geo_manager.load_map_data()
-        
         # Render terrain and map data
         geo_manager.render_terrain_map(ax=ax)
         geo_manager.render_map_data(ax=ax)
@@ -742,19 +916,27 @@ def create_template_files():
         # Add military grid
         ax.grid(color='#1e4976', linestyle='--', linewidth=0.5, alpha=0.5)
         
-        plt.savefig(placeholder_path, dpi=100, facecolor='#0a1929', bbox_inches='tight')
+        plt.savefig(placeholder_path, dpi=100, facecolor='#0a1929', bbox_inches='tight',
+                    pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
         plt.close(fig)
 
 def main(host='0.0.0.0', port=5000, debug=False):
     """Main entry point for running the web visualization"""
+    global templates_ready
     # Create template files
     create_template_files()
+    templates_ready = True
     
     # Initialize GIS data
     print("Initializing geographic data...")
     geo_manager = GeoDataManager()
     geo_manager.load_terrain_data()
     geo_manager.load_map_data()
+    create_placeholder_image(geo_manager)
+    
+    # Compile the simulation kernels now rather than during the first mission
+    print("Compiling simulation kernels...")
+    warm_up_kernels()
     
     print("\nNATO MILITARY DRONE SWARM ENHANCED WEB VISUALIZATION")
     print("====================================================")